@@ -0,0 +1,46 @@
+"""Streamlit entry point: ``streamlit run app.py``."""
+
+from __future__ import annotations
+
+import streamlit as st
+
+from cadhelp.ui.analysis import clearance_panel, export_panel
+from cadhelp.ui.cache import cache_dashboard, load_drawing, spatial_index
+from cadhelp.ui.debug import metrics_panel
+from cadhelp.ui.edit import edit_toolbar, session_document
+from cadhelp.ui.takeoff import takeoff_panel
+from cadhelp.ui.viewer import tile_viewer
+from cadhelp.ui.voice import voice_panel
+
+st.set_page_config(page_title="CAD helper", layout="wide")
+st.title("CAD helper")
+
+with st.sidebar.expander("Cache statistics"):
+    cache_dashboard()
+with st.sidebar.expander("Timings"):
+    metrics_panel()
+with st.sidebar.expander("Voice commands"):
+    commands = voice_panel()
+
+upload = st.file_uploader(
+    "Drawing", type=["dxf", "svg", "geojson", "json", "png", "jpg", "jpeg", "tif", "tiff", "bmp"],
+)
+if upload is None:
+    st.info("Upload a drawing to view it.")
+    st.stop()
+
+try:
+    drawing = load_drawing(upload)
+except ValueError as exc:
+    st.error(f"Could not read {upload.name}: {exc}")
+    st.stop()
+spatial_index(drawing)
+document = session_document(drawing)
+edit_toolbar(document, commands)
+tile_viewer(document)
+with st.expander("Quantity takeoff"):
+    takeoff_panel(document)
+with st.expander("Clearance check"):
+    clearance_panel(document)
+with st.expander("Export"):
+    export_panel(document)
@@ -0,0 +1,65 @@
+"""Compare batched layer booleans against a naive pairwise Python loop.
+
+Usage::
+
+    python -m benchmarks.bench_boolean --n 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import shapely
+
+from cadhelp.geometry import intersect_layer, to_shapely, total_bounds, union_layer
+
+from .synthetic import room_grid
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def naive_union(polys):
+    acc = polys[0]
+    for p in polys[1:]:
+        acc = acc.union(p)
+    return acc
+
+
+def naive_clip(polys, region):
+    return [p.intersection(region) for p in polys if p.intersects(region)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=10_000, help="number of polygons")
+    parser.add_argument("--skip-naive", action="store_true", help="only time batched ops")
+    args = parser.parse_args(argv)
+
+    store = room_grid(args.n)
+    polys = list(to_shapely(store))
+    minx, miny, maxx, maxy = total_bounds(store)
+    w, h = maxx - minx, maxy - miny
+    viewport = shapely.box(minx + w / 4, miny + h / 4, maxx - w / 4, maxy - h / 4)
+
+    t_union, merged = timed(union_layer, store)
+    t_clip, clipped = timed(intersect_layer, store, viewport)
+    print(f"{args.n} polygons")
+    print(f"  union_all  batched: {t_union * 1e3:9.1f} ms  (area {merged.area:.1f})")
+    print(f"  clip       batched: {t_clip * 1e3:9.1f} ms  ({len(clipped)} entities)")
+    if args.skip_naive:
+        return
+    t_union_n, merged_n = timed(naive_union, polys)
+    t_clip_n, clipped_n = timed(naive_clip, polys, viewport)
+    print(f"  union    pairwise: {t_union_n * 1e3:9.1f} ms  (area {merged_n.area:.1f})"
+          f"  x{t_union_n / t_union:.1f}")
+    print(f"  clip     pairwise: {t_clip_n * 1e3:9.1f} ms  ({len(clipped_n)} entities)"
+          f"  x{t_clip_n / t_clip:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Repeated buffering of identical walls: plain Shapely vs :class:`OffsetCache`.
+
+Simulates a clearance workflow that buffers the same wall set ``--runs``
+times, where each floor repeats the same ``--walls`` shapes.
+
+Usage::
+
+    python -m benchmarks.bench_offset --walls 5000 --floors 10 --runs 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import shapely
+
+from cadhelp.geometry import GeometryStore, OffsetCache, to_shapely
+
+from .synthetic import room_grid
+
+
+def floors(walls: int, count: int) -> GeometryStore:
+    """``count`` copies of the same ``walls`` shapes under distinct ids."""
+    one = room_grid(walls)
+    s = GeometryStore.concat([one] * count)
+    return GeometryStore(s.coords, s.offsets, s.kinds, s.layers,
+                         np.arange(len(s)), s.layer_names)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--walls", type=int, default=5_000, help="distinct wall shapes")
+    parser.add_argument("--floors", type=int, default=10, help="copies of every shape")
+    parser.add_argument("--runs", type=int, default=20, help="repeated buffer passes")
+    args = parser.parse_args(argv)
+
+    store = floors(args.walls, args.floors)
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        shapely.buffer(to_shapely(store), 0.5, join_style="mitre")
+    plain = time.perf_counter() - start
+
+    cache = OffsetCache()
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        cache.buffer(store, 0.5)
+    cached = time.perf_counter() - start
+
+    print(f"{len(store)} entities ({args.walls} distinct) x {args.runs} runs")
+    print(f"  shapely.buffer  {plain * 1e3:9.1f} ms")
+    print(f"  OffsetCache     {cached * 1e3:9.1f} ms  ({plain / cached:.1f}x)  {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
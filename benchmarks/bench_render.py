@@ -0,0 +1,69 @@
+"""Compare render paths: Matplotlib per-entity ``plot()``, batched collections, Pillow.
+
+Usage::
+
+    python -m benchmarks.bench_render --n 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from cadhelp.geometry import GeometryStore, LINESTRING, total_bounds
+from cadhelp.render import fit_bounds, render
+
+
+def random_segments(n: int, seed: int = 0, extent: float = 1000.0) -> GeometryStore:
+    rng = np.random.default_rng(seed)
+    start = rng.uniform(0, extent, size=(n, 2))
+    end = start + rng.normal(0, extent / 100, size=(n, 2))
+    coords = np.stack([start, end], axis=1).reshape(-1, 2)
+    return GeometryStore(coords, np.arange(0, 2 * n + 1, 2), np.full(n, LINESTRING))
+
+
+def per_artist(store: GeometryStore, bbox, size) -> None:
+    fig = Figure(figsize=(size[0] / 100, size[1] / 100), dpi=100)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_axes((0, 0, 1, 1))
+    for part in np.split(store.coords, store.offsets[1:-1]):
+        ax.plot(part[:, 0], part[:, 1], color="k", linewidth=0.7)
+    ax.set_xlim(bbox[0], bbox[2])
+    ax.set_ylim(bbox[1], bbox[3])
+    canvas.draw()
+
+
+def timed(func, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=50_000, help="number of segments")
+    parser.add_argument("--size", type=int, default=1024, help="image edge in pixels")
+    args = parser.parse_args(argv)
+
+    store = random_segments(args.n)
+    size = (args.size, args.size)
+    bbox = fit_bounds(total_bounds(store), size)
+    render(store, size, bbox, backend="matplotlib")  # warm the persistent canvas
+
+    print(f"{args.n} segments at {args.size}px")
+    for label, t in [
+        ("matplotlib collections", timed(render, store, size, bbox, backend="matplotlib")),
+        ("pillow", timed(render, store, size, bbox, backend="pillow")),
+        ("pillow supersample=2", timed(render, store, size, bbox, backend="pillow",
+                                       supersample=2)),
+        ("matplotlib plot() each", timed(per_artist, store, bbox, size)),
+    ]:
+        print(f"  {label:24s} {t * 1e3:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
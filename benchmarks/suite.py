@@ -0,0 +1,453 @@
+"""Benchmark every subsystem on synthetic drawings and write comparable JSON.
+
+Each case times one operation (geometry kernel, Shapely booleans, spatial
+queries, Matplotlib and Pillow rendering, file formats, analysis,
+tracing, Flask endpoints through the test client) on fixtures from
+:mod:`benchmarks.synthetic` at every requested scale.  A case runs
+``--repeat`` times per scale; the first run is reported on its own as the
+cold time and the minimum and median over all runs as the steady state.
+Cases too slow for a scale are skipped above their ``max_n`` unless
+``--all`` is given.
+
+Results carry the commit, library versions and machine, so files from
+two commits can be compared; ``--compare`` prints the ratio of medians
+per case and scale and flags the ones slower than ``--threshold``.
+
+Usage::
+
+    python -m benchmarks.suite --scales 1k,10k,100k --output before.json
+    python -m benchmarks.suite --scales 1k,10k,100k --output after.json --compare before.json
+    python -m benchmarks.suite --scales 1m --filter geometry,spatial --repeat 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import gc
+import io
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import shapely
+
+from cadhelp.clearance import check as check_clearance
+from cadhelp.drawing import Drawing
+from cadhelp.geometry import (
+    GeometryStore,
+    OffsetCache,
+    areas,
+    bounds,
+    centroids,
+    clip_to_rect,
+    intersect_layer,
+    perimeters,
+    rotation,
+    simplify,
+    total_bounds,
+    transform,
+    union_layer,
+)
+from cadhelp.io import read_binary, read_geojson, write_binary, write_geojson
+from cadhelp.lod import LodPyramid
+from cadhelp.render import TileCache, TileRenderer, cull_drawing, encode, render
+from cadhelp.spatial import SpatialIndex
+from cadhelp.takeoff import takeoff
+from cadhelp.trace import trace
+
+from . import synthetic
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+QUERIES = 1000  # windows or points per spatial query case
+IMAGE_SIZE = (1024, 1024)
+TILE_ZOOM = 2  # tile cases render all 16 tiles of this zoom level
+LIBRARIES = ("numpy", "shapely", "pillow", "matplotlib", "flask")
+
+
+@dataclass(frozen=True)
+class Case:
+    """One timed operation: ``run(setup(n))`` is what gets measured."""
+
+    name: str
+    setup: Callable[[int], Any]
+    run: Callable[[Any], Any]
+    max_n: int = 1_000_000
+
+    @property
+    def subsystem(self) -> str:
+        return self.name.split(".", 1)[0]
+
+
+# -- fixtures ----------------------------------------------------------------
+
+@functools.lru_cache(maxsize=4)
+def fixture(generator: str, n: int) -> GeometryStore:
+    return synthetic.GENERATORS[generator](n)
+
+
+def _drawing(n: int, generator: str = "mixed") -> Drawing:
+    return Drawing(fixture(generator, n), name=f"{generator}-{n}")
+
+
+def _windows(store: GeometryStore, count: int, fraction: float, seed: int = 1) -> np.ndarray:
+    """``count`` random boxes, each ``fraction`` of the extent wide."""
+    minx, miny, maxx, maxy = total_bounds(store)
+    w, h = (maxx - minx) * fraction, (maxy - miny) * fraction
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(minx, maxx - w, count)
+    y = rng.uniform(miny, maxy - h, count)
+    return np.column_stack([x, y, x + w, y + h])
+
+
+def _indexed(n: int) -> tuple[SpatialIndex, np.ndarray]:
+    store = fixture("mixed", n)
+    return SpatialIndex.from_store(store), _windows(store, QUERIES, 0.01)
+
+
+def _query_boxes(state) -> None:
+    index, windows = state
+    for box in windows:
+        index.query_box(box)
+
+
+def _nearest(state) -> None:
+    index, windows = state
+    for x, y, *_ in windows:
+        index.nearest_point(x, y, 5.0)
+
+
+def _viewports(n: int) -> tuple[Drawing, np.ndarray]:
+    drawing = _drawing(n)
+    drawing.index  # built once; culling is what is timed
+    return drawing, _windows(drawing.store, 100, 0.1)
+
+
+def _cull(state) -> None:
+    drawing, windows = state
+    for box in windows:
+        cull_drawing(drawing, box, (box[2] - box[0]) / IMAGE_SIZE[0])
+
+
+def _tiles(n: int) -> tuple[TileRenderer, Drawing]:
+    drawing = _drawing(n)
+    drawing.index
+    return TileRenderer(TileCache()), drawing
+
+
+def _all_tiles(state) -> None:
+    renderer, drawing = state
+    renderer.invalidate(drawing)
+    side = 1 << TILE_ZOOM
+    for x in range(side):
+        for y in range(side):
+            renderer.tile(drawing, TILE_ZOOM, x, y)
+
+
+def _rendered(n: int):
+    return render(fixture("mixed", n), IMAGE_SIZE)
+
+
+def _pillow_png(image) -> bytes:
+    """Pillow's default PNG settings, the baseline for the encoder presets."""
+    buf = io.BytesIO()
+    image.save(buf, "PNG")
+    return buf.getvalue()
+
+
+@functools.lru_cache(maxsize=1)
+def _scratch_dir() -> tempfile.TemporaryDirectory:
+    """Directory for the files cases write; removed when the run ends."""
+    return tempfile.TemporaryDirectory(prefix="cadhelp-bench-")
+
+
+def _cadb(n: int, generator: str = "mixed") -> Path:
+    path = Path(_scratch_dir().name) / f"{generator}-{n}.cadb"
+    return write_binary(fixture(generator, n), path)
+
+
+def _scratch(n: int) -> tuple[GeometryStore, Path]:
+    return fixture("mixed", n), Path(_scratch_dir().name) / "out.cadb"
+
+
+def _region(n: int) -> tuple[GeometryStore, Any]:
+    store = fixture("mixed", n)
+    minx, miny, maxx, maxy = total_bounds(store)
+    centre = shapely.Point((minx + maxx) / 2, (miny + maxy) / 2)
+    return store, centre.buffer((maxx - minx) / 3)
+
+
+def _quarter(store: GeometryStore) -> list[float]:
+    minx, miny, maxx, maxy = total_bounds(store)
+    return [minx, miny, (minx + maxx) / 2, (miny + maxy) / 2]
+
+
+# -- Flask endpoints -----------------------------------------------------------
+
+class Client:
+    """An API app with one drawing loaded, driven through Flask's test client."""
+
+    def __init__(self, n: int):
+        from cadhelp.api import create_app, get_state
+
+        self.app = create_app({
+            "RESULT_CACHE_DIR": False,  # time the work, not the shared cache
+            "INLINE_MAX_COST": math.inf,
+            "JOB_WORKERS": 1,
+        })
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            self.state = get_state()
+            self.drawing = self.state.drawings.add(fixture("mixed", n), f"mixed-{n}")
+        self.url = f"/drawings/{self.drawing.key}"
+        # Different content from the loaded drawing, whose key it would reuse.
+        self.upload = _cadb(n, "rooms").read_bytes()
+        self.etags: dict[str, str] = {}
+
+    def get(self, url: str, **kwargs):
+        response = self.client.get(url, **kwargs)
+        assert response.status_code == 200, response.get_data(as_text=True)
+        return response
+
+    def post(self, url: str, expect: int = 200, **kwargs):
+        response = self.client.post(url, **kwargs)
+        assert response.status_code == expect, response.get_data(as_text=True)
+        return response
+
+
+@functools.lru_cache(maxsize=1)
+def client(n: int) -> Client:
+    return Client(n)
+
+
+def _upload(c: Client) -> None:
+    key = c.post("/drawings?name=upload.cadb", 201, data=c.upload).get_json()["key"]
+    c.client.delete(f"/drawings/{key}")
+
+
+def _get_tiles(c: Client) -> None:
+    c.state.tiles.invalidate(c.drawing)
+    side = 1 << TILE_ZOOM
+    for x in range(side):
+        for y in range(side):
+            c.get(f"{c.url}/tiles/{TILE_ZOOM}/{x}/{y}.png")
+
+
+def _revalidate_tiles(c: Client) -> None:
+    """Conditional GETs of tiles the client already has, after the cache was dropped."""
+    c.state.tiles.invalidate(c.drawing)
+    side = 1 << TILE_ZOOM
+    for x in range(side):
+        for y in range(side):
+            url = f"{c.url}/tiles/{TILE_ZOOM}/{x}/{y}.png"
+            etag = c.etags.get(url) or c.get(url).headers["ETag"]
+            c.etags[url] = etag
+            response = c.client.get(url, headers={"If-None-Match": etag})
+            assert response.status_code == 304, response.status_code
+
+
+CASES = [
+    # geometry kernel
+    Case("geometry.bounds", functools.partial(fixture, "mixed"), bounds),
+    Case("geometry.areas", functools.partial(fixture, "mixed"), areas),
+    Case("geometry.perimeters", functools.partial(fixture, "mixed"), perimeters),
+    Case("geometry.centroids", functools.partial(fixture, "mixed"), centroids),
+    Case("geometry.transform", functools.partial(fixture, "mixed"),
+         lambda s: transform(s, rotation(30.0))),
+    Case("geometry.digest", functools.partial(fixture, "mixed"), GeometryStore.digest),
+    Case("geometry.subset", functools.partial(fixture, "mixed"),
+         lambda s: s.subset(s.layer_mask(["A-ROOM", "hatch"]))),
+    Case("geometry.concat", functools.partial(fixture, "mixed"),
+         lambda s: GeometryStore.concat([s, s])),
+    Case("geometry.simplify", functools.partial(fixture, "polylines"),
+         lambda s: simplify(s, 1.0), max_n=100_000),
+    Case("geometry.offset", functools.partial(fixture, "rooms"),
+         lambda s: OffsetCache().offset(s, 0.5), max_n=100_000),
+    # Shapely booleans
+    Case("boolean.union", functools.partial(fixture, "rooms"),
+         lambda s: union_layer(s, "A-ROOM"), max_n=100_000),
+    Case("boolean.clip_rect", functools.partial(fixture, "mixed"),
+         lambda s: clip_to_rect(s, _quarter(s))),
+    Case("boolean.intersect", _region, lambda st: intersect_layer(*st), max_n=100_000),
+    # spatial queries
+    Case("spatial.build", functools.partial(fixture, "mixed"), SpatialIndex.from_store),
+    Case("spatial.query_box", _indexed, _query_boxes),
+    Case("spatial.nearest", _indexed, _nearest),
+    Case("spatial.cull", _viewports, _cull),
+    # rendering
+    Case("render.pillow", functools.partial(fixture, "mixed"),
+         lambda s: render(s, IMAGE_SIZE, backend="pillow")),
+    Case("render.matplotlib", functools.partial(fixture, "mixed"),
+         lambda s: render(s, IMAGE_SIZE, backend="matplotlib"), max_n=100_000),
+    Case("render.tiles", _tiles, _all_tiles),
+    Case("render.lod", functools.partial(fixture, "polylines"),
+         lambda s: LodPyramid(s, total_bounds(s)).level(2), max_n=100_000),
+    Case("render.encode_png", _rendered, _pillow_png),
+    Case("render.encode_tile", _rendered, lambda im: encode(im, "tile")),
+    Case("render.encode_tile_webp", _rendered, lambda im: encode(im, "tile-webp")),
+    Case("render.encode_export", _rendered, lambda im: encode(im, "export")),
+    # file formats
+    Case("io.geojson_write", functools.partial(fixture, "mixed"),
+         lambda s: json.dumps(write_geojson(s)), max_n=100_000),
+    Case("io.geojson_read", lambda n: json.dumps(write_geojson(fixture("mixed", n))),
+         read_geojson, max_n=100_000),
+    Case("io.cadb_write", _scratch, lambda st: write_binary(*st)),
+    Case("io.cadb_read", _cadb, lambda path: read_binary(path, mmap=False)),
+    # analysis
+    Case("analysis.takeoff", functools.partial(fixture, "mixed"),
+         lambda s: takeoff(Drawing(s), ("layer", "kind"))),
+    Case("analysis.clearance", functools.partial(fixture, "rooms"),
+         lambda s: check_clearance(s, 0.3), max_n=100_000),
+    Case("trace.scan", synthetic.scanned_plan, lambda png: trace(png, workers=1),
+         max_n=10_000),
+    # Flask endpoints
+    Case("api.upload", client, _upload),
+    Case("api.tiles", client, _get_tiles),
+    Case("api.tiles_revalidate", client, _revalidate_tiles),
+    Case("api.render", client,
+         lambda c: c.post(f"{c.url}/ops/render", json={"width": 1024, "height": 1024})),
+    Case("api.takeoff", client, lambda c: c.get(f"{c.url}/takeoff?by=layer,kind")),
+    Case("api.metrics", client, lambda c: c.get("/metrics")),
+]
+
+
+# -- running -------------------------------------------------------------------
+
+def parse_scale(text: str) -> int:
+    text = text.strip().lower()
+    if text in SCALES:
+        return SCALES[text]
+    try:
+        return int(text)
+    except ValueError:
+        raise ValueError(f"bad scale {text!r}; use e.g. 1k, 10k, 100k, 1m or a number") from None
+
+
+def measure(case: Case, n: int, repeat: int) -> dict:
+    """Run ``case`` at scale ``n``; the row written to the results file."""
+    state = case.setup(n)
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        case.run(state)
+        times.append(time.perf_counter() - start)
+    return {
+        "case": case.name, "subsystem": case.subsystem, "n": n, "repeat": repeat,
+        "first_s": times[0], "min_s": min(times), "median_s": statistics.median(times),
+    }
+
+
+def _version(name: str) -> str | None:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def _git(*args: str) -> str | None:
+    try:
+        out = subprocess.run(["git", *args], capture_output=True, text=True, timeout=10,
+                             cwd=Path(__file__).resolve().parent)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() if out.returncode == 0 else None
+
+
+def environment() -> dict:
+    status = _git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(status) if status is not None else None,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "versions": {name: _version(name) for name in LIBRARIES},
+    }
+
+
+def compare(old: dict, new: dict, threshold: float) -> list[dict]:
+    """Rows of ``new`` that also ran in ``old``, with the ratio of their medians."""
+    before = {(r["case"], r["n"]): r for r in old["results"] if "median_s" in r}
+    rows = []
+    for r in new["results"]:
+        b = before.get((r["case"], r["n"]))
+        if b is None or "median_s" not in r:
+            continue
+        ratio = r["median_s"] / b["median_s"] if b["median_s"] else math.inf
+        rows.append({"case": r["case"], "n": r["n"], "before_s": b["median_s"],
+                     "after_s": r["median_s"], "ratio": ratio, "slower": ratio > threshold})
+    return rows
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1e3:10.2f} ms"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default="1k,10k,100k",
+                        help="comma-separated entity counts (1k, 10k, 100k, 1m or numbers)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case and scale")
+    parser.add_argument("--filter", default="",
+                        help="comma-separated prefixes of case names to run "
+                             "(e.g. render,api.tiles)")
+    parser.add_argument("--all", action="store_true", help="ignore the per-case scale limits")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="results file of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="median ratio above which a case counts as slower")
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    try:
+        scales = [parse_scale(s) for s in args.scales.split(",") if s.strip()]
+    except ValueError as exc:
+        parser.error(str(exc))
+    prefixes = tuple(p.strip() for p in args.filter.split(",") if p.strip())
+    cases = [c for c in CASES if not prefixes or c.name.startswith(prefixes)]
+    if not cases:
+        parser.error(f"no case matches {args.filter!r}")
+
+    results = {"environment": environment(), "results": []}
+    print(f"{'case':24s} {'n':>9s} {'first':>13s} {'min':>13s} {'median':>13s}")
+    for n in scales:
+        for case in cases:
+            if n > case.max_n and not args.all:
+                results["results"].append({"case": case.name, "subsystem": case.subsystem,
+                                           "n": n, "skipped": f"above max_n={case.max_n}"})
+                continue
+            row = measure(case, n, args.repeat)
+            results["results"].append(row)
+            print(f"{case.name:24s} {n:9d} {_ms(row['first_s'])} {_ms(row['min_s'])} "
+                  f"{_ms(row['median_s'])}", flush=True)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+    if args.compare:
+        rows = compare(json.loads(Path(args.compare).read_text()), results, args.threshold)
+        print(f"\n{'case':24s} {'n':>9s} {'before':>13s} {'after':>13s} {'ratio':>7s}")
+        for r in rows:
+            flag = "  slower" if r["slower"] else ""
+            print(f"{r['case']:24s} {r['n']:9d} {_ms(r['before_s'])} {_ms(r['after_s'])} "
+                  f"{r['ratio']:7.2f}{flag}")
+        if any(r["slower"] for r in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
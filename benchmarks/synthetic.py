@@ -0,0 +1,137 @@
+"""Synthetic CAD drawings built straight into NumPy arrays.
+
+Every generator is vectorized, so fixtures of a million entities take
+well under a second to build and setup time stays out of the way of the
+numbers being measured.  All of them are deterministic for a given
+``seed``.
+
+* :func:`room_grid`: a floor plan of rectangular rooms on a jittered grid;
+* :func:`random_polylines`: random-walk polylines (contours, cable runs);
+* :func:`hatch`: dense patches of short parallel segments;
+* :func:`mixed`: all three in one drawing, on separate layers;
+* :func:`scanned_plan`: PNG bytes of a noisy scanned floor plan, for tracing.
+"""
+
+from __future__ import annotations
+
+import io
+import math
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from cadhelp.geometry import LINESTRING, POLYGON, GeometryStore
+
+ROOM_LAYERS = ("A-ROOM", "A-WALL", "A-FURN", "A-EQPM")
+CELL = 10.0  # grid pitch of room_grid, in world units
+HATCH_LINES = 32  # segments per hatch patch
+SCAN_CELL = 24  # pixels per room in scanned_plan
+
+
+def _uniform(n: int, kind: int, vertices: int, coords: np.ndarray, layers=None,
+             layer_names=("0",)) -> GeometryStore:
+    """A store of ``n`` entities with ``vertices`` vertices each."""
+    offsets = np.arange(0, n * vertices + 1, vertices, dtype=np.int64)
+    return GeometryStore(coords.reshape(-1, 2), offsets, np.full(n, kind, dtype=np.uint8),
+                         layers, None, layer_names, validate=False)
+
+
+def room_grid(n: int, seed: int = 0) -> GeometryStore:
+    """``n`` rectangular rooms filling a square grid, spread over four layers."""
+    rng = np.random.default_rng(seed)
+    cols = math.ceil(math.sqrt(n))
+    i = np.arange(n)
+    origin = np.column_stack([i % cols, i // cols]) * CELL
+    origin += rng.uniform(0.0, 0.5, size=(n, 2))
+    w, h = rng.uniform(0.6 * CELL, 0.95 * CELL, size=(2, n))
+    x0, y0 = origin[:, 0], origin[:, 1]
+    coords = np.stack([
+        np.column_stack([x0, y0]), np.column_stack([x0 + w, y0]),
+        np.column_stack([x0 + w, y0 + h]), np.column_stack([x0, y0 + h]),
+    ], axis=1)
+    layers = rng.integers(0, len(ROOM_LAYERS), size=n)
+    return _uniform(n, POLYGON, 4, coords, layers, ROOM_LAYERS)
+
+
+def random_polylines(n: int, seed: int = 0, vertices: int = 16,
+                     extent: float | None = None) -> GeometryStore:
+    """``n`` random-walk polylines of ``vertices`` vertices each."""
+    rng = np.random.default_rng(seed)
+    extent = extent or CELL * math.ceil(math.sqrt(n))
+    start = rng.uniform(0.0, extent, size=(n, 1, 2))
+    steps = rng.normal(0.0, CELL / 4, size=(n, vertices - 1, 2))
+    coords = np.concatenate([start, start + np.cumsum(steps, axis=1)], axis=1)
+    return _uniform(n, LINESTRING, vertices, coords, None, ("contours",))
+
+
+def hatch(n: int, seed: int = 0, extent: float | None = None) -> GeometryStore:
+    """``n`` short segments in patches of :data:`HATCH_LINES` parallel lines at 45 degrees."""
+    rng = np.random.default_rng(seed)
+    patches = -(-n // HATCH_LINES)
+    extent = extent or CELL * math.ceil(math.sqrt(n))
+    origin = rng.uniform(0.0, extent, size=(patches, 2))
+    size = rng.uniform(2.0, 8.0, size=patches)
+    i = np.arange(n)
+    patch, k = i // HATCH_LINES, i % HATCH_LINES
+    # Line k runs corner to corner through the patch, shifted along its normal.
+    t = (k + 0.5) / HATCH_LINES * 2.0 - 1.0
+    s = size[patch]
+    half = s * (1.0 - np.abs(t)) / 2
+    cx = origin[patch, 0] + s / 2 + t * s / 2
+    cy = origin[patch, 1] + s / 2 - t * s / 2
+    coords = np.stack([np.column_stack([cx - half, cy - half]),
+                       np.column_stack([cx + half, cy + half])], axis=1)
+    return _uniform(n, LINESTRING, 2, coords, None, ("hatch",))
+
+
+def mixed(n: int, seed: int = 0) -> GeometryStore:
+    """Half rooms, 30% polylines and 20% hatch segments over the same area."""
+    rooms = room_grid(n // 2, seed)
+    extent = CELL * math.ceil(math.sqrt(max(n // 2, 1)))
+    lines = random_polylines(n * 3 // 10, seed + 1, extent=extent)
+    fill = hatch(n - len(rooms) - len(lines), seed + 2, extent=extent)
+    store = GeometryStore.concat([rooms, lines, fill])
+    return GeometryStore(store.coords, store.offsets, store.kinds, store.layers,
+                         np.arange(len(store), dtype=np.int64), store.layer_names,
+                         validate=False)
+
+
+def scanned_plan(n: int, seed: int = 0, noise: float = 0.002) -> bytes:
+    """PNG of a scanned plan with about ``n`` rooms: walls, door gaps, columns and specks.
+
+    Walls are 3 pixels thick on a :data:`SCAN_CELL` pixel grid, so the image
+    grows with ``n`` (about 60 megapixels for 100k rooms).
+    """
+    rng = np.random.default_rng(seed)
+    cols = math.ceil(math.sqrt(n))
+    rows = -(-n // cols)
+    size = (cols * SCAN_CELL + 8, rows * SCAN_CELL + 8)
+    ink = np.zeros((size[1], size[0]), dtype=bool)
+    lines = np.arange(rows + 1) * SCAN_CELL + 4
+    for w in range(3):
+        ink[lines + w, 4:-4] = True
+    lines = np.arange(cols + 1) * SCAN_CELL + 4
+    for w in range(3):
+        ink[4:-4, lines + w] = True
+    # A door in the bottom wall of most rooms.
+    door = rng.random(rows * cols) < 0.7
+    r, c = np.divmod(np.flatnonzero(door), cols)
+    start = c * SCAN_CELL + 4 + rng.integers(6, SCAN_CELL - 10, size=len(c))
+    for dx in range(6):
+        ink[r[:, None] * SCAN_CELL + 4 + np.arange(3), (start + dx)[:, None]] = False
+    ink ^= rng.random(ink.shape) < noise
+    image = Image.fromarray(np.where(ink, 0, 255).astype(np.uint8), "L")
+    draw = ImageDraw.Draw(image)
+    for x, y in rng.integers(0, min(size) - SCAN_CELL, size=(max(n // 50, 1), 2)):
+        draw.ellipse((x, y, x + SCAN_CELL // 2, y + SCAN_CELL // 2), outline=0, width=2)
+    buf = io.BytesIO()
+    image.save(buf, "PNG", dpi=(100, 100))
+    return buf.getvalue()
+
+
+GENERATORS = {
+    "rooms": room_grid,
+    "polylines": random_polylines,
+    "hatch": hatch,
+    "mixed": mixed,
+}
@@ -0,0 +1,3 @@
+"""CAD helper: geometry, rendering and analysis tools for 2D drawings."""
+
+__version__ = "0.1.0"
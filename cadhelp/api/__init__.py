@@ -0,0 +1,103 @@
+"""Flask API serving drawings to headless clients and the web viewer."""
+
+from __future__ import annotations
+
+from typing import Any, Mapping
+
+from flask import Flask, jsonify
+from werkzeug.exceptions import HTTPException
+
+from ..drawing import DrawingRegistry
+from ..jobs import JobManager
+from ..render import TileCache, TileRenderer
+from ..resultcache import MAX_BYTES, ResultCache
+from ..voice import VoicePipeline, get_recognizer
+from .drawings import bp as drawings_bp
+from .jobs import bp as jobs_bp
+from .metrics import bp as metrics_bp
+from .reports import bp as reports_bp
+from .state import EXTENSION, AppState, get_state
+from .tiles import bp as tiles_bp
+from .voice import bp as voice_bp
+
+DEFAULTS = {
+    "TILE_SIZE": 256,
+    "TILE_BACKEND": "pillow",
+    "TILE_CACHE_BYTES": 256 << 20,
+    "TILE_CACHE_DIR": None,
+    # Encoding preset (see cadhelp.render.encode) per tile URL suffix.
+    "TILE_ENCODINGS": {"png": "tile", "webp": "tile-webp"},
+    # Directory of memory-mapped .cadb drawings shared by all workers.
+    "DRAWING_DIR": None,
+    # Operations whose estimated cost (~vertices) is below this run inline.
+    "INLINE_MAX_COST": 50_000,
+    "JOB_WORKERS": None,
+    "JOB_MP_CONTEXT": "spawn",
+    "JOB_TTL": 3600,
+    # Content-addressed result cache shared with other processes (the
+    # Streamlit app, other workers); None uses $CADHELP_CACHE_DIR or
+    # ~/.cache/cadhelp, False disables it.
+    "RESULT_CACHE_DIR": None,
+    "RESULT_CACHE_BYTES": MAX_BYTES,
+    # Offline speech backend and its options (e.g. {"model_path": ...});
+    # the model starts loading when the app is created.
+    "VOICE_BACKEND": "vosk",
+    "VOICE_OPTIONS": {},
+    # Speech recognition threads and utterances allowed to wait for them.
+    "VOICE_WORKERS": 1,
+    "VOICE_MAX_PENDING": 8,
+}
+
+
+def create_app(
+    config: Mapping[str, Any] | None = None,
+    drawings: DrawingRegistry | None = None,
+) -> Flask:
+    """Build the API application.
+
+    Args:
+        config: overrides for :data:`DEFAULTS` and Flask settings.
+        drawings: registry to serve; a fresh empty one by default.
+    """
+    app = Flask(__name__)
+    app.config.from_mapping(DEFAULTS)
+    if config:
+        app.config.from_mapping(config)
+
+    cache = TileCache(app.config["TILE_CACHE_BYTES"], app.config["TILE_CACHE_DIR"])
+    results_dir = app.config["RESULT_CACHE_DIR"]
+    app.extensions[EXTENSION] = AppState(
+        drawings=(
+            drawings if drawings is not None else DrawingRegistry(app.config["DRAWING_DIR"])
+        ),
+        tiles=TileRenderer(
+            cache, tile_size=app.config["TILE_SIZE"], backend=app.config["TILE_BACKEND"]
+        ),
+        jobs=JobManager(
+            app.config["JOB_WORKERS"], app.config["JOB_MP_CONTEXT"], app.config["JOB_TTL"]
+        ),
+        voice=VoicePipeline(
+            get_recognizer(app.config["VOICE_BACKEND"], **app.config["VOICE_OPTIONS"]),
+            workers=app.config["VOICE_WORKERS"], max_pending=app.config["VOICE_MAX_PENDING"],
+        ),
+        results=(
+            None if results_dir is False
+            else ResultCache(results_dir, app.config["RESULT_CACHE_BYTES"])
+        ),
+    )
+
+    app.register_blueprint(drawings_bp)
+    app.register_blueprint(jobs_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(reports_bp)
+    app.register_blueprint(tiles_bp)
+    app.register_blueprint(voice_bp)
+
+    @app.errorhandler(HTTPException)
+    def json_error(exc: HTTPException):
+        return jsonify({"error": exc.name, "description": exc.description}), exc.code
+
+    return app
+
+
+__all__ = ["AppState", "DEFAULTS", "create_app", "get_state"]
@@ -0,0 +1,178 @@
+"""Drawing upload and operation endpoints.
+
+``POST /drawings`` registers a drawing, and
+``POST /drawings/<key>/ops/<op>`` runs an operation on it.  Operations
+estimated to be cheap run inline and answer ``200`` with the result.
+Heavier ones (or any with ``?async=1``) go to the job workers and
+answer ``202`` with a job to poll under ``/jobs/<id>``.  So do uploads
+of raster scans, which are traced in the job workers rather than in the
+request.
+
+Parsed uploads and operation results go through the app's
+:class:`cadhelp.resultcache.ResultCache`, keyed by content, so repeating
+an upload or an operation (from this worker, another one or the
+Streamlit app) is answered from disk.  A cached result is returned with
+``200`` even when ``?async=1`` asked for a job.
+
+Operations are deterministic, so a result's ETag is derived from the
+drawing's content, the operation and its parameters; a request with a
+matching ``If-None-Match`` gets ``304`` before anything is computed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from pathlib import PurePath
+
+from flask import Blueprint, Response, abort, current_app, jsonify, request, url_for
+
+from .. import ops
+from ..io import read_drawing
+from ..resultcache import cache_key, parse_key
+from ..trace import IMAGE_SUFFIXES, read_image
+from .results import not_modified, to_response
+from .state import get_drawing, get_state
+
+bp = Blueprint("drawings", __name__)
+
+HASH_CHUNK = 1 << 20
+
+
+def _summary(drawing) -> dict:
+    store = drawing.store
+    return {
+        "key": drawing.key, "name": drawing.name, "entities": len(store),
+        "vertices": store.num_vertices, "layers": list(store.layer_names),
+        "extent": list(drawing.extent),
+    }
+
+
+@bp.post("/drawings")
+def upload():
+    """Accept a multipart ``file`` field, or a raw body with ``?name=``.
+
+    The upload is parsed straight from the request stream (Werkzeug spools
+    large multipart files to disk), so it is never read into memory whole.
+    Raster scans go to the job workers to be traced, as compressed bytes:
+    the answer is ``202`` with a job whose result is the traced drawing.
+    Once done, the drawing is registered and the job's ``drawing`` is its
+    key.
+    """
+    if "file" in request.files:
+        f = request.files["file"]
+        name, stream = f.filename or "upload", f.stream
+    else:
+        name, stream = request.args.get("name", ""), request.stream
+    state = get_state()
+    results = state.results
+    content = _content_hash(stream) if results is not None else None
+    store = results.get(parse_key(content, name)) if content is not None else None
+    if store is None and PurePath(name).suffix.lower() in IMAGE_SUFFIXES:
+        job = state.jobs.submit("trace", "", read_image, stream.read())
+        entry = parse_key(content, name) if content is not None else None
+        job.future.add_done_callback(lambda f: _register(state, job, name, entry, f))
+        return _accepted(job)
+    if store is None:
+        try:
+            store = read_drawing(stream, name)
+        except ValueError as exc:
+            abort(400, description=str(exc))
+        if content is not None:
+            results.put(parse_key(content, name), store)
+    drawing = state.drawings.add(store, name)
+    return jsonify(_summary(drawing)), 201
+
+
+def _register(state, job, name: str, entry: str | None, future) -> None:
+    """Add a traced upload to the registry (and the result cache) once done."""
+    if future.cancelled() or future.exception() is not None:
+        return
+    store = future.result()
+    if entry is not None:
+        state.results.put(entry, store)
+    job.drawing = state.drawings.add(store, name).key
+
+
+def _accepted(job) -> tuple[Response, int, dict]:
+    """``202`` with the job and where to poll it."""
+    body = job.to_dict()
+    body["status_url"] = url_for("jobs.status", job_id=job.id)
+    body["result_url"] = url_for("jobs.result", job_id=job.id)
+    return jsonify(body), 202, {"Location": body["status_url"]}
+
+
+def _content_hash(stream) -> str | None:
+    """Hash of a seekable upload, rewound afterwards; ``None`` for a pipe."""
+    try:
+        if not stream.seekable():
+            return None
+    except (AttributeError, ValueError):
+        return None
+    h = hashlib.blake2b(digest_size=16)
+    for chunk in iter(lambda: stream.read(HASH_CHUNK), b""):
+        h.update(chunk)
+    stream.seek(0)
+    return h.hexdigest()
+
+
+@bp.get("/drawings")
+def list_drawings() -> Response:
+    registry = get_state().drawings
+    return jsonify([_summary(registry.get(k)) for k in registry.keys()])
+
+
+@bp.get("/drawings/<key>")
+def show(key: str) -> Response:
+    return jsonify(_summary(get_drawing(key)))
+
+
+@bp.delete("/drawings/<key>")
+def delete(key: str) -> tuple[str, int]:
+    get_drawing(key)
+    get_state().drawings.remove(key)
+    return "", 204
+
+
+@bp.post("/drawings/<key>/ops/<op>")
+def run_op(key: str, op: str):
+    drawing = get_drawing(key)
+    if op not in ops.OPERATIONS:
+        abort(404, description=f"unknown operation {op!r}")
+    params = request.get_json(silent=True) or {}
+    if not isinstance(params, dict):
+        abort(400, description="parameters must be a JSON object")
+
+    entry = cache_key(drawing.digest, op, params)
+    unchanged = not_modified(entry)
+    if unchanged is not None:
+        return unchanged
+    results = get_state().results
+    if results is not None:
+        cached = results.get(entry)
+        if cached is not None:
+            return to_response(cached, entry)
+
+    force_async = request.args.get("async") in ("1", "true")
+    cheap = ops.estimate_cost(op, drawing.store) <= current_app.config["INLINE_MAX_COST"]
+    if not force_async and cheap:
+        try:
+            result = ops.run(op, drawing.store, params)
+        except (ValueError, KeyError) as exc:
+            abort(400, description=str(exc.args[0] if exc.args else exc))
+        if results is not None:
+            results.put(entry, result)
+        return to_response(result, entry)
+
+    jobs = get_state().jobs
+    if drawing.path is not None:
+        job = jobs.submit(op, key, ops.run_file, op, str(drawing.path), params)
+    else:
+        job = jobs.submit(op, key, ops.run, op, drawing.store, params)
+    if results is not None:
+        job.future.add_done_callback(lambda f: _remember(results, entry, f))
+    return _accepted(job)
+
+
+def _remember(results, entry: str, future) -> None:
+    if not future.cancelled() and future.exception() is None:
+        results.put(entry, future.result())
@@ -0,0 +1,53 @@
+"""Job polling endpoints for operations running in worker processes.
+
+Job status includes the ``progress`` fraction and ``message`` last
+reported by the operation, and ``DELETE /jobs/<id>`` stops a job whether
+it is still queued or already running.  A job that failed on bad
+parameters answers its result with ``400``, as the same request run
+inline would.
+"""
+
+from __future__ import annotations
+
+from flask import Blueprint, Response, abort, jsonify
+
+from ..jobs import DONE, FAILED, Job
+from .results import to_response
+from .state import get_state
+
+bp = Blueprint("jobs", __name__)
+
+
+def _job(job_id: str) -> Job:
+    try:
+        return get_state().jobs.get(job_id)
+    except KeyError:
+        abort(404, description=f"unknown job {job_id!r}")
+
+
+@bp.get("/jobs")
+def list_jobs() -> Response:
+    return jsonify([job.to_dict() for job in get_state().jobs.jobs()])
+
+
+@bp.get("/jobs/<job_id>")
+def status(job_id: str) -> Response:
+    return jsonify(_job(job_id).to_dict())
+
+
+@bp.get("/jobs/<job_id>/result")
+def result(job_id: str):
+    """The job's result once done; ``409`` while pending, ``400`` or ``500`` if it failed."""
+    job = _job(job_id)
+    state = job.status
+    if state == DONE:
+        return to_response(job.future.result())
+    if state == FAILED:
+        return jsonify(job.to_dict()), 400 if job.bad_input else 500
+    return jsonify(job.to_dict()), 409
+
+
+@bp.delete("/jobs/<job_id>")
+def cancel(job_id: str) -> Response:
+    cancelled = get_state().jobs.cancel(_job(job_id).id)
+    return jsonify({"id": job_id, "cancelled": cancelled})
@@ -0,0 +1,36 @@
+"""``GET /metrics``: stage latencies and counters for Prometheus.
+
+Besides the histograms and counters of :mod:`cadhelp.instrument`, each
+scrape reports the tile cache, result cache, job and voice queue state
+of this worker process.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+
+from flask import Blueprint, Response
+
+from ..instrument import prometheus
+from ..jobs import CANCELLED, DONE, FAILED, QUEUED, RUNNING
+from .state import get_state
+
+bp = Blueprint("metrics", __name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@bp.get("/metrics")
+def metrics() -> Response:
+    state = get_state()
+    tiles = state.tiles.cache.stats()
+    gauges = {"tile_cache_entries": tiles["entries"], "tile_cache_bytes": tiles["bytes"],
+              "voice_pending": state.voice.pending}
+    counters = {"tile_cache_hits": tiles["hits"], "tile_cache_disk_hits": tiles["disk_hits"],
+                "tile_cache_misses": tiles["misses"], "voice_dropped": state.voice.dropped}
+    jobs = Counter(job.status for job in state.jobs.jobs())
+    gauges.update({f"jobs_{status}": jobs[status]
+                   for status in (QUEUED, RUNNING, DONE, FAILED, CANCELLED)})
+    if state.results is not None:
+        counters.update({f"result_cache_{k}": v for k, v in state.results.stats().items()})
+    return Response(prometheus(gauges, counters), content_type=CONTENT_TYPE)
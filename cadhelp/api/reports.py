@@ -0,0 +1,64 @@
+"""Quantity takeoff reports.
+
+``GET /drawings/<key>/takeoff?by=layer,kind&layers=...&format=csv`` (or
+``POST`` with the same fields as JSON) answers with the report as JSON
+or CSV.  ``materials`` maps layer names to materials for
+``by=material``: a JSON object when posted, or
+``materials=A-WALL:concrete,A-FURN:timber`` in a query string.
+Reports reuse the drawing's cached per-entity metrics, run inline and
+are kept in the shared result cache.
+"""
+
+from __future__ import annotations
+
+from flask import Blueprint, Response, abort, jsonify, request
+
+from ..takeoff import cached_takeoff
+from .state import get_drawing, get_state
+
+bp = Blueprint("reports", __name__)
+
+
+def _list(value) -> list[str]:
+    if isinstance(value, str):
+        return [v for v in value.split(",") if v]
+    if value is None:
+        return []
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ValueError(f"expected a list of names, got {value!r}")
+    return value
+
+
+def _materials(value):
+    """Parse ``layer:material,...`` from a query string; other values pass through."""
+    if not isinstance(value, str):
+        return value
+    out = {}
+    for item in _list(value):
+        layer, sep, material = item.rpartition(":")
+        if not sep or not layer or not material:
+            raise ValueError(f"materials must be layer:material pairs, got {item!r}")
+        out[layer] = material
+    return out
+
+
+@bp.route("/drawings/<key>/takeoff", methods=["GET", "POST"])
+def report(key: str):
+    drawing = get_drawing(key)
+    params = request.args.to_dict()
+    if request.method == "POST":
+        body = request.get_json(silent=True) or {}
+        if not isinstance(body, dict):
+            abort(400, description="parameters must be a JSON object")
+        params.update(body)
+    try:
+        result = cached_takeoff(drawing, _list(params.get("by", "layer")),
+                                _list(params.get("layers")) or None,
+                                _materials(params.get("materials")), get_state().results)
+    except (KeyError, ValueError) as exc:
+        abort(400, description=str(exc).strip("'\""))
+    if params.get("format", "json") == "csv":
+        return Response(result.to_csv(), mimetype="text/csv", headers={
+            "Content-Disposition": f'attachment; filename="{drawing.name}-takeoff.csv"',
+        })
+    return jsonify(result.to_dict())
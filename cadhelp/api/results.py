@@ -0,0 +1,71 @@
+"""Encoding operation results as HTTP responses.
+
+Responses carry an ``ETag``.  Callers that can name a result before
+computing it (a tile, an operation on content-addressed drawing data)
+check :func:`not_modified` first, so a client revalidating an unchanged
+result costs neither the work nor the bytes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+from typing import Any
+
+import shapely
+from flask import Response, jsonify, request, send_file
+
+from ..geometry import GeometryStore
+from ..io import write_geojson
+from ..render import sniff_mimetype
+
+
+def not_modified(etag: str, max_age: int | None = None) -> Response | None:
+    """A ``304`` for a conditional request that already has ``etag``, else ``None``."""
+    if not request.if_none_match.contains(etag):
+        return None
+    response = Response(status=304)
+    response.set_etag(etag)
+    _cache_for(response, max_age)
+    return response
+
+
+def _cache_for(response: Response, max_age: int | None) -> None:
+    if max_age:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+    else:
+        response.cache_control.no_cache = True
+
+
+def image_response(data: bytes, etag: str | None = None, max_age: int | None = None) -> Response:
+    """Stream encoded image bytes, answering conditional and range requests.
+
+    Without ``etag``, the bytes are hashed for one.  ``max_age`` lets
+    clients reuse the image without asking; otherwise they revalidate.
+    """
+    if etag is None:
+        etag = hashlib.blake2b(data, digest_size=16).hexdigest()
+    response = send_file(io.BytesIO(data), mimetype=sniff_mimetype(data), etag=etag,
+                         conditional=True, max_age=max_age)
+    _cache_for(response, max_age)
+    return response
+
+
+def to_response(result: Any, etag: str | None = None) -> Response:
+    """Image bytes, a store (as GeoJSON), a Shapely geometry or plain JSON data."""
+    if isinstance(result, bytes):
+        return image_response(result, etag)
+    if isinstance(result, GeometryStore):
+        response = jsonify(write_geojson(result))
+    elif isinstance(result, shapely.Geometry):
+        response = jsonify({"type": "Feature", "properties": {},
+                            "geometry": json.loads(shapely.to_geojson(result))})
+    else:
+        response = jsonify(result)
+    if etag is not None:
+        response.set_etag(etag)
+        _cache_for(response, None)
+        response.make_conditional(request)
+    return response
@@ -0,0 +1,36 @@
+"""Per-application services shared by the API blueprints."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from flask import abort, current_app
+
+from ..drawing import Drawing, DrawingRegistry
+from ..jobs import JobManager
+from ..render import TileRenderer
+from ..resultcache import ResultCache
+from ..voice import VoicePipeline
+
+EXTENSION = "cadhelp"
+
+
+@dataclass
+class AppState:
+    drawings: DrawingRegistry
+    tiles: TileRenderer
+    jobs: JobManager
+    voice: VoicePipeline
+    results: ResultCache | None = None
+
+
+def get_state() -> AppState:
+    return current_app.extensions[EXTENSION]
+
+
+def get_drawing(key: str) -> Drawing:
+    """Look up a registered drawing or answer 404."""
+    try:
+        return get_state().drawings.get(key)
+    except KeyError:
+        abort(404, description=f"unknown drawing {key!r}")
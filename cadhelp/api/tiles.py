@@ -0,0 +1,37 @@
+"""Tile endpoint: ``GET /drawings/<key>/tiles/<z>/<x>/<y>.png`` (or ``.webp``).
+
+Each format is encoded with the preset named in the app's
+``TILE_ENCODINGS``.  Tiles carry an ETag computed from the drawing's
+content without rendering, so a revalidation with ``If-None-Match``
+answers ``304`` at no cost.
+"""
+
+from __future__ import annotations
+
+from flask import Blueprint, Response, abort, current_app
+
+from .results import image_response, not_modified
+from .state import get_drawing, get_state
+
+bp = Blueprint("tiles", __name__)
+
+# Tiles are keyed by drawing content, so they never change under a URL.
+MAX_AGE = 86400
+
+
+@bp.get("/drawings/<key>/tiles/<int:z>/<int:x>/<int:y>.<fmt>")
+def tile(key: str, z: int, x: int, y: int, fmt: str) -> Response:
+    encoding = current_app.config["TILE_ENCODINGS"].get(fmt)
+    if encoding is None:
+        abort(404, description=f"unsupported tile format {fmt!r}")
+    drawing = get_drawing(key)
+    tiles = get_state().tiles
+    etag = tiles.etag(drawing, z, x, y, encoding=encoding)
+    cached = not_modified(etag, MAX_AGE)
+    if cached is not None:
+        return cached
+    try:
+        data = tiles.tile(drawing, z, x, y, encoding=encoding)
+    except ValueError as exc:
+        abort(404, description=str(exc))
+    return image_response(data, etag, MAX_AGE)
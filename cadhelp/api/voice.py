@@ -0,0 +1,52 @@
+"""Voice command endpoints.
+
+``POST /voice`` takes a recorded utterance (WAV, AIFF or FLAC, as a
+multipart ``file`` field or the raw body) and answers ``202`` at once;
+recognition runs on the pipeline's worker threads.  Clients read the
+resulting events from ``GET /voice/events?after=<seq>``, optionally
+long-polling with ``&wait=<seconds>``.  ``GET /voice/stats`` reports the
+backend, its model load time and recent per-utterance latencies.
+"""
+
+from __future__ import annotations
+
+from flask import Blueprint, Response, abort, jsonify, request
+
+from .state import get_state
+
+bp = Blueprint("voice", __name__)
+
+MAX_WAIT = 30.0
+
+
+@bp.post("/voice")
+def submit() -> tuple[Response, int]:
+    f = request.files.get("file")
+    data = f.read() if f is not None else request.get_data()
+    voice = get_state().voice
+    try:
+        voice.submit_wav(data)
+    except ValueError as exc:
+        abort(400, description=str(exc))
+    return jsonify({"pending": voice.pending, "dropped": voice.dropped}), 202
+
+
+@bp.get("/voice/events")
+def events() -> Response:
+    after = request.args.get("after", 0, type=int)
+    wait = min(request.args.get("wait", 0.0, type=float), MAX_WAIT)
+    voice = get_state().voice
+    found = voice.wait(after, wait) if wait > 0 else voice.events(after)
+    return jsonify({
+        "events": [e.to_dict() for e in found],
+        "last": found[-1].seq if found else after,
+    })
+
+
+@bp.get("/voice/stats")
+def stats() -> Response:
+    voice = get_state().voice
+    recognizer = voice.recognize
+    out = recognizer.stats() if hasattr(recognizer, "stats") else {}
+    out.update(pending=voice.pending, dropped=voice.dropped)
+    return jsonify(out)
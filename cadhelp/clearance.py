@@ -0,0 +1,177 @@
+"""Design-rule check: minimum clearance between entities.
+
+Every entity on the checked layers is converted to Shapely once,
+prepared, and packed into an ``STRtree``.  Entities are then queried in
+chunks with the ``dwithin`` predicate, which uses the tree to find
+candidates and the prepared geometries to test them, so the cost grows
+with the number of close pairs rather than with the square of the
+entity count.  Violations are yielded chunk by chunk as they are found.
+
+:func:`check_parallel` splits the drawing into vertical strips and checks
+each in a worker process.  A strip takes every entity whose bounding box,
+grown by the clearance, overlaps it; a pair is reported only by the strip
+containing ``max(minx_a, minx_b)``, which always holds both entities, so
+every violation is reported exactly once.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterator, NamedTuple
+
+import numpy as np
+import shapely
+from shapely import STRtree
+
+from .geometry import GeometryStore, bounds, to_shapely
+from .jobs import report_progress
+
+CHUNK_SIZE = 10_000
+
+
+class Violation(NamedTuple):
+    a: int  # entity ids, a < b
+    b: int
+    distance: float
+    x: float  # midpoint of the shortest line between the two
+    y: float
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+
+def _layer_masks(store: GeometryStore, layers, against) -> tuple[np.ndarray, np.ndarray]:
+    first = np.ones(len(store), bool) if not layers else store.layer_mask(layers)
+    second = first if not against else store.layer_mask(against)
+    return first, second
+
+
+def iter_violations(
+    store: GeometryStore,
+    min_distance: float,
+    layers=None,
+    against=None,
+    chunk_size: int = CHUNK_SIZE,
+    _owner: tuple[float, float] | None = None,
+) -> Iterator[Violation]:
+    """Yield every pair of entities closer than ``min_distance``.
+
+    Args:
+        store: drawing to check.
+        min_distance: required clearance; touching or overlapping entities
+            are reported with distance 0.
+        layers: layer name(s) to check; all layers by default.
+        against: check ``layers`` against these layers instead of among
+            themselves (e.g. furniture against walls).
+        chunk_size: entities queried per batch, the streaming granularity.
+    """
+    if min_distance <= 0:
+        raise ValueError("min_distance must be positive")
+    first, second = _layer_masks(store, layers, against)
+    candidates = first | second
+    sub = store.subset(candidates)
+    in_first, in_second = first[candidates], second[candidates]
+    geoms = to_shapely(sub)
+    shapely.prepare(geoms)
+    tree = STRtree(geoms)
+    minx = bounds(sub)[:, 0] if _owner is not None else None
+
+    queries = np.flatnonzero(in_first)
+    for start in range(0, len(queries), chunk_size):
+        if _owner is None:
+            report_progress(start / len(queries), "Checking clearance")
+        query = queries[start:start + chunk_size]
+        src, hit = tree.query(geoms[query], predicate="dwithin", distance=min_distance)
+        i, j = query[src], hit
+        # Each unordered pair once: within one layer set keep i < j; across
+        # sets keep every first-second pair that is not the same entity.
+        keep = in_second[j] & (i != j)
+        if not against:
+            keep &= i < j
+        else:
+            keep &= ~(in_first[j] & in_second[i] & (j < i))
+        i, j = i[keep], j[keep]
+        if _owner is not None:
+            x = np.maximum(minx[i], minx[j])
+            own = (x >= _owner[0]) & (x < _owner[1])
+            i, j = i[own], j[own]
+        if not len(i):
+            continue
+        d = shapely.distance(geoms[i], geoms[j])
+        close = d < min_distance
+        i, j, d = i[close], j[close], d[close]
+        if not len(i):
+            continue
+        lines = shapely.shortest_line(geoms[i], geoms[j])
+        mid = shapely.get_coordinates(
+            shapely.line_interpolate_point(lines, 0.5, normalized=True)
+        )
+        a, b = sub.ids[i], sub.ids[j]
+        for k in np.lexsort((b, a)):
+            lo, hi = (a[k], b[k]) if a[k] < b[k] else (b[k], a[k])
+            yield Violation(int(lo), int(hi), float(d[k]), float(mid[k, 0]), float(mid[k, 1]))
+
+
+def check(store: GeometryStore, min_distance: float, layers=None, against=None,
+          limit: int | None = None) -> list[Violation]:
+    """All violations (or the first ``limit``) as a list."""
+    out = []
+    for v in iter_violations(store, min_distance, layers, against):
+        out.append(v)
+        if limit is not None and len(out) >= limit:
+            break
+    return out
+
+
+def _strip(store: GeometryStore, min_distance: float, layers, against,
+           lo: float, hi: float) -> list[Violation]:
+    return list(iter_violations(store, min_distance, layers, against, _owner=(lo, hi)))
+
+
+def partitions(store: GeometryStore, min_distance: float, count: int):
+    """Split ``store`` into ``count`` vertical strips of about equal entity count.
+
+    Yields ``(substore, lo, hi)``: the entities a strip needs and the
+    x range of pairs it owns.
+    """
+    b = bounds(store)
+    if not len(b):
+        return
+    cuts = np.quantile((b[:, 0] + b[:, 2]) / 2, np.linspace(0, 1, count + 1)[1:-1])
+    edges = np.concatenate([[-np.inf], np.unique(cuts), [np.inf]])
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        near = (b[:, 2] + min_distance >= lo) & (b[:, 0] - min_distance < hi)
+        if near.any():
+            yield store.subset(near), float(lo), float(hi)
+
+
+def check_parallel(store: GeometryStore, min_distance: float, layers=None, against=None,
+                   workers: int | None = None, strips: int | None = None,
+                   mp_context: str = "spawn") -> Iterator[Violation]:
+    """Like :func:`iter_violations`, split by spatial strips over worker processes.
+
+    Violations stream out strip by strip as workers finish, so the order
+    differs from :func:`iter_violations`.
+
+    Args:
+        workers: worker processes; ``os.cpu_count()`` by default.
+        strips: number of strips; four per worker by default, so results
+            start arriving early and uneven strips balance out.
+    """
+    if min_distance <= 0:
+        raise ValueError("min_distance must be positive")
+    first, second = _layer_masks(store, layers, against)
+    store = store.subset(first | second)
+    workers = workers or os.cpu_count() or 1
+    count = strips or 4 * workers
+    ctx = multiprocessing.get_context(mp_context)
+    with ProcessPoolExecutor(workers, mp_context=ctx) as pool:
+        futures = [
+            pool.submit(_strip, part, min_distance, layers, against, lo, hi)
+            for part, lo, hi in partitions(store, min_distance, count)
+        ]
+        for done, future in enumerate(as_completed(futures), 1):
+            report_progress(done / len(futures), "Checking clearance")
+            yield from future.result()
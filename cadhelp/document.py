@@ -0,0 +1,252 @@
+"""Editable drawings with incremental derived data and undo/redo.
+
+A :class:`Document` is a :class:`Drawing` that can be edited.  Every
+change is an :class:`Edit`: the old versions of the entities it touched
+and their new versions, each a small :class:`GeometryStore`.  Applying an
+edit removes the ``before`` entities and appends the ``after`` ones;
+undoing applies the same edit the other way round, so the history holds
+only touched entities, never snapshots of the whole drawing.
+
+Derived data is patched rather than rebuilt.  The spatial index gets the
+touched ids removed and re-inserted; per-entity bounds, metrics and the
+level-of-detail pyramid keep their untouched rows and compute only the
+new ones.  Each edit's :attr:`Edit.dirty` rectangle tells tile caches
+which tiles to drop (see :meth:`cadhelp.render.TileRenderer.invalidate`).
+Derived data that has not been computed yet stays lazy.
+
+Edited entities move to the end of the draw order; undo restores their
+geometry, layer and id but not their original position in it.
+"""
+
+from __future__ import annotations
+
+import threading
+import uuid
+from collections import deque
+from typing import Callable, Iterable, NamedTuple
+
+import numpy as np
+
+from .drawing import Drawing
+from .geometry import (
+    GeometryBuilder,
+    GeometryStore,
+    apply_matrix,
+    areas,
+    bounds,
+    perimeters,
+    total_bounds,
+    translation,
+)
+
+MAX_HISTORY = 1000
+
+
+class Edit(NamedTuple):
+    """One reversible change: ``before`` entities are replaced by ``after``."""
+
+    before: GeometryStore
+    after: GeometryStore
+    label: str = ""
+
+    @property
+    def touched(self) -> np.ndarray:
+        """Ids of every entity removed, added or changed."""
+        return np.union1d(self.before.ids, self.after.ids)
+
+    @property
+    def dirty(self) -> tuple[float, float, float, float] | None:
+        """Rectangle covering the old and new geometry, or ``None`` if empty."""
+        b = np.vstack([total_bounds(self.before), total_bounds(self.after)])
+        if np.isnan(b).all():
+            return None
+        return (float(np.nanmin(b[:, 0])), float(np.nanmin(b[:, 1])),
+                float(np.nanmax(b[:, 2])), float(np.nanmax(b[:, 3])))
+
+    @property
+    def nbytes(self) -> int:
+        return self.before.nbytes + self.after.nbytes
+
+    def inverse(self) -> "Edit":
+        return Edit(self.after, self.before, self.label)
+
+
+class Document(Drawing):
+    """A drawing that records edits and keeps derived data up to date.
+
+    Unlike a plain :class:`Drawing`, whose key is its content hash, a
+    document's key is a fixed random id: its content changes, and two
+    sessions editing the same upload must not share tiles.
+
+    Args:
+        store: initial content.
+        name: display name.
+        key: stable id; a random one by default.
+        max_history: edits kept for undo.
+    """
+
+    def __init__(self, store: GeometryStore, name: str | None = None,
+                 key: str | None = None, max_history: int = MAX_HISTORY):
+        super().__init__(store, name, key or uuid.uuid4().hex)
+        self.revision = 0
+        self._undo: deque[Edit] = deque(maxlen=max_history)
+        self._redo: list[Edit] = []
+        self._listeners: list[Callable[[Document, Edit], None]] = []
+        self._next_id = int(store.ids.max()) + 1 if len(store) else 0
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_drawing(cls, drawing: Drawing, **kwargs) -> "Document":
+        """Start editing ``drawing``, reusing whatever it has already derived.
+
+        Bounds, metrics and extent are shared (edits replace them rather than
+        writing into them); the spatial index and level-of-detail pyramid are
+        copied cheaply, see :meth:`cadhelp.spatial.SpatialIndex.copy`.
+        """
+        doc = cls(drawing.store, drawing.name, **kwargs)
+        derived = drawing.__dict__
+        for name in ("bounds", "metrics", "extent"):
+            if name in derived:
+                doc.__dict__[name] = derived[name]
+        for name in ("index", "lod"):
+            if name in derived:
+                doc.__dict__[name] = derived[name].copy()
+        return doc
+
+    def __repr__(self) -> str:
+        return f"Document({self.name!r}, entities={len(self.store)}, revision={self.revision})"
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def subscribe(self, callback: Callable[["Document", Edit], None]) -> None:
+        """Call ``callback(document, edit)`` after every apply, undo and redo."""
+        self._listeners.append(callback)
+
+    # -- applying edits ------------------------------------------------------
+
+    def _patch(self, edit: Edit) -> None:
+        """Swap ``edit.before`` for ``edit.after`` in the store and derived data."""
+        store = self.store
+        keep = ~np.isin(store.ids, edit.before.ids) if len(edit.before) else None
+        kept = store if keep is None else store.subset(keep)
+        self.store = GeometryStore.concat([kept, edit.after]) if len(edit.after) else kept
+
+        cached = self.__dict__
+        if "bounds" in cached:
+            old = cached["bounds"] if keep is None else cached["bounds"][keep]
+            cached["bounds"] = np.vstack([old, bounds(edit.after)])
+        if "metrics" in cached:
+            fresh = {"area": areas(edit.after), "length": perimeters(edit.after)}
+            cached["metrics"] = {
+                name: np.concatenate([values if keep is None else values[keep], fresh[name]])
+                for name, values in cached["metrics"].items()
+            }
+        cached.pop("id_order", None)
+        if "lod" in cached:
+            cached["lod"].patch(self.store, keep, edit.after)
+        if "index" in cached:
+            index = cached["index"]
+            index.remove(np.setdiff1d(edit.before.ids, edit.after.ids))
+            if len(edit.after):
+                index.upsert_store(edit.after)
+        dirty = edit.dirty
+        if "extent" in cached and dirty is not None:
+            # The extent only grows, so tile grids stay put while editing inside it.
+            e = cached["extent"]
+            cached["extent"] = (min(e[0], dirty[0]), min(e[1], dirty[1]),
+                                max(e[2], dirty[2]), max(e[3], dirty[3]))
+        self.revision += 1
+
+    def _notify(self, edit: Edit) -> None:
+        for callback in list(self._listeners):
+            callback(self, edit)
+
+    def apply(self, edit: Edit) -> Edit:
+        """Apply ``edit`` and record it for undo; clears the redo stack."""
+        with self._lock:
+            self._patch(edit)
+            self._undo.append(edit)
+            self._redo.clear()
+        self._notify(edit)
+        return edit
+
+    def undo(self) -> Edit | None:
+        """Revert the last edit; returns the edit applied, or ``None``."""
+        with self._lock:
+            if not self._undo:
+                return None
+            edit = self._undo.pop()
+            self._redo.append(edit)
+            inverse = edit.inverse()
+            self._patch(inverse)
+        self._notify(inverse)
+        return inverse
+
+    def redo(self) -> Edit | None:
+        with self._lock:
+            if not self._redo:
+                return None
+            edit = self._redo.pop()
+            self._undo.append(edit)
+            self._patch(edit)
+        self._notify(edit)
+        return edit
+
+    # -- edit builders -------------------------------------------------------
+
+    def _select(self, ids: Iterable[int]) -> GeometryStore:
+        ids = np.unique(np.fromiter(ids, np.int64))
+        mask = np.isin(self.store.ids, ids)
+        if mask.sum() != len(ids):
+            raise KeyError("unknown entity id")
+        return self.store.subset(mask)
+
+    def add(self, kind: int, coords, layer: str = "0", label: str = "add") -> int:
+        """Add one entity and return its new id."""
+        with self._lock:
+            builder = GeometryBuilder()
+            entity_id = builder.add(kind, coords, layer, entity_id=self._next_id)
+            self._next_id += 1
+            self.apply(Edit(GeometryStore.empty(), builder.build(), label))
+        return entity_id
+
+    def add_store(self, store: GeometryStore, label: str = "add") -> np.ndarray:
+        """Add every entity of ``store`` under fresh ids, which are returned."""
+        with self._lock:
+            ids = np.arange(self._next_id, self._next_id + len(store), dtype=np.int64)
+            self._next_id += len(store)
+            self.apply(Edit(GeometryStore.empty(), GeometryStore(
+                store.coords, store.offsets, store.kinds, store.layers, ids,
+                store.layer_names, validate=False,
+            ), label))
+        return ids
+
+    def delete(self, ids: Iterable[int], label: str = "delete") -> Edit:
+        with self._lock:
+            return self.apply(Edit(self._select(ids), GeometryStore.empty(), label))
+
+    def transform(self, ids: Iterable[int], matrix: np.ndarray,
+                  label: str = "transform") -> Edit:
+        """Apply a 3x3 affine ``matrix`` to the given entities."""
+        with self._lock:
+            before = self._select(ids)
+            after = before.with_coords(apply_matrix(before.coords, matrix))
+            return self.apply(Edit(before, after, label))
+
+    def move(self, ids: Iterable[int], dx: float, dy: float, label: str = "move") -> Edit:
+        return self.transform(ids, translation(dx, dy), label)
+
+    def set_layer(self, ids: Iterable[int], layer: str, label: str = "set layer") -> Edit:
+        with self._lock:
+            before = self._select(ids)
+            after = GeometryStore(
+                before.coords, before.offsets, before.kinds,
+                np.zeros(len(before), dtype=np.int32), before.ids, (layer,),
+            )
+            return self.apply(Edit(before, after, label))
@@ -0,0 +1,173 @@
+"""A loaded drawing and the process-wide registry of open drawings."""
+
+from __future__ import annotations
+
+import os
+import threading
+from functools import cached_property
+from pathlib import Path
+
+import numpy as np
+
+from .geometry import GeometryStore, areas, bounds, perimeters, total_bounds
+from .io.binary import SUFFIX, read_binary, write_binary
+from .lod import LodPyramid
+from .spatial import SpatialIndex
+
+
+class Drawing:
+    """A :class:`GeometryStore` plus lazily built derived data.
+
+    ``key`` is the store's content hash, so two uploads of the same drawing
+    share cache entries.  ``path`` is set when the drawing is also saved as
+    a memory-mappable ``.cadb`` file.
+    """
+
+    revision = 0  # bumped on every edit by :class:`cadhelp.document.Document`
+
+    def __init__(self, store: GeometryStore, name: str | None = None,
+                 key: str | None = None, path: Path | None = None):
+        self.store = store
+        self.key = key or store.digest()
+        self.name = name or self.key[:8]
+        self.path = path
+        self._digest = (self.revision, self.key if key is None else None)
+
+    def __repr__(self) -> str:
+        return f"Drawing({self.name!r}, entities={len(self.store)})"
+
+    @property
+    def digest(self) -> str:
+        """Content hash of the current store, recomputed once per revision.
+
+        Unlike ``key``, which stays fixed for a document being edited, this
+        names the content, so results cached under it can be shared with
+        any process that sees the same geometry.
+        """
+        revision, digest = self._digest
+        if digest is None or revision != self.revision:
+            digest = self.store.digest()
+            self._digest = (self.revision, digest)
+        return digest
+
+    @cached_property
+    def index(self) -> SpatialIndex:
+        return SpatialIndex.from_store(self.store)
+
+    @cached_property
+    def bounds(self) -> np.ndarray:
+        """Per-entity bounding boxes, ``(E, 4)``."""
+        return bounds(self.store)
+
+    @cached_property
+    def metrics(self) -> dict[str, np.ndarray]:
+        """Per-entity ``area`` and ``length`` arrays, in store order."""
+        return {"area": areas(self.store), "length": perimeters(self.store)}
+
+    @cached_property
+    def extent(self) -> tuple[float, float, float, float]:
+        """Bounding box of the whole drawing."""
+        b = total_bounds(self.store)
+        if np.isnan(b).any():
+            return (0.0, 0.0, 1.0, 1.0)
+        return tuple(float(v) for v in b)
+
+    @cached_property
+    def id_order(self) -> np.ndarray:
+        """Store positions sorted by entity id, for :meth:`positions`."""
+        return np.argsort(self.store.ids, kind="stable")
+
+    def positions(self, ids) -> np.ndarray:
+        """Store positions of entity ids (see :meth:`GeometryStore.positions`).
+
+        Reuses :attr:`id_order`, so the cost grows with ``len(ids)`` rather
+        than with the size of the drawing.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        order, store_ids = self.id_order, self.store.ids
+        if not len(order):
+            if len(ids):
+                raise KeyError("unknown entity id")
+            return ids
+        pos = order[np.minimum(np.searchsorted(store_ids, ids, sorter=order), len(order) - 1)]
+        if np.any(store_ids[pos] != ids):
+            raise KeyError("unknown entity id")
+        return pos
+
+    @cached_property
+    def lod(self) -> LodPyramid:
+        """Simplified copies of the store for zoomed-out rendering."""
+        return LodPyramid(self.store, self.extent)
+
+    def query(self, bbox, resolution: float | None = None) -> GeometryStore:
+        """Entities whose bounding boxes intersect ``bbox``, in store order.
+
+        With a ``resolution`` (world units per pixel) the entities come from
+        the :attr:`lod` level that is indistinguishable at that scale.
+        """
+        ids = self.index.bbox_candidates(bbox)
+        store = self.store if resolution is None else self.lod.at(resolution)
+        return store.subset(np.sort(self.positions(ids)))
+
+
+class DrawingRegistry:
+    """Thread-safe mapping of drawing key to :class:`Drawing`.
+
+    With a ``directory``, every added drawing is also saved there as
+    ``<key>.cadb`` and drawings missing from memory are memory-mapped back
+    from it.  Several processes pointed at the same directory (e.g. web
+    workers) therefore see each other's uploads and share one copy of the
+    data in the OS page cache.
+    """
+
+    def __init__(self, directory: str | os.PathLike | None = None):
+        self.directory = Path(directory) if directory is not None else None
+        self._drawings: dict[str, Drawing] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._drawings or (self._path(key) or Path()).is_file()
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def _path(self, key: str) -> Path | None:
+        if self.directory is None or not key.isalnum():
+            return None
+        return self.directory / f"{key}{SUFFIX}"
+
+    def add(self, drawing: Drawing | GeometryStore, name: str | None = None) -> Drawing:
+        if isinstance(drawing, GeometryStore):
+            drawing = Drawing(drawing, name)
+        path = self._path(drawing.key)
+        if path is not None and drawing.path is None:
+            if not path.is_file():
+                write_binary(drawing.store, path)
+            drawing.path = path
+        with self._lock:
+            return self._drawings.setdefault(drawing.key, drawing)
+
+    def get(self, key: str) -> Drawing:
+        drawing = self._drawings.get(key)
+        if drawing is not None:
+            return drawing
+        path = self._path(key)
+        if path is None or not path.is_file():
+            raise KeyError(f"unknown drawing {key!r}")
+        with self._lock:
+            return self._drawings.setdefault(
+                key, Drawing(read_binary(path), key=key, path=path)
+            )
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            self._drawings.pop(key, None)
+            path = self._path(key)
+            if path is not None:
+                path.unlink(missing_ok=True)
+
+    def keys(self) -> list[str]:
+        keys = dict.fromkeys(self._drawings)
+        if self.directory is not None and self.directory.is_dir():
+            keys.update(dict.fromkeys(p.stem for p in self.directory.glob(f"*{SUFFIX}")))
+        return list(keys)
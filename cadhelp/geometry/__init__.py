@@ -0,0 +1,81 @@
+"""NumPy-backed geometry core.
+
+Drawings are held in a :class:`GeometryStore` (contiguous coordinate
+buffers plus per-entity arrays).  :mod:`.kernel` measures and transforms
+whole stores at once; :mod:`.convert` bridges to Shapely where an
+operation needs real geometry objects, and :mod:`.boolean` runs
+layer-wide boolean operations as single vectorized Shapely calls.
+:mod:`.offset` memoizes buffers per distinct shape, and :mod:`.simplify`
+thins vertex lists for zoomed-out rendering.
+"""
+
+from .boolean import (
+    clip_to_rect,
+    dissolve,
+    intersect_layer,
+    pairwise,
+    subtract_layer,
+    union_layer,
+)
+from .convert import from_shapely, to_shapely
+from .kernel import (
+    apply_matrix,
+    areas,
+    bounds,
+    centroids,
+    lengths,
+    perimeters,
+    rotation,
+    scaling,
+    segment_lengths,
+    signed_areas,
+    total_bounds,
+    transform,
+    translation,
+)
+from .offset import OFFSETS, BufferParams, OffsetCache, geometry_keys
+from .simplify import MIN_SIMPLIFY_VERTICES, simplify
+from .store import (
+    KIND_NAMES,
+    LINESTRING,
+    POINT,
+    POLYGON,
+    GeometryBuilder,
+    GeometryStore,
+)
+
+__all__ = [
+    "BufferParams",
+    "GeometryBuilder",
+    "GeometryStore",
+    "KIND_NAMES",
+    "LINESTRING",
+    "MIN_SIMPLIFY_VERTICES",
+    "OFFSETS",
+    "OffsetCache",
+    "POINT",
+    "POLYGON",
+    "apply_matrix",
+    "areas",
+    "bounds",
+    "centroids",
+    "clip_to_rect",
+    "dissolve",
+    "from_shapely",
+    "geometry_keys",
+    "intersect_layer",
+    "lengths",
+    "pairwise",
+    "perimeters",
+    "rotation",
+    "scaling",
+    "segment_lengths",
+    "signed_areas",
+    "simplify",
+    "subtract_layer",
+    "to_shapely",
+    "total_bounds",
+    "transform",
+    "translation",
+    "union_layer",
+]
@@ -0,0 +1,161 @@
+"""Layer-wide boolean operations on top of Shapely's array functions.
+
+Each operation converts the selected entities to a Shapely array once and
+runs a single vectorized call (``union_all``, ``intersection``,
+``difference``, ``clip_by_rect``) over it, instead of folding geometries
+together pairwise in Python.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+import numpy as np
+import shapely
+
+from .convert import from_shapely, to_shapely
+from .kernel import bounds
+from .store import POLYGON, GeometryStore
+
+
+def _select(store: GeometryStore, layers: str | Iterable[str] | None) -> np.ndarray:
+    if layers is None:
+        return np.arange(len(store))
+    return np.flatnonzero(store.layer_mask(layers))
+
+
+def _near(store: GeometryStore, sel: np.ndarray, bbox) -> np.ndarray:
+    """Restrict ``sel`` to entities whose bounds overlap ``bbox``."""
+    b = bounds(store.subset(sel)) if len(sel) != len(store) else bounds(store)
+    minx, miny, maxx, maxy = bbox
+    overlap = (b[:, 0] <= maxx) & (b[:, 2] >= minx) & (b[:, 1] <= maxy) & (b[:, 3] >= miny)
+    return sel[overlap]
+
+
+def _polygons(store: GeometryStore, layers) -> np.ndarray:
+    sel = _select(store, layers)
+    return to_shapely(store, sel[store.kinds[sel] == POLYGON])
+
+
+def union_layer(
+    store: GeometryStore,
+    layers: str | Iterable[str] | None = None,
+    grid_size: float | None = None,
+):
+    """Merge every polygon on ``layers`` into one geometry.
+
+    Uses ``shapely.union_all`` (a cascaded union in GEOS), which is far
+    cheaper than repeated pairwise ``union`` calls on large layers.
+    """
+    return shapely.union_all(_polygons(store, layers), grid_size=grid_size)
+
+
+def dissolve(store: GeometryStore, grid_size: float | None = None) -> dict:
+    """Union polygons per layer, returning ``{layer_name: geometry}``."""
+    polys = store.kinds == POLYGON
+    geoms = to_shapely(store, polys)
+    layers = store.layers[polys]
+    order = np.argsort(layers, kind="stable")
+    groups, starts = np.unique(layers[order], return_index=True)
+    out = {}
+    for layer, chunk in zip(groups, np.split(geoms[order], starts[1:])):
+        out[store.layer_names[layer]] = shapely.union_all(chunk, grid_size=grid_size)
+    return out
+
+
+def _apply(store: GeometryStore, sel: np.ndarray, result: np.ndarray) -> GeometryStore:
+    """Pack per-entity results back into a store, keeping ids and layers."""
+    names = np.asarray(store.layer_names, dtype=object)
+    return from_shapely(result, list(names[store.layers[sel]]), store.ids[sel])
+
+
+def _splice(store: GeometryStore, sel: np.ndarray, changed: np.ndarray,
+            result: np.ndarray) -> GeometryStore:
+    """Entities ``sel`` of ``store`` in order, those flagged ``changed`` replaced by ``result``.
+
+    Unchanged entities are copied straight from the store instead of
+    making a round trip through Shapely.
+    """
+    same = store.subset(sel[~changed])
+    if not changed.any():
+        return same
+    names = np.asarray(store.layer_names, dtype=object)
+    rank = np.flatnonzero(changed)
+    # Pack with ranks in ``sel`` as ids, so every part knows where it goes.
+    cut = from_shapely(result, list(names[store.layers[sel[rank]]]), rank)
+    merged = GeometryStore.concat([same, cut])
+    src = np.concatenate([np.flatnonzero(~changed), cut.ids])
+    order = np.argsort(src, kind="stable")
+    merged = merged.subset(order)
+    return GeometryStore(merged.coords, merged.offsets, merged.kinds, merged.layers,
+                         store.ids[sel[src[order]]], merged.layer_names, validate=False)
+
+
+def intersect_layer(
+    store: GeometryStore, region, layers: str | Iterable[str] | None = None
+) -> GeometryStore:
+    """Intersect every entity on ``layers`` with ``region``.
+
+    Entities are first culled by bounding box; ``region`` is then prepared
+    once and used to drop entities that miss it and to pass through
+    entities it fully contains, so only boundary-crossing entities pay for
+    an actual overlay.
+    """
+    sel = _near(store, _select(store, layers), region.bounds)
+    geoms = to_shapely(store, sel)
+    shapely.prepare(region)
+    hit = shapely.intersects(region, geoms)
+    cross = hit & ~shapely.contains_properly(region, geoms)
+    return _splice(store, sel[hit], cross[hit], shapely.intersection(geoms[cross], region))
+
+
+def subtract_layer(
+    store: GeometryStore, cutter, layers: str | Iterable[str] | None = None
+) -> GeometryStore:
+    """Remove ``cutter`` from every entity on ``layers``.
+
+    Like :func:`intersect_layer`, only entities whose bounding box overlaps
+    the cutter are tested against it, and only those it touches are cut;
+    the rest are passed through as they are.
+    """
+    sel = _select(store, layers)
+    near = _near(store, sel, cutter.bounds)
+    geoms = to_shapely(store, near)
+    shapely.prepare(cutter)
+    touched = np.zeros(len(sel), dtype=bool)
+    hit = shapely.intersects(cutter, geoms)
+    touched[np.searchsorted(sel, near[hit])] = True
+    return _splice(store, sel, touched, shapely.difference(geoms[hit], cutter))
+
+
+def clip_to_rect(
+    store: GeometryStore, bbox, layers: str | Iterable[str] | None = None
+) -> GeometryStore:
+    """Clip entities to an axis-aligned viewport ``(minx, miny, maxx, maxy)``.
+
+    ``shapely.clip_by_rect`` is much faster than a general intersection;
+    it may return slightly invalid polygons along the rectangle edges,
+    which is fine for display.
+    """
+    sel = _near(store, _select(store, layers), bbox)
+    clipped = shapely.clip_by_rect(to_shapely(store, sel), *bbox)
+    return _apply(store, sel, clipped)
+
+
+def pairwise(op: str, a: np.ndarray, b, grid_size: float | None = None) -> np.ndarray:
+    """Element-wise boolean op between arrays (or an array and a geometry).
+
+    ``op`` is one of ``"union"``, ``"intersection"``, ``"difference"`` or
+    ``"symmetric_difference"``.
+    """
+    funcs = {
+        "union": shapely.union,
+        "intersection": shapely.intersection,
+        "difference": shapely.difference,
+        "symmetric_difference": shapely.symmetric_difference,
+    }
+    try:
+        func = funcs[op]
+    except KeyError:
+        raise ValueError(f"unknown boolean op {op!r}") from None
+    return func(a, b, grid_size=grid_size)
@@ -0,0 +1,160 @@
+"""Conversion between :class:`GeometryStore` and Shapely geometry arrays.
+
+Both directions use Shapely 2.x array constructors and accessors, so a
+whole store converts in a handful of vectorized calls.  Conversion is only
+needed for operations Shapely implements (booleans, buffers, predicates);
+measurements live in :mod:`cadhelp.geometry.kernel`.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+import shapely
+from shapely import GeometryType
+
+from .store import LINESTRING, POINT, POLYGON, GeometryStore
+
+_SIMPLE_TYPES = {
+    GeometryType.POINT: POINT,
+    GeometryType.LINESTRING: LINESTRING,
+    GeometryType.LINEARRING: LINESTRING,
+    GeometryType.POLYGON: POLYGON,
+}
+
+
+def to_shapely(store: GeometryStore, selector=None) -> np.ndarray:
+    """Build a Shapely object array with one geometry per entity.
+
+    Args:
+        store: source geometry.
+        selector: optional boolean mask or positions; only those entities
+            are converted and returned, in order.
+    """
+    if selector is not None:
+        store = store.subset(selector)
+    out = np.empty(len(store), dtype=object)
+    if len(store) == 0:
+        return out
+    owner = store.vertex_entity
+    vkinds = np.repeat(store.kinds, store.counts)
+    for kind in (POINT, LINESTRING, POLYGON):
+        vsel = vkinds == kind
+        if not vsel.any():
+            continue
+        coords, idx = store.coords[vsel], owner[vsel]
+        if kind == POINT:
+            # Multi-vertex points are not produced by the builder; keep first.
+            first = np.r_[True, idx[1:] != idx[:-1]]
+            out[idx[first]] = shapely.points(coords[first])
+        elif kind == LINESTRING:
+            shapely.linestrings(coords, indices=idx, out=out)
+        else:
+            rings = np.empty(len(store), dtype=object)
+            shapely.linearrings(coords, indices=idx, out=rings)
+            ents = np.unique(idx)
+            out[ents] = shapely.polygons(rings[ents])
+    return out
+
+
+def _split_holes(parts: np.ndarray, src: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Cut polygons with holes into hole-free pieces, in place of the original.
+
+    Each holed polygon is split in two by an axis-parallel line through the
+    middle of its first hole, which opens that hole onto the outline of
+    both halves; this repeats until no piece has holes left.  Only polygons
+    with holes are touched, and every cut removes at least one hole, so
+    the loop stops unless a hole is degenerate, in which case the rest are
+    left to be dropped with the interior rings.
+    """
+    holes = shapely.get_num_interior_rings(parts)
+    while holes.sum():
+        pos = np.flatnonzero(holes)
+        polys = parts[pos]
+        minx, miny, maxx, maxy = shapely.bounds(polys).T
+        hminx, hminy, hmaxx, hmaxy = shapely.bounds(shapely.get_interior_ring(polys, 0)).T
+        # Cut across the hole's longer side so thin slots split cleanly.
+        wide = hmaxx - hminx >= hmaxy - hminy
+        x, y = (hminx + hmaxx) / 2, (hminy + hmaxy) / 2
+        first = shapely.box(minx, miny, np.where(wide, x, maxx), np.where(wide, maxy, y))
+        second = shapely.box(np.where(wide, x, minx), np.where(wide, miny, y), maxx, maxy)
+        pieces, owner = shapely.get_parts(
+            np.concatenate([shapely.intersection(polys, first),
+                            shapely.intersection(polys, second)]), return_index=True)
+        keep = (shapely.get_type_id(pieces) == GeometryType.POLYGON) & ~shapely.is_empty(pieces)
+        pieces, owner = pieces[keep], np.tile(pos, 2)[owner[keep]]
+        left = shapely.get_num_interior_rings(pieces)
+        if left.sum() >= holes.sum():
+            break
+        whole = np.ones(len(parts), dtype=bool)
+        whole[pos] = False
+        order = np.argsort(np.concatenate([np.flatnonzero(whole), owner]), kind="stable")
+        parts = np.concatenate([parts[whole], pieces])[order]
+        src = np.concatenate([src[whole], src[owner]])[order]
+        holes = np.concatenate([np.zeros(whole.sum(), holes.dtype), left])[order]
+    return parts, src
+
+
+def from_shapely(
+    geoms: Sequence | np.ndarray,
+    layers: Sequence[str] | str = "0",
+    ids: Sequence[int] | None = None,
+) -> GeometryStore:
+    """Pack Shapely geometries into a :class:`GeometryStore`.
+
+    Multi-part geometries and collections are exploded into one entity per
+    part; each part keeps the layer (and id, if given) of its source
+    geometry.  Polygon holes are not representable in the store, so a
+    polygon with holes is cut into hole-free pieces covering the same area
+    (see :func:`_split_holes`); the pieces share its layer and id like the
+    parts of a multi-polygon.  Empty geometries are skipped.
+    """
+    geoms = np.asarray(geoms, dtype=object)
+    n = len(geoms)
+    if isinstance(layers, str):
+        layer_names = [layers]
+        layer_idx = np.zeros(n, dtype=np.int32)
+    else:
+        names, layer_idx = np.unique(np.asarray(layers, dtype=str), return_inverse=True)
+        layer_names = [str(name) for name in names]
+    src_ids = np.arange(n, dtype=np.int64) if ids is None else np.asarray(ids, np.int64)
+
+    parts, src = shapely.get_parts(geoms, return_index=True)
+    # Collections can nest one level further (e.g. a collection of multis).
+    while True:
+        nested = shapely.get_num_geometries(parts) > 1
+        nested |= np.isin(shapely.get_type_id(parts), [
+            GeometryType.MULTIPOINT, GeometryType.MULTILINESTRING,
+            GeometryType.MULTIPOLYGON, GeometryType.GEOMETRYCOLLECTION,
+        ])
+        if not nested.any():
+            break
+        sub, sub_src = shapely.get_parts(parts, return_index=True)
+        parts, src = sub, src[sub_src]
+
+    keep = ~shapely.is_empty(parts)
+    parts, src = _split_holes(parts[keep], src[keep])
+    type_ids = shapely.get_type_id(parts)
+    kinds = np.array([_SIMPLE_TYPES[GeometryType(t)] for t in type_ids], dtype=np.uint8) \
+        if len(parts) else np.empty(0, np.uint8)
+
+    polys = kinds == POLYGON
+    lines = parts.copy()
+    lines[polys] = shapely.get_exterior_ring(parts[polys])
+    coords, owner = shapely.get_coordinates(lines, return_index=True)
+    counts = np.bincount(owner, minlength=len(parts))
+
+    # Drop the repeated closing vertex of polygon rings.
+    if polys.any():
+        ends = np.cumsum(counts) - 1
+        drop = np.zeros(len(coords), dtype=bool)
+        drop[ends[polys]] = True
+        coords = coords[~drop]
+        counts = counts - polys
+
+    offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return GeometryStore(
+        coords, offsets, kinds, layer_idx[src], src_ids[src], layer_names or ["0"]
+    )
@@ -0,0 +1,181 @@
+"""Vectorized measurements and transforms over a :class:`GeometryStore`.
+
+Every function here processes all entities of a store in a constant number
+of NumPy calls.  Per-vertex quantities are reduced to per-entity results
+with ``numpy.bincount`` or ``ufunc.reduceat`` over the store's offsets.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from .store import LINESTRING, POLYGON, GeometryStore
+
+
+def _next_vertex(store: GeometryStore) -> tuple[np.ndarray, np.ndarray]:
+    """Index of each vertex's successor and a mask of real segments.
+
+    Polygon rings wrap around to their first vertex; the last vertex of a
+    linestring (and every point) starts no segment.
+    """
+    n = store.num_vertices
+    nxt = np.arange(1, n + 1, dtype=np.int64)
+    valid = np.ones(n, dtype=bool)
+    if n == 0:
+        return nxt, valid
+    starts = store.offsets[:-1]
+    ends = store.offsets[1:] - 1
+    closed = store.kinds == POLYGON
+    nxt[ends[closed]] = starts[closed]
+    valid[ends[~closed]] = False
+    nxt[ends[~closed]] = ends[~closed]
+    return nxt, valid
+
+
+def segment_lengths(store: GeometryStore) -> np.ndarray:
+    """Length of the segment starting at each vertex (0 where none starts)."""
+    nxt, valid = _next_vertex(store)
+    d = store.coords[nxt] - store.coords
+    lengths = np.hypot(d[:, 0], d[:, 1])
+    lengths[~valid] = 0.0
+    return lengths
+
+
+def perimeters(store: GeometryStore) -> np.ndarray:
+    """Perimeter of polygons and length of linestrings; 0 for points."""
+    return np.bincount(
+        store.vertex_entity, weights=segment_lengths(store), minlength=len(store)
+    )
+
+
+lengths = perimeters
+
+
+def signed_areas(store: GeometryStore) -> np.ndarray:
+    """Shoelace area per entity; positive for counter-clockwise rings.
+
+    Only polygons have a non-zero area.
+    """
+    nxt, _ = _next_vertex(store)
+    x, y = store.coords[:, 0], store.coords[:, 1]
+    cross = x * y[nxt] - x[nxt] * y
+    cross[np.repeat(store.kinds != POLYGON, store.counts)] = 0.0
+    return 0.5 * np.bincount(store.vertex_entity, weights=cross, minlength=len(store))
+
+
+def areas(store: GeometryStore) -> np.ndarray:
+    return np.abs(signed_areas(store))
+
+
+def centroids(store: GeometryStore) -> np.ndarray:
+    """Centroid per entity as an ``(E, 2)`` array.
+
+    Polygons use the area-weighted ring centroid, linestrings the
+    length-weighted segment midpoints and points their own location.
+    Degenerate entities (zero area or length) fall back to the vertex mean.
+    """
+    e = len(store)
+    out = np.empty((e, 2))
+    if e == 0:
+        return out
+    owner = store.vertex_entity
+    nxt, valid = _next_vertex(store)
+    c, cn = store.coords, store.coords[nxt]
+    is_poly = np.repeat(store.kinds == POLYGON, store.counts)
+
+    # Polygon: C = sum((p + q) * cross) / (6 * A)
+    cross = c[:, 0] * cn[:, 1] - cn[:, 0] * c[:, 1]
+    cross[~is_poly] = 0.0
+    a6 = 3.0 * np.bincount(owner, weights=cross, minlength=e)
+    px = np.bincount(owner, weights=(c[:, 0] + cn[:, 0]) * cross, minlength=e)
+    py = np.bincount(owner, weights=(c[:, 1] + cn[:, 1]) * cross, minlength=e)
+
+    # Linestring: C = sum(midpoint * length) / total length
+    d = cn - c
+    seg = np.hypot(d[:, 0], d[:, 1])
+    seg[~valid | is_poly] = 0.0
+    total = np.bincount(owner, weights=seg, minlength=e)
+    mx = np.bincount(owner, weights=(c[:, 0] + cn[:, 0]) * 0.5 * seg, minlength=e)
+    my = np.bincount(owner, weights=(c[:, 1] + cn[:, 1]) * 0.5 * seg, minlength=e)
+
+    counts = store.counts
+    out[:, 0] = np.bincount(owner, weights=c[:, 0], minlength=e) / counts
+    out[:, 1] = np.bincount(owner, weights=c[:, 1], minlength=e) / counts
+
+    poly = (store.kinds == POLYGON) & (a6 != 0.0)
+    out[poly, 0] = px[poly] / a6[poly]
+    out[poly, 1] = py[poly] / a6[poly]
+    line = (store.kinds == LINESTRING) & (total > 0.0)
+    out[line, 0] = mx[line] / total[line]
+    out[line, 1] = my[line] / total[line]
+    return out
+
+
+def bounds(store: GeometryStore) -> np.ndarray:
+    """Axis-aligned bounding boxes as ``(E, 4)`` ``[minx, miny, maxx, maxy]``."""
+    out = np.empty((len(store), 4))
+    if len(store) == 0:
+        return out
+    starts = store.offsets[:-1]
+    out[:, 0:2] = np.minimum.reduceat(store.coords, starts, axis=0)
+    out[:, 2:4] = np.maximum.reduceat(store.coords, starts, axis=0)
+    return out
+
+
+def total_bounds(store: GeometryStore) -> np.ndarray:
+    """Bounding box of the whole store; NaNs when it is empty."""
+    if store.num_vertices == 0:
+        return np.full(4, np.nan)
+    return np.concatenate([store.coords.min(axis=0), store.coords.max(axis=0)])
+
+
+# -- affine transforms --------------------------------------------------------
+
+def translation(dx: float, dy: float) -> np.ndarray:
+    return np.array([[1.0, 0.0, dx], [0.0, 1.0, dy], [0.0, 0.0, 1.0]])
+
+
+def scaling(sx: float, sy: float | None = None, origin=(0.0, 0.0)) -> np.ndarray:
+    sy = sx if sy is None else sy
+    ox, oy = origin
+    return np.array([[sx, 0.0, ox - sx * ox], [0.0, sy, oy - sy * oy], [0.0, 0.0, 1.0]])
+
+
+def rotation(angle: float, origin=(0.0, 0.0), degrees: bool = True) -> np.ndarray:
+    """Counter-clockwise rotation about ``origin``."""
+    t = np.radians(angle) if degrees else angle
+    cos, sin = np.cos(t), np.sin(t)
+    ox, oy = origin
+    return np.array([
+        [cos, -sin, ox - cos * ox + sin * oy],
+        [sin, cos, oy - sin * ox - cos * oy],
+        [0.0, 0.0, 1.0],
+    ])
+
+
+def apply_matrix(coords: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """Apply a 3x3 affine matrix to an ``(N, 2)`` coordinate array."""
+    m = np.asarray(matrix, dtype=np.float64)
+    return coords @ m[:2, :2].T + m[:2, 2]
+
+
+def transform(
+    store: GeometryStore, matrix: np.ndarray, selector: np.ndarray | None = None
+) -> GeometryStore:
+    """Return a copy of ``store`` with ``matrix`` applied.
+
+    Args:
+        store: source geometry.
+        matrix: 3x3 affine matrix, e.g. from :func:`translation`,
+            :func:`scaling`, :func:`rotation` or their product.
+        selector: optional boolean mask or positions of the entities to
+            transform; the rest are copied unchanged.
+    """
+    if selector is None:
+        return store.with_coords(apply_matrix(store.coords, matrix))
+    mask = np.zeros(len(store), dtype=bool)
+    mask[selector] = True
+    vmask = np.repeat(mask, store.counts)
+    coords = store.coords.copy()
+    coords[vmask] = apply_matrix(coords[vmask], matrix)
+    return store.with_coords(coords)
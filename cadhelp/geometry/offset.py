@@ -0,0 +1,171 @@
+"""Memoized buffer/offset of entities.
+
+Wall thicknesses, clearance zones and tool paths buffer the same shapes
+with the same parameters over and over.  :class:`OffsetCache` keys every
+result on a hash of the entity's geometry (not its id, so identical walls
+share one entry) plus the buffer parameters, and keeps the most recently
+used results.
+
+Geometry hashes are computed for a whole store at once with NumPy
+(:func:`geometry_keys`).  On each call the misses are deduplicated and
+buffered with a single vectorized ``shapely.buffer`` call.
+"""
+
+from __future__ import annotations
+
+import itertools
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+import numpy as np
+import shapely
+
+from .convert import from_shapely, to_shapely
+from .store import GeometryStore
+
+JOIN_STYLES = {"round": "round", "mitre": "mitre", "miter": "mitre", "bevel": "bevel"}
+CAP_STYLES = {"round": "round", "flat": "flat", "square": "square"}
+MAX_ENTRIES = 100_000
+
+_SEEDS = (np.uint64(0x9E3779B97F4A7C15), np.uint64(0xC2B2AE3D27D4EB4F))
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    """SplitMix64 finalizer, element-wise (wraps modulo 2**64)."""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def geometry_keys(store: GeometryStore) -> np.ndarray:
+    """128-bit content hash of every entity, ``(E, 2)`` uint64.
+
+    Covers the kind and the exact vertex sequence, but not the id or layer.
+    """
+    n = len(store)
+    out = np.empty((n, 2), dtype=np.uint64)
+    if n == 0:
+        return out
+    bits = np.ascontiguousarray(store.coords).view(np.uint64)
+    counts = store.counts.astype(np.uint64)
+    local = (np.arange(store.num_vertices, dtype=np.int64)
+             - np.repeat(store.offsets[:-1], store.counts)).astype(np.uint64)
+    shape = (store.kinds.astype(np.uint64) << np.uint64(56)) ^ counts
+    with np.errstate(over="ignore"):
+        for k, seed in enumerate(_SEEDS):
+            v = _mix(bits[:, 0] ^ seed)
+            v = _mix(v ^ bits[:, 1] ^ (local * seed))
+            out[:, k] = _mix(np.add.reduceat(v, store.offsets[:-1]) ^ _mix(shape ^ seed))
+    return out
+
+
+class BufferParams(NamedTuple):
+    distance: float
+    quad_segs: int = 8
+    join_style: str = "mitre"
+    mitre_limit: float = 5.0
+    cap_style: str = "round"
+
+    @classmethod
+    def make(cls, distance: float, quad_segs: int = 8, join_style: str = "mitre",
+             mitre_limit: float = 5.0, cap_style: str = "round") -> "BufferParams":
+        """Validated, normalized parameters (so equal requests share a key)."""
+        if join_style not in JOIN_STYLES:
+            raise ValueError(f"join_style must be one of {sorted(JOIN_STYLES)}")
+        if cap_style not in CAP_STYLES:
+            raise ValueError(f"cap_style must be one of {sorted(CAP_STYLES)}")
+        if int(quad_segs) < 1:
+            raise ValueError("quad_segs must be positive")
+        return cls(float(distance), int(quad_segs), JOIN_STYLES[join_style],
+                   float(mitre_limit), CAP_STYLES[cap_style])
+
+
+class OffsetCache:
+    """LRU cache of buffered geometries keyed by geometry hash and parameters.
+
+    Args:
+        max_entries: results kept before the least recently used are evicted.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._items: OrderedDict[tuple, object] = OrderedDict()
+        self._params: dict[BufferParams, int] = {}  # small ints keep keys cheap to hash
+        self._param_ids = itertools.count()  # never reused, even across clear()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._items), "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._params.clear()
+
+    def buffer(self, store: GeometryStore, distance: float, **params) -> np.ndarray:
+        """Buffered Shapely geometry for every entity of ``store``, in order.
+
+        Args:
+            store: entities to buffer.
+            distance: buffer distance; negative shrinks polygons.
+            params: ``quad_segs``, ``join_style``, ``mitre_limit`` and
+                ``cap_style``, as for :class:`BufferParams`.
+        """
+        p = BufferParams.make(distance, **params)
+        hashes = geometry_keys(store).tolist()
+        out = np.empty(len(hashes), dtype=object)
+        missing: dict[tuple, list[int]] = {}
+        with self._lock:
+            pid = self._params.get(p)
+            if pid is None:
+                pid = self._params[p] = next(self._param_ids)
+            keys = [(a, b, pid) for a, b in hashes]
+            for i, key in enumerate(keys):
+                geom = self._items.get(key)
+                if geom is None:
+                    missing.setdefault(key, []).append(i)
+                else:
+                    self._items.move_to_end(key)
+                    out[i] = geom
+            self.hits += len(keys) - sum(map(len, missing.values()))
+            self.misses += len(missing)
+        if not missing:
+            return out
+
+        # One representative per distinct shape, buffered in a single call.
+        first = np.fromiter((pos[0] for pos in missing.values()), np.int64, len(missing))
+        made = shapely.buffer(
+            to_shapely(store, first), p.distance, quad_segs=p.quad_segs,
+            join_style=p.join_style, mitre_limit=p.mitre_limit, cap_style=p.cap_style,
+        )
+        with self._lock:
+            for (key, positions), geom in zip(missing.items(), made):
+                out[positions] = geom
+                self._items[key] = geom
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+                self.evictions += 1
+        return out
+
+    def offset(self, store: GeometryStore, distance: float, **params) -> GeometryStore:
+        """Like :meth:`buffer`, packed back into a store with the source ids and layers.
+
+        The result is not one entity per source entity: a polygon shrunk
+        away entirely leaves nothing, and one shrunk apart at a waist comes
+        back as one entity per part, each with the source id (holes are
+        split the same way, see :func:`from_shapely`).  Match results to
+        their sources by ``ids``, not by position.
+        """
+        buffered = self.buffer(store, distance, **params)
+        names = np.asarray(store.layer_names, dtype=object)[store.layers]
+        return from_shapely(buffered, list(names), store.ids)
+
+
+# Process-wide cache, shared by every operation run in this process.
+OFFSETS = OffsetCache()
@@ -0,0 +1,77 @@
+"""Topology-preserving simplification that keeps stores entity-aligned.
+
+:func:`simplify` returns a store with exactly the same entities, in the
+same order and with the same ids and layers, as its input; only vertex
+lists get shorter.  Row ``i`` of the result therefore still describes
+entity ``i`` of the source, so positions found through the source's
+spatial index or bounds select the same entities in the simplified copy.
+
+Entities with few vertices cannot get meaningfully cheaper to draw and
+are copied as they are, which keeps simplifying drawings made mostly of
+rectangles and short segments close to free.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import shapely
+
+from .convert import to_shapely
+from .store import LINESTRING, MIN_VERTICES, POINT, POLYGON, GeometryStore
+
+MIN_SIMPLIFY_VERTICES = 8
+
+
+def simplify(store: GeometryStore, tolerance: float,
+             min_vertices: int = MIN_SIMPLIFY_VERTICES) -> GeometryStore:
+    """Douglas-Peucker simplification of every entity, topology preserved.
+
+    Args:
+        store: entities to simplify.
+        tolerance: maximum distance, in world units, between an entity and
+            its simplified version.
+        min_vertices: entities with at most this many vertices are kept
+            unchanged.
+
+    Returns:
+        A store aligned with ``store``; ``store`` itself if nothing changed.
+    """
+    if tolerance <= 0:
+        return store
+    counts = store.counts
+    sel = np.flatnonzero((counts > min_vertices) & (store.kinds != POINT))
+    if not len(sel):
+        return store
+
+    geoms = shapely.simplify(to_shapely(store, sel), tolerance, preserve_topology=True)
+    polys = store.kinds[sel] == POLYGON
+    geoms[polys] = shapely.get_exterior_ring(geoms[polys])
+    coords, owner = shapely.get_coordinates(geoms, return_index=True)
+    new_counts = np.bincount(owner, minlength=len(sel))
+    if polys.any():
+        # Rings come back closed; the store keeps them open.
+        closing = np.zeros(len(coords), dtype=bool)
+        closing[(np.cumsum(new_counts) - 1)[polys & (new_counts > 0)]] = True
+        coords = coords[~closing]
+        new_counts = new_counts - (polys & (new_counts > 0))
+
+    # Anything degenerate or not actually shorter keeps its source vertices.
+    minimum = np.where(polys, MIN_VERTICES[POLYGON], MIN_VERTICES[LINESTRING])
+    better = (new_counts >= minimum) & (new_counts < counts[sel])
+    if not better.any():
+        return store
+    coords = coords[np.repeat(better, new_counts)]
+    sel, new_counts = sel[better], new_counts[better]
+
+    out_counts = counts.copy()
+    out_counts[sel] = new_counts
+    offsets = np.zeros(len(store) + 1, dtype=np.int64)
+    np.cumsum(out_counts, out=offsets[1:])
+    same = np.ones(len(store), dtype=bool)
+    same[sel] = False
+    out = np.empty((offsets[-1], 2), dtype=np.float64)
+    kept = np.repeat(same, out_counts)
+    out[kept] = store.coords[np.repeat(same, counts)]
+    out[~kept] = coords
+    return GeometryStore(out, offsets, store.kinds, store.layers, store.ids,
+                         store.layer_names, validate=False)
@@ -0,0 +1,289 @@
+"""Columnar storage for drawing entities.
+
+A :class:`GeometryStore` keeps every vertex of a drawing in one contiguous
+``(N, 2)`` float64 array.  Entities are described by parallel per-entity
+arrays (kind, layer, stable id) plus an ``offsets`` array delimiting each
+entity's slice of the coordinate buffer, so kernels can operate on all
+entities at once instead of looping over Python objects.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Iterable, Sequence
+
+import numpy as np
+
+POINT = 0
+LINESTRING = 1
+POLYGON = 2
+
+KIND_NAMES = {POINT: "point", LINESTRING: "linestring", POLYGON: "polygon"}
+MIN_VERTICES = {POINT: 1, LINESTRING: 2, POLYGON: 3}
+
+
+class GeometryStore:
+    """Immutable batch of 2D entities backed by NumPy arrays.
+
+    Attributes:
+        coords: ``(N, 2)`` float64 vertex buffer.  Polygon rings are stored
+            open (the closing vertex is implicit).
+        offsets: ``(E + 1,)`` int64 array; entity ``i`` owns
+            ``coords[offsets[i]:offsets[i + 1]]``.
+        kinds: ``(E,)`` uint8 entity kind (``POINT``, ``LINESTRING``,
+            ``POLYGON``).
+        layers: ``(E,)`` int32 index into ``layer_names``.
+        ids: ``(E,)`` int64 stable entity identifiers.
+        layer_names: layer name for each layer index.
+    """
+
+    __slots__ = ("coords", "offsets", "kinds", "layers", "ids", "layer_names")
+
+    def __init__(
+        self,
+        coords: np.ndarray,
+        offsets: np.ndarray,
+        kinds: np.ndarray,
+        layers: np.ndarray | None = None,
+        ids: np.ndarray | None = None,
+        layer_names: Sequence[str] = ("0",),
+        validate: bool = True,
+    ):
+        coords = np.ascontiguousarray(coords, dtype=np.float64).reshape(-1, 2)
+        offsets = np.ascontiguousarray(offsets, dtype=np.int64)
+        kinds = np.ascontiguousarray(kinds, dtype=np.uint8)
+        n = len(kinds)
+        if layers is None:
+            layers = np.zeros(n, dtype=np.int32)
+        if ids is None:
+            ids = np.arange(n, dtype=np.int64)
+        layers = np.ascontiguousarray(layers, dtype=np.int32)
+        ids = np.ascontiguousarray(ids, dtype=np.int64)
+
+        if offsets.shape != (n + 1,) or offsets[0] != 0 or offsets[-1] != len(coords):
+            raise ValueError("offsets must have E + 1 entries spanning coords")
+        if layers.shape != (n,) or ids.shape != (n,):
+            raise ValueError("layers and ids must have one entry per entity")
+        if validate:
+            self._validate(offsets, kinds, layers, len(layer_names))
+
+        self.coords = coords
+        self.offsets = offsets
+        self.kinds = kinds
+        self.layers = layers
+        self.ids = ids
+        self.layer_names = tuple(str(name) for name in layer_names)
+
+    @staticmethod
+    def _validate(offsets, kinds, layers, num_layers: int) -> None:
+        """Per-entity checks; O(E), skipped for trusted (e.g. memory-mapped) input."""
+        n = len(kinds)
+        if n and (layers.min() < 0 or layers.max() >= num_layers):
+            raise ValueError("layer index out of range")
+        counts = np.diff(offsets)
+        minimum = np.zeros(n, dtype=np.int64)
+        for kind, min_count in MIN_VERTICES.items():
+            minimum[kinds == kind] = min_count
+        if np.any(counts < minimum) or np.any(minimum == 0):
+            raise ValueError("entity has an unknown kind or too few vertices")
+
+    @classmethod
+    def empty(cls, layer_names: Sequence[str] = ("0",)) -> "GeometryStore":
+        return cls(
+            np.empty((0, 2)), np.zeros(1, dtype=np.int64), np.empty(0, np.uint8),
+            layer_names=layer_names,
+        )
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __repr__(self) -> str:
+        return (
+            f"GeometryStore(entities={len(self)}, vertices={self.num_vertices}, "
+            f"layers={len(self.layer_names)})"
+        )
+
+    @property
+    def num_vertices(self) -> int:
+        return len(self.coords)
+
+    @property
+    def counts(self) -> np.ndarray:
+        """Number of vertices per entity."""
+        return np.diff(self.offsets)
+
+    @property
+    def vertex_entity(self) -> np.ndarray:
+        """Entity position (not id) owning each vertex, shape ``(N,)``."""
+        return np.repeat(np.arange(len(self), dtype=np.int64), self.counts)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            a.nbytes for a in (self.coords, self.offsets, self.kinds, self.layers, self.ids)
+        )
+
+    def digest(self) -> str:
+        """Content hash of the geometry, layers and ids (hex, 32 chars).
+
+        Used as the cache key for anything derived from this store.
+        """
+        h = hashlib.blake2b(digest_size=16)
+        for a in (self.coords, self.offsets, self.kinds, self.layers, self.ids):
+            h.update(memoryview(np.ascontiguousarray(a)).cast("B"))
+        h.update("\0".join(self.layer_names).encode())
+        return h.hexdigest()
+
+    def entity_coords(self, i: int) -> np.ndarray:
+        """Return a view of the vertices of the entity at position ``i``."""
+        return self.coords[self.offsets[i]:self.offsets[i + 1]]
+
+    def layer_index(self, name: str) -> int:
+        try:
+            return self.layer_names.index(name)
+        except ValueError:
+            raise KeyError(f"unknown layer {name!r}") from None
+
+    def layer_mask(self, names: str | Iterable[str]) -> np.ndarray:
+        """Boolean entity mask selecting the given layer name(s)."""
+        if isinstance(names, str):
+            names = [names]
+        wanted = [self.layer_index(n) for n in names]
+        return np.isin(self.layers, wanted)
+
+    def positions(self, ids: Iterable[int]) -> np.ndarray:
+        """Map stable entity ids to positions in this store."""
+        ids = np.asarray(list(ids) if not isinstance(ids, np.ndarray) else ids, np.int64)
+        order = np.argsort(self.ids, kind="stable")
+        found = np.searchsorted(self.ids, ids, sorter=order)
+        found = np.minimum(found, max(len(order) - 1, 0))
+        pos = order[found] if len(order) else found
+        if len(ids) and (len(order) == 0 or np.any(self.ids[pos] != ids)):
+            raise KeyError("unknown entity id")
+        return pos
+
+    def subset(self, selector: np.ndarray | Sequence[int]) -> "GeometryStore":
+        """Return a new store with the entities picked by a mask or positions.
+
+        Entity ids and layer names are preserved.
+        """
+        sel = np.asarray(selector)
+        if sel.dtype == bool:
+            sel = np.flatnonzero(sel)
+        sel = sel.astype(np.int64, copy=False)
+        counts = self.counts[sel]
+        offsets = np.zeros(len(sel) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        # Gather vertex indices for each selected entity without a Python loop.
+        starts = np.repeat(self.offsets[:-1][sel] - offsets[:-1], counts)
+        vidx = np.arange(offsets[-1], dtype=np.int64) + starts
+        return GeometryStore(
+            self.coords[vidx], offsets, self.kinds[sel], self.layers[sel],
+            self.ids[sel], self.layer_names,
+        )
+
+    def with_coords(self, coords: np.ndarray) -> "GeometryStore":
+        """Return a store sharing topology with ``self`` but new vertices."""
+        if coords.shape != self.coords.shape:
+            raise ValueError("coordinate array shape mismatch")
+        return GeometryStore(
+            coords, self.offsets, self.kinds, self.layers, self.ids, self.layer_names
+        )
+
+    @staticmethod
+    def concat(stores: Sequence["GeometryStore"]) -> "GeometryStore":
+        """Concatenate stores, merging their layer tables by name."""
+        stores = [s for s in stores]
+        if not stores:
+            return GeometryStore.empty()
+        names: list[str] = []
+        lookup: dict[str, int] = {}
+        layers = []
+        for s in stores:
+            remap = np.empty(len(s.layer_names), dtype=np.int32)
+            for i, name in enumerate(s.layer_names):
+                if name not in lookup:
+                    lookup[name] = len(names)
+                    names.append(name)
+                remap[i] = lookup[name]
+            layers.append(remap[s.layers])
+        counts = np.concatenate([s.counts for s in stores])
+        offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return GeometryStore(
+            np.concatenate([s.coords for s in stores]),
+            offsets,
+            np.concatenate([s.kinds for s in stores]),
+            np.concatenate(layers),
+            np.concatenate([s.ids for s in stores]),
+            names,
+        )
+
+
+class GeometryBuilder:
+    """Accumulates entities one at a time and packs them into a store.
+
+    Parsers append entities as they are read; :meth:`build` concatenates
+    the collected vertex blocks once.
+    """
+
+    def __init__(self, layer_names: Sequence[str] = ()):
+        self._coords: list[np.ndarray] = []
+        self._counts: list[int] = []
+        self._kinds: list[int] = []
+        self._layers: list[int] = []
+        self._ids: list[int] = []
+        self._layer_lookup: dict[str, int] = {}
+        self._next_id = 0
+        for name in layer_names:
+            self._layer(name)
+
+    def __len__(self) -> int:
+        return len(self._kinds)
+
+    def _layer(self, name: str) -> int:
+        idx = self._layer_lookup.get(name)
+        if idx is None:
+            idx = self._layer_lookup[name] = len(self._layer_lookup)
+        return idx
+
+    def add(self, kind: int, coords, layer: str = "0", entity_id: int | None = None) -> int:
+        """Append an entity and return its id."""
+        pts = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        if kind == POLYGON and len(pts) > 3 and np.array_equal(pts[0], pts[-1]):
+            pts = pts[:-1]
+        if kind not in MIN_VERTICES or len(pts) < MIN_VERTICES[kind]:
+            raise ValueError(f"invalid {KIND_NAMES.get(kind, kind)} with {len(pts)} vertices")
+        if entity_id is None:
+            entity_id = self._next_id
+        self._next_id = max(self._next_id, entity_id + 1)
+        self._coords.append(pts)
+        self._counts.append(len(pts))
+        self._kinds.append(kind)
+        self._layers.append(self._layer(layer))
+        self._ids.append(entity_id)
+        return entity_id
+
+    def add_point(self, xy, layer: str = "0") -> int:
+        return self.add(POINT, xy, layer)
+
+    def add_linestring(self, coords, layer: str = "0") -> int:
+        return self.add(LINESTRING, coords, layer)
+
+    def add_polygon(self, coords, layer: str = "0") -> int:
+        return self.add(POLYGON, coords, layer)
+
+    def build(self) -> GeometryStore:
+        names = sorted(self._layer_lookup, key=self._layer_lookup.__getitem__) or ["0"]
+        if not self._kinds:
+            return GeometryStore.empty(names)
+        offsets = np.zeros(len(self._counts) + 1, dtype=np.int64)
+        np.cumsum(self._counts, out=offsets[1:])
+        return GeometryStore(
+            np.concatenate(self._coords),
+            offsets,
+            np.asarray(self._kinds, dtype=np.uint8),
+            np.asarray(self._layers, dtype=np.int32),
+            np.asarray(self._ids, dtype=np.int64),
+            names,
+        )
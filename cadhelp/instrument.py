@@ -0,0 +1,244 @@
+"""Per-stage timers and counters for the hot paths.
+
+Stages (``parse``, ``index``, ``cull``, ``rasterize``, ``encode``,
+``recognize``, ...) are timed with :func:`timed`, as a context manager
+or a decorator, into fixed-bucket latency histograms; :func:`count`
+bumps named counters.  Everything lives in one process-wide
+:class:`Registry`, exported in the Prometheus text format by
+:func:`prometheus` (served as ``GET /metrics`` by the API) and as plain
+rows by :meth:`Registry.snapshot` for the Streamlit debug panel.
+
+Each process keeps its own numbers: Flask workers are scraped one by
+one, and work done in job worker processes is not counted in the
+process that submitted it.
+
+Recording is on by default; set ``CADHELP_METRICS=0`` (or call
+:func:`enable` with ``False``) to turn it off.  Disabled timers cost one
+flag test per call, and a decorated function calls straight through.
+"""
+
+from __future__ import annotations
+
+import functools
+import math
+import os
+import threading
+from bisect import bisect_left
+from time import perf_counter
+from typing import Callable, Mapping
+
+PREFIX = "cadhelp"
+# Upper bounds of the latency buckets, in seconds; a last +Inf bucket is implied.
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+           1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_enabled = os.environ.get("CADHELP_METRICS", "1").lower() not in ("0", "false", "no", "off")
+
+
+def enable(on: bool = True) -> None:
+    global _enabled
+    _enabled = on
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+class Histogram:
+    """Counts of observations per latency bucket, plus their sum and maximum."""
+
+    def __init__(self, buckets: tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        i = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counts = [0] * (len(self.buckets) + 1)
+            self.sum = self.max = 0.0
+
+    def quantile(self, q: float) -> float:
+        """Estimate of the ``q`` quantile, interpolated within its bucket."""
+        with self._lock:
+            counts, top = list(self.counts), self.max
+        total = sum(counts)
+        if not total:
+            return math.nan
+        rank, seen = q * total, 0
+        for i, n in enumerate(counts):
+            if n and seen + n >= rank:
+                lo = self.buckets[i - 1] if i else 0.0
+                hi = min(self.buckets[i], top) if i < len(self.buckets) else top
+                return lo + (hi - lo) * max(rank - seen, 0.0) / n
+            seen += n
+        return top
+
+
+class Registry:
+    """Histograms by stage and counters by name."""
+
+    def __init__(self):
+        self.histograms: dict[str, Histogram] = {}
+        self.counters: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, stage: str) -> Histogram:
+        h = self.histograms.get(stage)
+        if h is None:
+            with self._lock:
+                h = self.histograms.setdefault(stage, Histogram())
+        return h
+
+    def count(self, name: str, n: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self) -> dict[str, list[dict]]:
+        """``stages`` and ``counters`` rows, sorted by name."""
+        with self._lock:
+            histograms = sorted(self.histograms.items())
+        stages = []
+        for stage, h in histograms:
+            n = h.count
+            if not n:
+                continue
+            stages.append({
+                "stage": stage, "count": n, "total_s": h.sum,
+                "mean_ms": 1000 * h.sum / n if n else math.nan,
+                "p50_ms": 1000 * h.quantile(0.5), "p95_ms": 1000 * h.quantile(0.95),
+                "max_ms": 1000 * h.max,
+            })
+        with self._lock:
+            counters = [{"counter": k, "value": v} for k, v in sorted(self.counters.items())]
+        return {"stages": stages, "counters": counters}
+
+    def reset(self) -> None:
+        """Zero everything; histograms stay registered, so timers bound to them keep working."""
+        with self._lock:
+            for h in self.histograms.values():
+                h.reset()
+            self.counters.clear()
+
+
+REGISTRY = Registry()
+
+
+def observe(stage: str, seconds: float) -> None:
+    """Record a duration measured elsewhere."""
+    if _enabled:
+        REGISTRY.histogram(stage).observe(seconds)
+
+
+def count(name: str, n: float = 1) -> None:
+    """Add ``n`` to counter ``name``."""
+    if _enabled:
+        REGISTRY.count(name, n)
+
+
+class Timer:
+    """See :func:`timed`."""
+
+    __slots__ = ("stage", "_start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self._start: float | None = None
+
+    def __enter__(self) -> "Timer":
+        if _enabled:
+            self._start = perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._start is not None:
+            REGISTRY.histogram(self.stage).observe(perf_counter() - self._start)
+            self._start = None
+
+    def __call__(self, func: Callable) -> Callable:
+        histogram = REGISTRY.histogram(self.stage)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(perf_counter() - start)
+
+        return wrapper
+
+
+def timed(stage: str) -> Timer:
+    """Time a block (``with timed("parse"):``) or every call of a function
+    (``@timed("index")``) into the histogram of ``stage``.
+
+    Failed calls are timed too.  A timer used as a context manager times
+    one block at a time; create one per ``with``.
+    """
+    return Timer(stage)
+
+
+# -- Prometheus text format --------------------------------------------------
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _name(name: str) -> str:
+    return f"{PREFIX}_{''.join(c if c.isalnum() else '_' for c in name)}"
+
+
+def prometheus(gauges: Mapping[str, float] | None = None,
+               counters: Mapping[str, float] | None = None,
+               registry: Registry = REGISTRY) -> str:
+    """Stage histograms, counters and ``gauges`` in the Prometheus text format.
+
+    Histograms form one family, ``cadhelp_stage_seconds{stage=...}``;
+    counter ``x`` becomes ``cadhelp_x_total`` and gauge ``y`` ``cadhelp_y``.
+    ``counters`` adds totals kept elsewhere (e.g. cache hit counts).
+    """
+    lines = []
+    with registry._lock:
+        histograms = sorted(registry.histograms.items())
+    if histograms:
+        family = f"{PREFIX}_stage_seconds"
+        lines += [f"# HELP {family} Time spent per pipeline stage.",
+                  f"# TYPE {family} histogram"]
+        for stage, h in histograms:
+            with h._lock:
+                counts, total = list(h.counts), h.sum
+            label = stage.replace("\\", "\\\\").replace('"', '\\"')
+            cumulative = 0
+            for bound, n in zip((*h.buckets, math.inf), counts):
+                cumulative += n
+                lines.append(f'{family}_bucket{{stage="{label}",le="{_number(bound)}"}} '
+                             f"{cumulative}")
+            lines.append(f'{family}_sum{{stage="{label}"}} {_number(total)}')
+            lines.append(f'{family}_count{{stage="{label}"}} {cumulative}')
+    with registry._lock:
+        totals = {**registry.counters, **(counters or {})}
+    for name, value in sorted(totals.items()):
+        metric = f"{_name(name)}_total"
+        lines += [f"# TYPE {metric} counter", f"{metric} {_number(value)}"]
+    for name, value in sorted((gauges or {}).items()):
+        metric = _name(name)
+        lines += [f"# TYPE {metric} gauge", f"{metric} {_number(value)}"]
+    return "\n".join(lines) + "\n"
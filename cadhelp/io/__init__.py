@@ -0,0 +1,99 @@
+"""Readers and writers for drawing files.
+
+DXF and SVG are parsed as streams: :func:`iter_drawing` yields the drawing
+as a sequence of small stores while the input is still being read.
+GeoJSON is a single JSON document and is parsed in one go.  Raster
+scans (PNG, JPEG, TIFF, BMP) are traced into line work by
+:mod:`cadhelp.trace`.  Parsed drawings can be saved in the native
+``.cadb`` format, which :func:`open_drawing` memory-maps instead of
+parsing.
+"""
+
+from __future__ import annotations
+
+from os import PathLike
+from pathlib import PurePath
+from typing import IO, Callable, Iterator
+
+from ..geometry import GeometryStore
+from ..instrument import timed
+from ..trace import IMAGE_SUFFIXES, read_image
+from .binary import read_binary, write_binary
+from .dxf import iter_dxf, read_dxf
+from .geojson import read_geojson, write_geojson
+from .stream import BATCH_SIZE, Entity, StreamingLoad, as_stream, batches
+from .svg import iter_svg, read_svg
+
+Source = bytes | IO[bytes]
+
+# Streaming parsers: file object -> iterator of entities.
+STREAM_READERS: dict[str, Callable[..., Iterator[Entity]]] = {
+    ".dxf": iter_dxf,
+    ".svg": iter_svg,
+}
+
+# Whole-document parsers: bytes or file object -> store.
+READERS: dict[str, Callable[[Source], GeometryStore]] = {
+    ".dxf": read_dxf,
+    ".svg": read_svg,
+    ".geojson": read_geojson,
+    ".json": read_geojson,
+    ".cadb": read_binary,
+    **dict.fromkeys(IMAGE_SUFFIXES, read_image),
+}
+
+
+def _suffix(name: str) -> str:
+    suffix = PurePath(name).suffix.lower()
+    if suffix not in READERS:
+        raise ValueError(f"unsupported drawing format {suffix or name!r}")
+    return suffix
+
+
+def iter_drawing(source: Source, name: str,
+                 batch_size: int = BATCH_SIZE) -> Iterator[GeometryStore]:
+    """Parse ``source`` incrementally, yielding stores of ``batch_size`` entities."""
+    suffix = _suffix(name)
+    if suffix in STREAM_READERS:
+        yield from batches(STREAM_READERS[suffix](as_stream(source)), batch_size)
+    else:
+        yield READERS[suffix](source)
+
+
+@timed("parse")
+def read_drawing(source: Source, name: str) -> GeometryStore:
+    """Parse ``source`` with the reader registered for ``name``'s suffix."""
+    return READERS[_suffix(name)](source)
+
+
+def open_drawing(path: str | PathLike) -> GeometryStore:
+    """Open a drawing file; ``.cadb`` files are memory-mapped, not parsed."""
+    if PurePath(path).suffix.lower() == ".cadb":
+        return read_binary(path)
+    with open(path, "rb") as f:
+        return read_drawing(f, str(path))
+
+
+def load_in_background(source: Source, name: str,
+                       batch_size: int = BATCH_SIZE) -> StreamingLoad:
+    """Start parsing on a background thread; see :class:`StreamingLoad`."""
+    _suffix(name)
+    return StreamingLoad(iter_drawing(source, name, batch_size))
+
+
+__all__ = [
+    "READERS",
+    "STREAM_READERS",
+    "StreamingLoad",
+    "iter_drawing",
+    "load_in_background",
+    "open_drawing",
+    "read_binary",
+    "read_drawing",
+    "read_dxf",
+    "read_geojson",
+    "read_image",
+    "read_svg",
+    "write_binary",
+    "write_geojson",
+]
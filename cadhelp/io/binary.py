@@ -0,0 +1,145 @@
+"""Native binary drawing format (``.cadb``) with memory-mapped loading.
+
+Layout (little-endian)::
+
+    header   128 bytes: magic, version, entity/vertex counts and the byte
+             offset of each section below
+    kinds    uint8[E]
+    layers   int32[E]
+    ids      int64[E]
+    offsets  int64[E + 1]
+    coords   float64[N, 2]
+    names    UTF-8 JSON list of layer names
+
+Every array section starts on a 64-byte boundary, so :func:`read_binary`
+can map each one with ``numpy.memmap``.  Opening a file costs a header
+read and a few ``mmap`` calls regardless of its size; pages are loaded on
+first touch and shared through the OS page cache by every process that
+maps the same file.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import IO
+
+import numpy as np
+
+from ..geometry import GeometryStore
+
+MAGIC = b"CADHELPB"
+VERSION = 1
+SUFFIX = ".cadb"
+ALIGN = 64
+
+# magic, version, E, N, then offsets of kinds/layers/ids/offsets/coords/names
+# and the byte length of names.
+_HEADER = struct.Struct("<8sIQQ6QI")
+HEADER_SIZE = 2 * ALIGN
+
+_SECTIONS = (
+    ("kinds", np.dtype("<u1")),
+    ("layers", np.dtype("<i4")),
+    ("ids", np.dtype("<i8")),
+    ("offsets", np.dtype("<i8")),
+    ("coords", np.dtype("<f8")),
+)
+
+
+def _aligned(n: int) -> int:
+    return -(-n // ALIGN) * ALIGN
+
+
+def write_binary(store: GeometryStore, path: str | os.PathLike) -> Path:
+    """Write ``store`` to ``path`` atomically (temp file + rename)."""
+    path = Path(path)
+    e, n = len(store), store.num_vertices
+    arrays = {
+        "kinds": store.kinds, "layers": store.layers, "ids": store.ids,
+        "offsets": store.offsets, "coords": store.coords,
+    }
+    names = json.dumps(list(store.layer_names)).encode()
+
+    pos = HEADER_SIZE
+    starts = []
+    for name, dtype in _SECTIONS:
+        starts.append(pos)
+        pos = _aligned(pos + arrays[name].size * dtype.itemsize)
+    starts.append(pos)
+
+    header = _HEADER.pack(MAGIC, VERSION, e, n, *starts, len(names))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header.ljust(HEADER_SIZE, b"\0"))
+            for (name, dtype), start in zip(_SECTIONS, starts):
+                f.seek(start)
+                f.write(np.ascontiguousarray(arrays[name], dtype=dtype).tobytes())
+            f.seek(starts[-1])
+            f.write(names)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return path
+
+
+def _parse_header(raw: bytes, source) -> tuple:
+    if len(raw) < _HEADER.size:
+        raise ValueError(f"{source}: truncated header")
+    magic, version, e, n, *starts, names_len = _HEADER.unpack_from(raw)
+    if magic != MAGIC:
+        raise ValueError(f"{source}: not a {SUFFIX} drawing")
+    if version != VERSION:
+        raise ValueError(f"{source}: unsupported format version {version}")
+    return e, n, starts, names_len
+
+
+def _shapes(e: int, n: int) -> dict:
+    return {"kinds": (e,), "layers": (e,), "ids": (e,), "offsets": (e + 1,), "coords": (n, 2)}
+
+
+def read_binary(source: str | os.PathLike | bytes | IO[bytes], mmap: bool = True) -> GeometryStore:
+    """Open a ``.cadb`` drawing.
+
+    Given a path and ``mmap`` (the default), the arrays are read-only
+    views of the file, so loading is zero-copy.  Bytes and file objects
+    (e.g. uploads) are read once and viewed with ``numpy.frombuffer``.
+    """
+    if not isinstance(source, (str, os.PathLike)):
+        data = source if isinstance(source, bytes) else source.read()
+        e, n, starts, names_len = _parse_header(data[:HEADER_SIZE], "upload")
+        layer_names = json.loads(data[starts[-1]:starts[-1] + names_len])
+        arrays = {
+            name: np.frombuffer(data, dtype, int(np.prod(shape)), start).reshape(shape)
+            for ((name, dtype), start), shape in zip(zip(_SECTIONS, starts), _shapes(e, n).values())
+        }
+        return GeometryStore(
+            arrays["coords"], arrays["offsets"], arrays["kinds"], arrays["layers"],
+            arrays["ids"], layer_names,
+        )
+
+    path = Path(source)
+    with open(path, "rb") as f:
+        e, n, starts, names_len = _parse_header(f.read(HEADER_SIZE), path)
+        f.seek(starts[-1])
+        layer_names = json.loads(f.read(names_len))
+
+    shapes = _shapes(e, n)
+    arrays = {}
+    for (name, dtype), start in zip(_SECTIONS, starts):
+        shape = shapes[name]
+        if mmap and np.prod(shape):
+            arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=start, shape=shape)
+        else:
+            arrays[name] = np.fromfile(path, dtype=dtype, count=int(np.prod(shape)),
+                                       offset=start).reshape(shape)
+    return GeometryStore(
+        arrays["coords"], arrays["offsets"], arrays["kinds"], arrays["layers"],
+        arrays["ids"], layer_names, validate=not mmap,
+    )
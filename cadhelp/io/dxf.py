@@ -0,0 +1,159 @@
+"""Streaming reader for ASCII DXF drawings.
+
+Only the ``ENTITIES`` section is read.  Supported entities: ``LINE``,
+``LWPOLYLINE``, ``POLYLINE``/``VERTEX``/``SEQEND``, ``CIRCLE``, ``ARC``,
+``ELLIPSE``, ``SPLINE`` (as a polyline through its fit or control points)
+and ``POINT``.  Curves are flattened into straight segments; polyline
+bulges are ignored.  Block inserts are not expanded.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import IO, Iterator
+
+import numpy as np
+
+from ..geometry import GeometryStore, LINESTRING, POINT, POLYGON
+from .stream import BATCH_SIZE, CHUNK_SIZE, Entity, as_stream, batches, iter_lines
+
+ARC_SEGMENTS = 64  # segments per full turn when flattening curves
+
+
+def _arc(cx, cy, r, start, end, closed=False) -> np.ndarray:
+    if closed:
+        t = np.linspace(0.0, 2 * math.pi, ARC_SEGMENTS, endpoint=False)
+    else:
+        sweep = (end - start) % (2 * math.pi) or 2 * math.pi
+        n = max(int(math.ceil(ARC_SEGMENTS * sweep / (2 * math.pi))), 2)
+        t = start + np.linspace(0.0, sweep, n + 1)
+    return np.column_stack([cx + r * np.cos(t), cy + r * np.sin(t)])
+
+
+def _ellipse(tags: dict) -> Entity | None:
+    cx, cy = tags.get(10, 0.0), tags.get(20, 0.0)
+    mx, my = tags.get(11, 1.0), tags.get(21, 0.0)
+    ratio = tags.get(40, 1.0)
+    t0, t1 = tags.get(41, 0.0), tags.get(42, 2 * math.pi)
+    full = abs((t1 - t0) - 2 * math.pi) < 1e-9
+    if full:
+        t = np.linspace(0.0, 2 * math.pi, ARC_SEGMENTS, endpoint=False)
+    else:
+        sweep = (t1 - t0) % (2 * math.pi)
+        t = t0 + np.linspace(0.0, sweep, max(int(ARC_SEGMENTS * sweep / (2 * math.pi)), 2) + 1)
+    # Minor axis is the major axis rotated 90 degrees, scaled by ratio.
+    x = cx + mx * np.cos(t) - my * ratio * np.sin(t)
+    y = cy + my * np.cos(t) + mx * ratio * np.sin(t)
+    return Entity(POLYGON if full else LINESTRING, np.column_stack([x, y]), tags["layer"])
+
+
+class _Entity:
+    """Group codes of one entity as they are read."""
+
+    __slots__ = ("type", "tags", "xs", "ys")
+
+    def __init__(self, type_: str):
+        self.type = type_
+        self.tags: dict = {"layer": "0"}
+        self.xs: list[float] = []
+        self.ys: list[float] = []
+
+    def add(self, code: int, value: str) -> None:
+        if code == 8:
+            self.tags["layer"] = value.strip()
+        elif code == 10 and self.type in ("LWPOLYLINE", "SPLINE"):
+            self.xs.append(float(value))
+        elif code == 20 and self.type in ("LWPOLYLINE", "SPLINE"):
+            self.ys.append(float(value))
+        elif code in (11, 21) and self.type == "SPLINE":
+            self.tags.setdefault(code, []).append(float(value))
+        elif code in (10, 20, 11, 21, 40, 41, 42, 50, 51):
+            self.tags[code] = float(value)
+        elif code == 70:
+            self.tags[70] = int(value)
+
+
+def _finish(e: _Entity, polyline: dict | None) -> Entity | None:
+    t, tags = e.type, e.tags
+    if t == "LINE":
+        return Entity(LINESTRING, [(tags.get(10, 0.0), tags.get(20, 0.0)),
+                                   (tags.get(11, 0.0), tags.get(21, 0.0))], tags["layer"])
+    if t == "POINT":
+        return Entity(POINT, [(tags.get(10, 0.0), tags.get(20, 0.0))], tags["layer"])
+    if t == "LWPOLYLINE":
+        kind = POLYGON if tags.get(70, 0) & 1 else LINESTRING
+        return Entity(kind, np.column_stack([e.xs, e.ys[:len(e.xs)]]), tags["layer"])
+    if t == "CIRCLE":
+        return Entity(POLYGON, _arc(tags.get(10, 0.0), tags.get(20, 0.0), tags.get(40, 0.0),
+                                    0.0, 0.0, closed=True), tags["layer"])
+    if t == "ARC":
+        return Entity(LINESTRING, _arc(
+            tags.get(10, 0.0), tags.get(20, 0.0), tags.get(40, 0.0),
+            math.radians(tags.get(50, 0.0)), math.radians(tags.get(51, 360.0)),
+        ), tags["layer"])
+    if t == "ELLIPSE":
+        return _ellipse(tags)
+    if t == "SPLINE":
+        fx, fy = tags.get(11), tags.get(21)
+        xs, ys = (fx, fy) if fx and fy else (e.xs, e.ys)
+        n = min(len(xs), len(ys))
+        kind = POLYGON if tags.get(70, 0) & 1 else LINESTRING
+        return Entity(kind, np.column_stack([xs[:n], ys[:n]]), tags["layer"])
+    if t == "VERTEX" and polyline is not None:
+        polyline["points"].append((tags.get(10, 0.0), tags.get(20, 0.0)))
+    return None
+
+
+def iter_dxf(source, chunk_size: int = CHUNK_SIZE) -> Iterator[Entity]:
+    """Yield entities from a DXF file object (or bytes) as they are read."""
+    lines = iter_lines(as_stream(source), "utf-8", chunk_size)
+    in_entities = False
+    section_pending = False
+    current: _Entity | None = None
+    polyline: dict | None = None  # open POLYLINE collecting VERTEX entities
+
+    for code_line in lines:
+        value = next(lines, None)
+        if value is None:
+            break
+        try:
+            code = int(code_line)
+        except ValueError:
+            raise ValueError(f"malformed DXF group code {code_line!r}") from None
+
+        if code == 0:
+            if current is not None:
+                done = _finish(current, polyline)
+                if current.type == "POLYLINE":
+                    polyline = {"layer": current.tags["layer"],
+                                "closed": bool(current.tags.get(70, 0) & 1), "points": []}
+                elif done is not None:
+                    yield done
+                current = None
+            name = value.strip()
+            if name == "SEQEND" and polyline is not None:
+                kind = POLYGON if polyline["closed"] else LINESTRING
+                yield Entity(kind, polyline["points"], polyline["layer"])
+                polyline = None
+            elif name == "SECTION":
+                section_pending = True
+            elif name == "ENDSEC":
+                in_entities = False
+            elif name == "EOF":
+                break
+            elif in_entities:
+                current = _Entity(name)
+        elif code == 2 and section_pending:
+            in_entities = value.strip() == "ENTITIES"
+            section_pending = False
+        elif current is not None:
+            current.add(code, value)
+
+    if current is not None:
+        done = _finish(current, polyline)
+        if done is not None:
+            yield done
+
+
+def read_dxf(source: bytes | IO[bytes], batch_size: int = BATCH_SIZE) -> GeometryStore:
+    return GeometryStore.concat(list(batches(iter_dxf(source), batch_size)))
@@ -0,0 +1,50 @@
+"""GeoJSON import and export, mainly for exchanging drawings with GIS tools."""
+
+from __future__ import annotations
+
+import json
+from typing import IO
+
+import shapely
+
+from ..geometry import GeometryStore, from_shapely, to_shapely
+
+
+def read_geojson(source: str | bytes | IO, layer_property: str = "layer") -> GeometryStore:
+    """Read a GeoJSON Feature, FeatureCollection or bare geometry.
+
+    The ``layer_property`` of each feature's properties names its layer;
+    features without one go to layer ``"0"``.
+    """
+    if hasattr(source, "read"):
+        source = source.read()
+    doc = json.loads(source)
+    if not isinstance(doc, dict):
+        raise ValueError("GeoJSON must be an object")
+    if doc.get("type") == "FeatureCollection":
+        features = doc.get("features", [])
+    elif doc.get("type") == "Feature":
+        features = [doc]
+    else:
+        features = [{"geometry": doc}]
+    if not isinstance(features, list) or not all(isinstance(f, dict) for f in features):
+        raise ValueError("GeoJSON features must be a list of objects")
+    features = [f for f in features if f.get("geometry")]
+    try:
+        geoms = shapely.from_geojson([json.dumps(f["geometry"]) for f in features])
+    except shapely.errors.ShapelyError as exc:
+        raise ValueError(f"invalid GeoJSON geometry: {exc}") from None
+    layers = [str((f.get("properties") or {}).get(layer_property, "0")) for f in features]
+    return from_shapely(geoms, layers)
+
+
+def write_geojson(store: GeometryStore) -> dict:
+    """Export ``store`` as a FeatureCollection with ``id`` and ``layer``."""
+    geoms = shapely.to_geojson(to_shapely(store))
+    names = store.layer_names
+    features = [
+        {"type": "Feature", "id": int(i), "properties": {"layer": names[layer]},
+         "geometry": json.loads(g)}
+        for i, layer, g in zip(store.ids.tolist(), store.layers.tolist(), geoms.tolist())
+    ]
+    return {"type": "FeatureCollection", "features": features}
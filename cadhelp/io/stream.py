@@ -0,0 +1,138 @@
+"""Chunked reading and batching shared by the streaming parsers.
+
+Parsers consume a file object in fixed-size chunks and yield one
+:data:`Entity` at a time; :func:`batches` packs them into a sequence of
+small :class:`GeometryStore` objects.  Neither the raw file nor its
+decoded text is ever held in memory as a whole, so peak memory follows
+the number of entities rather than the file size.
+"""
+
+from __future__ import annotations
+
+import codecs
+import io
+import threading
+from typing import IO, Iterable, Iterator, NamedTuple
+
+import numpy as np
+
+from ..geometry import GeometryBuilder, GeometryStore
+from ..instrument import timed
+
+CHUNK_SIZE = 1 << 20
+BATCH_SIZE = 10_000
+
+
+class Entity(NamedTuple):
+    kind: int
+    coords: np.ndarray | list
+    layer: str
+
+
+def as_stream(source: bytes | bytearray | memoryview | IO[bytes]) -> IO[bytes]:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+
+def iter_chunks(fp: IO[bytes], chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    while True:
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_lines(fp: IO[bytes], encoding: str = "utf-8",
+               chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Decode ``fp`` incrementally and yield its lines without line endings."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    tail = ""
+    for chunk in iter_chunks(fp, chunk_size):
+        lines = (tail + decoder.decode(chunk)).splitlines(keepends=True)
+        tail = lines.pop() if lines and not lines[-1].endswith(("\n", "\r")) else ""
+        for line in lines:
+            yield line.rstrip("\r\n")
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def batches(entities: Iterable[Entity], batch_size: int = BATCH_SIZE,
+            first_id: int = 0) -> Iterator[GeometryStore]:
+    """Pack entities into stores of at most ``batch_size`` entities.
+
+    Entity ids run consecutively from ``first_id`` across batches, so
+    ``GeometryStore.concat`` of all batches equals a one-shot parse.
+    """
+    builder = GeometryBuilder()
+    next_id = first_id
+    for kind, coords, layer in entities:
+        try:
+            builder.add(kind, coords, layer, entity_id=next_id)
+        except ValueError:
+            continue  # degenerate entity (too few vertices)
+        next_id += 1
+        if len(builder) >= batch_size:
+            yield builder.build()
+            builder = GeometryBuilder()
+    if len(builder):
+        yield builder.build()
+
+
+class StreamingLoad:
+    """Parses a drawing on a background thread, exposing partial results.
+
+    Viewers can draw :meth:`snapshot` while the rest of the file is still
+    being parsed, and call :meth:`result` to wait for the full store.
+
+    Args:
+        batches: iterator of stores, e.g. from :func:`cadhelp.io.iter_drawing`.
+    """
+
+    def __init__(self, batches: Iterator[GeometryStore]):
+        self._batches = batches
+        self._parts: list[GeometryStore] = []
+        self._merged: GeometryStore | None = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self.error: BaseException | None = None
+        self._thread = threading.Thread(target=self._run, name="drawing-parse", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            with timed("parse"):
+                for batch in self._batches:
+                    with self._lock:
+                        self._parts.append(batch)
+                        self._merged = None
+        except BaseException as exc:  # surfaced through result()
+            self.error = exc
+        finally:
+            self._done.set()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def entities(self) -> int:
+        with self._lock:
+            return sum(len(p) for p in self._parts)
+
+    def snapshot(self) -> GeometryStore:
+        """Everything parsed so far as a single store."""
+        with self._lock:
+            if self._merged is None:
+                self._merged = GeometryStore.concat(self._parts)
+                self._parts = [self._merged]
+            return self._merged
+
+    def result(self, timeout: float | None = None) -> GeometryStore:
+        """Wait for parsing to finish and return the full store."""
+        if not self._done.wait(timeout):
+            raise TimeoutError("drawing is still parsing")
+        if self.error is not None:
+            raise self.error
+        return self.snapshot()
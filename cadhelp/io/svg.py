@@ -0,0 +1,249 @@
+"""Streaming reader for SVG drawings.
+
+The document is fed to an ``XMLPullParser`` chunk by chunk and each shape
+is emitted as soon as its element closes; processed elements are detached
+from the tree so memory does not grow with file size.  Supported shapes:
+``line``, ``polyline``, ``polygon``, ``rect``, ``circle``, ``ellipse`` and
+``path`` (curves flattened, elliptical arcs replaced by straight
+segments).  Group ``transform`` attributes are honoured.  The innermost
+group with an ``inkscape:label`` or ``id`` names the layer.  The y axis is
+flipped so the drawing is y-up like other CAD sources.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from typing import IO, Iterator
+from xml.etree.ElementTree import ParseError, XMLPullParser
+from xml.parsers import expat
+
+import numpy as np
+
+from ..geometry import GeometryStore, LINESTRING, POLYGON, apply_matrix
+from .stream import BATCH_SIZE, CHUNK_SIZE, Entity, as_stream, batches, iter_chunks
+
+CURVE_SEGMENTS = 16
+CIRCLE_SEGMENTS = 64
+INKSCAPE_LABEL = "{http://www.inkscape.org/namespaces/inkscape}label"
+FLIP_Y = np.diag([1.0, -1.0, 1.0])
+
+_NUMBER = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+_PATH_TOKEN = re.compile(rf"([MmLlHhVvCcSsQqTtAaZz])|({_NUMBER})")
+_TRANSFORM = re.compile(r"(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)")
+_NUMBERS = re.compile(_NUMBER)
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _floats(text: str | None) -> list[float]:
+    return [float(v) for v in _NUMBERS.findall(text or "")]
+
+
+def parse_transform(text: str | None) -> np.ndarray:
+    """3x3 matrix for an SVG ``transform`` attribute."""
+    m = np.eye(3)
+    for name, args in _TRANSFORM.findall(text or ""):
+        v = _floats(args)
+        if name == "matrix" and len(v) == 6:
+            t = np.array([[v[0], v[2], v[4]], [v[1], v[3], v[5]], [0, 0, 1]])
+        elif name == "translate" and v:
+            t = np.array([[1, 0, v[0]], [0, 1, v[1] if len(v) > 1 else 0.0], [0, 0, 1]])
+        elif name == "scale" and v:
+            t = np.diag([v[0], v[1] if len(v) > 1 else v[0], 1.0])
+        elif name == "rotate" and v:
+            a = math.radians(v[0])
+            cx, cy = (v[1], v[2]) if len(v) == 3 else (0.0, 0.0)
+            c, s = math.cos(a), math.sin(a)
+            t = np.array([[c, -s, cx - c * cx + s * cy], [s, c, cy - s * cx - c * cy], [0, 0, 1]])
+        elif name == "skewX" and v:
+            t = np.array([[1, math.tan(math.radians(v[0])), 0], [0, 1, 0], [0, 0, 1]])
+        elif name == "skewY" and v:
+            t = np.array([[1, 0, 0], [math.tan(math.radians(v[0])), 1, 0], [0, 0, 1]])
+        else:
+            continue
+        m = m @ t
+    return m
+
+
+def _bezier(points: list[tuple[float, float]], n: int = CURVE_SEGMENTS) -> np.ndarray:
+    """Sample a quadratic or cubic Bezier (excluding its start point)."""
+    p = np.asarray(points)
+    t = np.linspace(0.0, 1.0, n + 1)[1:, None]
+    if len(p) == 3:
+        return (1 - t) ** 2 * p[0] + 2 * (1 - t) * t * p[1] + t ** 2 * p[2]
+    return ((1 - t) ** 3 * p[0] + 3 * (1 - t) ** 2 * t * p[1]
+            + 3 * (1 - t) * t ** 2 * p[2] + t ** 3 * p[3])
+
+
+def parse_path(d: str) -> list[tuple[list, bool]]:
+    """Split path data into ``(points, closed)`` subpaths."""
+    tokens = _PATH_TOKEN.findall(d or "")
+    out: list[tuple[list, bool]] = []
+    pts: list = []
+    x = y = sx = sy = 0.0
+    ctrl: tuple[float, float] | None = None  # last control point, for S/T
+    cmd = ""
+    i = 0
+
+    def nums(k: int) -> list[float] | None:
+        nonlocal i
+        if i + k > len(tokens) or any(tokens[j][0] for j in range(i, i + k)):
+            return None
+        vals = [float(tokens[j][1]) for j in range(i, i + k)]
+        i += k
+        return vals
+
+    while i < len(tokens):
+        if tokens[i][0]:
+            cmd = tokens[i][0]
+            i += 1
+            if cmd in "Zz":
+                if len(pts) > 1:
+                    out.append((pts, True))
+                pts, (x, y), ctrl = [], (sx, sy), None
+                continue
+        elif not cmd:
+            raise ValueError(f"path data must start with a command, got {d[:20]!r}")
+        rel = cmd.islower()
+        c = cmd.upper()
+        ox, oy = (x, y) if rel else (0.0, 0.0)
+        if c == "M":
+            v = nums(2)
+            if v is None:
+                break
+            if len(pts) > 1:
+                out.append((pts, False))
+            x, y = ox + v[0], oy + v[1]
+            sx, sy = x, y
+            pts = [(x, y)]
+            cmd = "l" if rel else "L"  # further pairs are implicit lineto
+            ctrl = None
+            continue
+        if not pts:
+            pts = [(x, y)]
+        if c == "L":
+            v = nums(2)
+            if v is None:
+                break
+            x, y = ox + v[0], oy + v[1]
+            pts.append((x, y))
+            ctrl = None
+        elif c == "H":
+            v = nums(1)
+            if v is None:
+                break
+            x = ox + v[0]
+            pts.append((x, y))
+            ctrl = None
+        elif c == "V":
+            v = nums(1)
+            if v is None:
+                break
+            y = (y if rel else 0.0) + v[0]
+            pts.append((x, y))
+            ctrl = None
+        elif c in "CS":
+            v = nums(6 if c == "C" else 4)
+            if v is None:
+                break
+            if c == "C":
+                c1 = (ox + v[0], oy + v[1])
+                v = v[2:]
+            else:
+                c1 = (2 * x - ctrl[0], 2 * y - ctrl[1]) if ctrl else (x, y)
+            c2, end = (ox + v[0], oy + v[1]), (ox + v[2], oy + v[3])
+            pts.extend(map(tuple, _bezier([(x, y), c1, c2, end])))
+            ctrl, (x, y) = c2, end
+        elif c in "QT":
+            v = nums(4 if c == "Q" else 2)
+            if v is None:
+                break
+            if c == "Q":
+                c1 = (ox + v[0], oy + v[1])
+                v = v[2:]
+            else:
+                c1 = (2 * x - ctrl[0], 2 * y - ctrl[1]) if ctrl else (x, y)
+            end = (ox + v[0], oy + v[1])
+            pts.extend(map(tuple, _bezier([(x, y), c1, end])))
+            ctrl, (x, y) = c1, end
+        elif c == "A":
+            v = nums(7)
+            if v is None:
+                break
+            x, y = ox + v[5], oy + v[6]
+            pts.append((x, y))
+            ctrl = None
+        else:
+            i += 1
+    if len(pts) > 1:
+        out.append((pts, False))
+    return out
+
+
+def _shape(tag: str, a) -> list[tuple[list | np.ndarray, bool]]:
+    f = lambda k: float(a.get(k, 0) or 0)  # noqa: E731
+    if tag == "line":
+        return [([(f("x1"), f("y1")), (f("x2"), f("y2"))], False)]
+    if tag in ("polyline", "polygon"):
+        v = _floats(a.get("points"))
+        return [(list(zip(v[0::2], v[1::2])), tag == "polygon")]
+    if tag == "rect":
+        x, y, w, h = f("x"), f("y"), f("width"), f("height")
+        return [([(x, y), (x + w, y), (x + w, y + h), (x, y + h)], True)]
+    if tag in ("circle", "ellipse"):
+        rx = f("r") if tag == "circle" else f("rx")
+        ry = f("r") if tag == "circle" else f("ry")
+        t = np.linspace(0.0, 2 * math.pi, CIRCLE_SEGMENTS, endpoint=False)
+        return [(np.column_stack([f("cx") + rx * np.cos(t), f("cy") + ry * np.sin(t)]), True)]
+    if tag == "path":
+        return parse_path(a.get("d", ""))
+    return []
+
+
+def iter_svg(source, chunk_size: int = CHUNK_SIZE) -> Iterator[Entity]:
+    """Yield entities from an SVG file object (or bytes) as they are read."""
+    parser = XMLPullParser(events=("start", "end"))
+    stack: list = []  # (element, matrix, layer)
+    for chunk in iter_chunks(as_stream(source), chunk_size):
+        for event, elem in _events(parser, chunk):
+            if event == "start":
+                matrix, layer = (stack[-1][1], stack[-1][2]) if stack else (FLIP_Y, "0")
+                if "transform" in elem.attrib:
+                    matrix = matrix @ parse_transform(elem.get("transform"))
+                if _local(elem.tag) == "g":
+                    layer = elem.get(INKSCAPE_LABEL) or elem.get("id") or layer
+                stack.append((elem, matrix, layer))
+                continue
+            _, matrix, layer = stack.pop()
+            for pts, closed in _shape(_local(elem.tag), elem.attrib):
+                coords = apply_matrix(np.asarray(pts, dtype=np.float64).reshape(-1, 2), matrix)
+                kind = POLYGON if closed and len(coords) >= 3 else LINESTRING
+                yield Entity(kind, coords, layer)
+            elem.clear()
+            if stack:
+                stack[-1][0].remove(elem)
+    _events(parser, None)
+
+
+def _events(parser: XMLPullParser, chunk: bytes | None) -> list:
+    """Feed ``chunk`` to ``parser`` (close it for ``None``) and take its events.
+
+    Malformed or truncated XML raises :class:`ValueError` with its position.
+    """
+    try:
+        if chunk is None:
+            parser.close()
+        else:
+            parser.feed(chunk)
+        return list(parser.read_events())
+    except ParseError as exc:
+        line, column = exc.position
+        raise ValueError(f"malformed SVG at line {line}, column {column}: "
+                         f"{expat.ErrorString(exc.code)}") from None
+
+
+def read_svg(source: bytes | IO[bytes], batch_size: int = BATCH_SIZE) -> GeometryStore:
+    return GeometryStore.concat(list(batches(iter_svg(source), batch_size)))
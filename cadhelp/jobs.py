@@ -0,0 +1,374 @@
+"""Worker-process job queue with progress reporting and cancellation.
+
+CPU-heavy operations (clearance checks, tracing, large renders) run in
+long-lived worker processes so that neither a web request nor the
+Streamlit script thread waits on them, and several jobs run in parallel
+across cores.  Jobs are pollable: :attr:`Job.status`, plus the
+:attr:`Job.progress` and :attr:`Job.message` the job last reported
+through :func:`report_progress`.  Finished jobs are kept for ``ttl``
+seconds so clients can fetch the result, then dropped.
+
+Unlike a ``ProcessPoolExecutor``, :meth:`JobManager.cancel` also stops a
+job that is already running: its worker is killed on the spot, together
+with any processes the job started itself (on POSIX each worker leads
+its own process group), and a fresh worker is started in its place.
+The CPU a stale job was using is free as soon as ``cancel`` returns.
+"""
+
+from __future__ import annotations
+
+import atexit
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+import uuid
+import weakref
+from concurrent.futures import CancelledError, Future
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from .instrument import count
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Exceptions meaning a job was given bad input rather than that it broke.
+INPUT_ERRORS = (ValueError, KeyError)
+
+PROGRESS = "progress"
+PROGRESS_INTERVAL = 0.1  # seconds between progress messages from one job
+
+
+@dataclass
+class Job:
+    id: str
+    op: str
+    drawing: str
+    future: Future
+    submitted: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+    progress: float | None = None  # fraction done, if the job reports it
+    message: str = ""
+
+    @property
+    def status(self) -> str:
+        f = self.future
+        if f.cancelled():
+            return CANCELLED
+        if f.done():
+            exc = f.exception()
+            if exc is None:
+                return DONE
+            return CANCELLED if isinstance(exc, CancelledError) else FAILED
+        return RUNNING if f.running() else QUEUED
+
+    def to_dict(self) -> dict:
+        out = {
+            "id": self.id, "op": self.op, "drawing": self.drawing, "status": self.status,
+            "submitted": self.submitted, "started": self.started, "finished": self.finished,
+            "progress": self.progress, "message": self.message,
+        }
+        if out["status"] == FAILED:
+            exc = self.future.exception()
+            out["error"] = str(exc.args[0] if isinstance(exc, KeyError) and exc.args else exc)
+            out["error_type"] = type(exc).__name__
+            out["bad_input"] = self.bad_input
+        return out
+
+    @property
+    def bad_input(self) -> bool:
+        """Whether the job failed on its input (one of :data:`INPUT_ERRORS`)."""
+        f = self.future
+        return f.done() and not f.cancelled() and isinstance(f.exception(), INPUT_ERRORS)
+
+
+# -- worker side -------------------------------------------------------------
+
+_channel = None  # connection to the manager while this worker runs a job
+_last_report = 0.0
+
+
+def report_progress(fraction: float, message: str = "") -> None:
+    """Report how far the current job has got (``0 <= fraction <= 1``).
+
+    A no-op outside a job worker, so library code can call it freely.
+    Reports are rate-limited to one per :data:`PROGRESS_INTERVAL`, except
+    completion.
+    """
+    global _last_report
+    if _channel is None:
+        return
+    now = time.monotonic()
+    if fraction < 1.0 and now - _last_report < PROGRESS_INTERVAL:
+        return
+    _last_report = now
+    _channel.send((PROGRESS, float(fraction), message))
+
+
+def _serve(conn) -> None:
+    """Worker main loop: run ``(func, args)`` tasks until told to stop."""
+    global _channel
+    if hasattr(os, "setsid"):
+        os.setsid()
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            return
+        if task is None:
+            return
+        func, args = task
+        _channel = conn
+        try:
+            reply = (DONE, func(*args))
+        except BaseException as exc:
+            reply = (FAILED, exc)
+        finally:
+            _channel = None
+        try:
+            conn.send(reply)
+        except Exception as exc:  # result or exception could not be pickled
+            conn.send((FAILED, RuntimeError(f"cannot return the result: {exc}")))
+
+
+# -- manager side ------------------------------------------------------------
+
+class _Worker:
+    """One worker process and the pipe to it."""
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+        self.process = None
+        self.conn = None
+
+    def ensure(self) -> None:
+        if self.process is not None and self.process.is_alive():
+            return
+        parent, child = self.ctx.Pipe()
+        self.process = self.ctx.Process(target=_serve, args=(child,), name="cadhelp-job")
+        self.process.start()
+        child.close()
+        self.conn = parent
+
+    def kill(self) -> None:
+        process = self.process
+        if process is None or process.pid is None:
+            return
+        try:
+            # Only once the worker leads its own group, or we would hit ours.
+            if hasattr(os, "killpg") and os.getpgid(process.pid) == process.pid:
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def reap(self) -> None:
+        if self.process is not None:
+            self.process.join(5)
+            self.conn.close()
+            self.process = self.conn = None
+
+    def stop(self) -> None:
+        if self.process is None:
+            return
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(5)
+        if self.process.is_alive():
+            self.kill()
+        self.reap()
+
+
+class JobManager:
+    """Runs callables in worker processes and tracks them as :class:`Job` s.
+
+    Workers start when the first job is submitted and are reused.
+
+    Args:
+        max_workers: worker processes; defaults to the CPU count.
+        mp_context: multiprocessing start method.  ``"spawn"`` avoids
+            forking a threaded web server.
+        ttl: seconds to keep finished jobs around for polling.
+    """
+
+    def __init__(self, max_workers: int | None = None, mp_context: str = "spawn",
+                 ttl: float = 3600.0):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.mp_context = mp_context
+        self.ttl = ttl
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._workers: list[_Worker] = []
+        self._threads: list[threading.Thread] = []
+        self._jobs: dict[str, Job] = {}
+        self._running: dict[str, _Worker] = {}
+        self._cancelling: set[str] = set()
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def _start(self) -> None:
+        """Start the worker threads (lock held)."""
+        if self._threads:
+            return
+        self._closed = False
+        ctx = multiprocessing.get_context(self.mp_context)
+        for n in range(self.max_workers):
+            worker = _Worker(ctx)
+            thread = threading.Thread(target=self._dispatch, args=(worker,),
+                                      name=f"cadhelp-jobs-{n}", daemon=True)
+            self._workers.append(worker)
+            self._threads.append(thread)
+            thread.start()
+        atexit.register(_shutdown_at_exit, weakref.ref(self))
+
+    def submit(self, op: str, drawing: str, func: Callable[..., Any], *args) -> Job:
+        """Queue ``func(*args)``; ``func`` and ``args`` must be picklable."""
+        self._expire()
+        job = Job(uuid.uuid4().hex, op, drawing, Future())
+        job.future.add_done_callback(lambda _: setattr(job, "finished", time.time()))
+        with self._lock:
+            self._start()
+            self._jobs[job.id] = job
+        self._queue.put((job, func, args))
+        count("jobs_submitted")
+        return job
+
+    def get(self, job_id: str) -> Job:
+        try:
+            return self._jobs[job_id]
+        except KeyError:
+            raise KeyError(f"unknown job {job_id!r}") from None
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job; returns whether it was.
+
+        A running job's worker is killed, so its CPU is free at once.
+        """
+        job = self.get(job_id)
+        if job.future.cancel():
+            count("jobs_cancelled")
+            return True
+        with self._lock:
+            worker = self._running.get(job_id)
+            if worker is None:
+                return False
+            self._cancelling.add(job_id)
+            worker.kill()
+        count("jobs_cancelled")
+        return True
+
+    def jobs(self) -> list[Job]:
+        return list(self._jobs.values())
+
+    def _dispatch(self, worker: _Worker) -> None:
+        """Feed queued jobs to ``worker`` one at a time, until shutdown."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                worker.stop()
+                return
+            job, func, args = item
+            # Under the lock, so cancel() either stops the future while it is
+            # queued or finds the job in _running once it is not.
+            with self._lock:
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+                self._running[job.id] = worker
+            job.started = time.time()
+            try:
+                worker.ensure()
+                # Killing a worker that was not started yet did not stop the job.
+                with self._lock:
+                    cancelled = job.id in self._cancelling
+                if cancelled:
+                    job.future.set_exception(CancelledError("cancelled before it started"))
+                else:
+                    worker.conn.send((func, args))
+                    self._follow(job, worker)
+            except Exception as exc:  # arguments could not be pickled, or no worker
+                if not job.future.done():
+                    if job.id in self._cancelling:
+                        exc = CancelledError("cancelled while running")
+                    job.future.set_exception(exc)
+            finally:
+                with self._lock:
+                    self._running.pop(job.id, None)
+                    cancelled = job.id in self._cancelling
+                    self._cancelling.discard(job.id)
+                if cancelled or worker.process is None or not worker.process.is_alive():
+                    if cancelled:
+                        worker.kill()  # it may have started after cancel() tried
+                    worker.reap()
+                    if not self._closed:
+                        worker.ensure()  # have a warm worker ready for the next job
+
+    def _follow(self, job: Job, worker: _Worker) -> None:
+        """Relay progress until the job's outcome arrives or its worker dies."""
+        while True:
+            try:
+                kind, *payload = worker.conn.recv()
+            except (EOFError, OSError):
+                if job.id in self._cancelling:
+                    job.future.set_exception(CancelledError("cancelled while running"))
+                else:
+                    job.future.set_exception(RuntimeError("job worker exited unexpectedly"))
+                return
+            if kind == PROGRESS:
+                job.progress, job.message = payload
+                continue
+            if job.id in self._cancelling:
+                job.future.set_exception(CancelledError("cancelled while running"))
+            elif kind == DONE:
+                job.progress = 1.0 if job.progress is not None else None
+                job.future.set_result(payload[0])
+            else:
+                job.future.set_exception(payload[0])
+            return
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            for job_id in [j.id for j in self._jobs.values()
+                           if j.finished is not None and j.finished < cutoff]:
+                del self._jobs[job_id]
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Cancel queued jobs and stop the workers.
+
+        Running jobs are finished first with ``wait``, killed otherwise.
+        """
+        with self._lock:
+            self._closed = True
+            threads, self._threads = self._threads, []
+            workers, self._workers = self._workers, []
+            if not wait:
+                self._cancelling.update(self._running)
+                for worker in workers:
+                    worker.kill()
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[0].future.cancel()
+        for _ in threads:
+            self._queue.put(None)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+
+def _shutdown_at_exit(ref: weakref.ref) -> None:
+    manager = ref()
+    if manager is not None:
+        manager.shutdown(wait=False)
@@ -0,0 +1,178 @@
+"""Level-of-detail pyramid of simplified geometry for zoomed-out rendering.
+
+A zoomed-out view draws curves with thousands of vertices into a handful
+of pixels.  :class:`LodPyramid` keeps copies of a drawing simplified at
+tolerances that double from level to level, and :meth:`LodPyramid.at`
+picks the coarsest level whose tolerance stays under half a pixel at the
+requested scale, so the simplification is invisible while the rasterizer
+receives a fraction of the vertices.
+
+Tolerances are fixed when the pyramid is created, relative to the
+drawing's size at that time: level ``l`` simplifies by
+``size * 2**(l - BASE_SHIFT)``, which lines the levels up with the zooms
+of a 256-pixel tile pyramid (level ``LEVELS - 1`` for zoom 0).  Levels
+are entity-aligned with the source store (see
+:func:`cadhelp.geometry.simplify`), so positions from the drawing's
+spatial index select the same entities in any level.  Edits patch each
+built level for just the touched entities, see :meth:`LodPyramid.patch`.
+
+Topology-preserving simplification costs seconds per million vertices,
+so the pyramid is built on a background thread the first time it is
+asked for a level (:meth:`LodPyramid.warm`).  Each level is simplified
+from the one below it by the difference of their tolerances, which keeps
+the error within the level's tolerance while touching far fewer
+vertices.  Until a level is ready, :meth:`LodPyramid.at` hands out the
+closest finer one, or the source.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+
+import numpy as np
+
+from .geometry import GeometryStore, simplify
+
+LEVELS = 8
+BASE_SHIFT = 16
+PIXEL_TOLERANCE = 0.5
+
+
+class LodPyramid:
+    """Lazily built simplified copies of one store.
+
+    Args:
+        store: source geometry.
+        extent: ``(minx, miny, maxx, maxy)`` the tolerances are scaled to.
+        levels: number of levels.
+        pixel_tolerance: largest simplification error allowed, in pixels.
+    """
+
+    def __init__(self, store: GeometryStore, extent, levels: int = LEVELS,
+                 pixel_tolerance: float = PIXEL_TOLERANCE):
+        size = max(extent[2] - extent[0], extent[3] - extent[1]) or 1.0
+        self.base = size * 2.0 ** -BASE_SHIFT
+        self.levels = levels
+        self.pixel_tolerance = pixel_tolerance
+        self.store = store
+        self._built: dict[int, GeometryStore] = {}
+        self._warming = False
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"LodPyramid(entities={len(self.store)}, built={sorted(self._built)})"
+
+    def copy(self) -> "LodPyramid":
+        """An independently patchable pyramid sharing the levels built so far."""
+        with self._lock:
+            other = object.__new__(LodPyramid)
+            other.__dict__.update(self.__dict__)
+            other._built = dict(self._built)
+            other._warming = False
+            other._lock = threading.Lock()
+            return other
+
+    def tolerance(self, level: int) -> float:
+        return self.base * 2.0 ** level
+
+    def level_for(self, units_per_pixel: float) -> int | None:
+        """Coarsest level invisible at ``units_per_pixel``; ``None`` for the source."""
+        if units_per_pixel <= 0:
+            return None
+        level = math.floor(math.log2(self.pixel_tolerance * units_per_pixel / self.base))
+        return None if level < 0 else min(level, self.levels - 1)
+
+    def _step(self, level: int) -> tuple[GeometryStore, GeometryStore, float]:
+        """Source snapshot, input and tolerance for building ``level`` (lock held)."""
+        finer = max((k for k in self._built if k < level), default=None)
+        if finer is None:
+            return self.store, self.store, self.tolerance(level)
+        return self.store, self._built[finer], self.tolerance(level) - self.tolerance(finer)
+
+    def level(self, level: int | None) -> GeometryStore:
+        """The store simplified for ``level`` (the source for ``None``), built if needed."""
+        if level is None:
+            return self.store
+        if not 0 <= level < self.levels:
+            raise ValueError(f"level {level} outside 0..{self.levels - 1}")
+        while True:
+            with self._lock:
+                built = self._built.get(level)
+                if built is not None:
+                    return built
+                source, base, tolerance = self._step(level)
+            made = simplify(base, tolerance)
+            with self._lock:
+                if self.store is source:  # otherwise an edit raced us; go again
+                    self._built[level] = made
+                    return made
+
+    def warm(self) -> threading.Thread | None:
+        """Build every level on a background thread, finest first.
+
+        Returns the thread, or ``None`` if one is already running.
+        """
+        with self._lock:
+            if self._warming:
+                return None
+            self._warming = True
+
+        def run():
+            try:
+                for level in range(self.levels):
+                    self.level(level)
+            finally:
+                self._warming = False
+
+        thread = threading.Thread(target=run, name="lod-warm", daemon=True)
+        thread.start()
+        return thread
+
+    def at(self, units_per_pixel: float, wait: bool = False) -> GeometryStore:
+        """Geometry to draw at a scale of ``units_per_pixel`` world units per pixel.
+
+        Args:
+            units_per_pixel: world size of one pixel.
+            wait: build the wanted level now instead of falling back to the
+                finest built one (or the source) and warming in the background.
+        """
+        level = self.level_for(units_per_pixel)
+        if level is None or wait:
+            return self.level(level)
+        with self._lock:
+            ready = max((k for k in self._built if k <= level), default=None)
+            store = self.store if ready is None else self._built[ready]
+        if ready != level:
+            self.warm()
+        return store
+
+    def stats(self) -> dict:
+        return {
+            "entities": len(self.store), "vertices": self.store.num_vertices,
+            "levels": {level: {"tolerance": self.tolerance(level), "vertices": s.num_vertices}
+                       for level, s in sorted(self._built.items())},
+        }
+
+    def patch(self, store: GeometryStore, keep: np.ndarray | None,
+              after: GeometryStore) -> None:
+        """Follow an edit of the source: rows ``keep`` survive and ``after`` is appended.
+
+        Only ``after`` is simplified; the surviving rows of every built level
+        are reused as they are.
+
+        Args:
+            store: the source after the edit.
+            keep: mask of the old rows still present (``None`` for all).
+            after: entities appended to the source.
+        """
+        with self._lock:
+            source, self.store = self.store, store
+            for level, old in self._built.items():
+                fresh = simplify(after, self.tolerance(level))
+                if old is source and fresh is after:
+                    # Nothing simplifiable before or now: keep sharing the source.
+                    self._built[level] = store
+                    continue
+                kept = old if keep is None else old.subset(keep)
+                self._built[level] = GeometryStore.concat([kept, fresh]) if len(after) else kept
@@ -0,0 +1,162 @@
+"""Headless geometry operations shared by the API and batch workers.
+
+Every operation is a module-level function ``(store, **params) -> result``
+so it can be pickled into a worker process.  Results are plain data
+(dicts, bytes) or a :class:`GeometryStore`; callers decide how to encode
+them.  Invalid parameters raise ``ValueError``.
+"""
+
+from __future__ import annotations
+
+import inspect
+import math
+from typing import Any, Callable
+
+import shapely
+
+from .clearance import check as check_clearance
+from .geometry import (
+    OFFSETS,
+    GeometryStore,
+    clip_to_rect,
+    intersect_layer,
+    subtract_layer,
+    union_layer,
+)
+from .io.binary import read_binary
+from .render import encode, render
+from .takeoff import takeoff as quantity_takeoff
+
+
+def _layer_filter(store: GeometryStore, layers) -> GeometryStore:
+    return store if not layers else store.subset(store.layer_mask(layers))
+
+
+def takeoff(store: GeometryStore, by="layer", layers=None, materials=None) -> dict:
+    """Count, vertices, area and length per group (see :mod:`cadhelp.takeoff`)."""
+    return quantity_takeoff(store, by, layers, materials).to_dict()
+
+
+def offset(store: GeometryStore, distance: float, join_style: str = "mitre",
+           quad_segs: int = 8, mitre_limit: float = 5.0, layers=None) -> GeometryStore:
+    """Buffer every entity by ``distance`` (negative shrinks polygons).
+
+    Results are memoized per distinct shape in :data:`cadhelp.geometry.OFFSETS`.
+    Entities that shrink away are dropped and ones that split keep their id
+    on every part (see :meth:`~cadhelp.geometry.OffsetCache.offset`).
+    """
+    store = _layer_filter(store, layers)
+    return OFFSETS.offset(store, distance, join_style=join_style, quad_segs=quad_segs,
+                          mitre_limit=mitre_limit)
+
+
+def _bbox(bbox) -> tuple[float, float, float, float]:
+    try:
+        values = tuple(float(v) for v in bbox)
+    except (TypeError, ValueError):
+        values = ()
+    if len(values) != 4 or not all(math.isfinite(v) for v in values):
+        raise ValueError(f"bbox must be four finite numbers [minx, miny, maxx, maxy], got {bbox!r}")
+    return values
+
+
+def _region(wkt) -> shapely.Geometry:
+    if not isinstance(wkt, str):
+        raise ValueError("region must be a WKT string")
+    try:
+        geom = shapely.from_wkt(wkt)
+    except shapely.errors.ShapelyError as exc:
+        raise ValueError(f"invalid region: {exc}") from None
+    if geom is None or geom.is_empty:
+        raise ValueError("region is empty")
+    return geom
+
+
+def boolean(store: GeometryStore, op: str, region=None, bbox=None, layers=None):
+    """Layer-wide boolean operation.
+
+    ``op="union"`` merges the polygons on ``layers`` into one geometry;
+    ``"intersection"`` and ``"difference"`` clip or cut every entity by
+    ``region`` (WKT) or ``bbox`` (``[minx, miny, maxx, maxy]``).
+    """
+    if op == "union":
+        return union_layer(store, layers or None)
+    if region is None and bbox is None:
+        raise ValueError(f"{op} needs a region or bbox")
+    if op == "intersection" and region is None:
+        return clip_to_rect(store, _bbox(bbox), layers or None)
+    geom = shapely.box(*_bbox(bbox)) if region is None else _region(region)
+    if op == "intersection":
+        return intersect_layer(store, geom, layers or None)
+    if op == "difference":
+        return subtract_layer(store, geom, layers or None)
+    raise ValueError(f"unknown boolean op {op!r}")
+
+
+def clearance(store: GeometryStore, min_distance: float, layers=None, against=None,
+              limit: int = 10_000) -> dict:
+    """Pairs of entities closer than ``min_distance`` (see :mod:`cadhelp.clearance`)."""
+    found = check_clearance(store, float(min_distance), layers or None, against or None,
+                            int(limit) + 1)
+    return {
+        "count": min(len(found), int(limit)), "truncated": len(found) > int(limit),
+        "violations": [v.to_dict() for v in found[:int(limit)]],
+    }
+
+
+EXPORT_ENCODINGS = {"png": "export", "webp": "export-webp"}
+
+
+def render_png(store: GeometryStore, width: int = 1024, height: int = 1024,
+               backend: str = "pillow", bbox=None, format: str = "png") -> bytes:
+    """Render the drawing (or ``bbox`` of it) to PNG or WebP bytes.
+
+    Exports are kept, so they are compressed as far as the format goes.
+    """
+    if not (0 < int(width) <= 8192 and 0 < int(height) <= 8192):
+        raise ValueError("width and height must be in 1..8192")
+    if format not in EXPORT_ENCODINGS:
+        raise ValueError(f"unknown image format {format!r}; "
+                         f"expected one of {sorted(EXPORT_ENCODINGS)}")
+    if bbox is not None:
+        bbox = _bbox(bbox)
+    image = render(store, (int(width), int(height)), bbox=bbox, backend=backend)
+    return encode(image, EXPORT_ENCODINGS[format])
+
+
+OPERATIONS: dict[str, Callable[..., Any]] = {
+    "takeoff": takeoff,
+    "offset": offset,
+    "boolean": boolean,
+    "clearance": clearance,
+    "render": render_png,
+}
+
+# Rough cost per vertex relative to a buffer, used to decide whether a
+# request is cheap enough to run inline in the web worker.
+COST = {"takeoff": 0.02, "offset": 1.0, "boolean": 1.0, "clearance": 0.5, "render": 0.2}
+
+
+def estimate_cost(name: str, store: GeometryStore) -> float:
+    return COST.get(name, 1.0) * store.num_vertices
+
+
+def run(name: str, store: GeometryStore, params: dict) -> Any:
+    """Run operation ``name``; the entry point used by worker processes."""
+    try:
+        func = OPERATIONS[name]
+    except KeyError:
+        raise ValueError(f"unknown operation {name!r}") from None
+    try:
+        inspect.signature(func).bind(store, **params)
+    except TypeError as exc:
+        raise ValueError(f"bad parameters for {name}: {exc}") from None
+    return func(store, **params)
+
+
+def run_file(name: str, path: str, params: dict) -> Any:
+    """Like :func:`run`, but memory-maps the drawing from a ``.cadb`` file.
+
+    Workers then share the file's pages instead of unpickling a copy.
+    """
+    return run(name, read_binary(path), params)
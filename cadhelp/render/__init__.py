@@ -0,0 +1,36 @@
+"""Rasterization of drawings: styles, backends, culling and the tile pyramid."""
+
+from .api import BACKENDS, get_backend, render, thumbnail
+from .cull import MIN_PIXELS, cull, cull_drawing, visible, visible_positions
+from .encode import PRESETS, Encoding, encode, get_encoding, sniff_mimetype
+from .mpl import Annotation, export
+from .style import DEFAULT_STYLE, LayerStyle, Style
+from .tiles import TileCache, TileGrid, TileKey, TileRenderer
+from .viewport import fit_bounds
+
+__all__ = [
+    "Annotation",
+    "BACKENDS",
+    "DEFAULT_STYLE",
+    "Encoding",
+    "LayerStyle",
+    "MIN_PIXELS",
+    "PRESETS",
+    "Style",
+    "TileCache",
+    "TileGrid",
+    "TileKey",
+    "TileRenderer",
+    "cull",
+    "cull_drawing",
+    "encode",
+    "export",
+    "fit_bounds",
+    "get_backend",
+    "get_encoding",
+    "render",
+    "sniff_mimetype",
+    "thumbnail",
+    "visible",
+    "visible_positions",
+]
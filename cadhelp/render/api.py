@@ -0,0 +1,78 @@
+"""Single entry point over the available render backends.
+
+``"pillow"`` is the fast path for previews, thumbnails and interactive
+tiles; ``"matplotlib"`` gives full-quality output.  Either only receives
+the entities that survive viewport culling (see :mod:`.cull`).
+"""
+
+from __future__ import annotations
+
+from typing import Callable
+
+from PIL import Image
+
+from ..geometry import GeometryStore, total_bounds
+from ..instrument import count, timed
+from . import mpl, pil
+from .cull import MIN_PIXELS, cull
+from .style import DEFAULT_STYLE, Style
+from .viewport import fit_bounds
+
+Rasterizer = Callable[..., Image.Image]
+
+BACKENDS: dict[str, Rasterizer] = {
+    "pillow": pil.rasterize,
+    "matplotlib": mpl.rasterize,
+}
+
+
+def get_backend(backend: str | Rasterizer) -> Rasterizer:
+    """Resolve a backend name (or pass a rasterizer callable through)."""
+    if callable(backend):
+        return backend
+    try:
+        return BACKENDS[backend]
+    except KeyError:
+        raise ValueError(
+            f"unknown render backend {backend!r}; expected one of {sorted(BACKENDS)}"
+        ) from None
+
+
+def render(
+    store: GeometryStore,
+    size: tuple[int, int] = (512, 512),
+    bbox=None,
+    style: Style = DEFAULT_STYLE,
+    backend: str | Rasterizer = "pillow",
+    min_pixels: float | None = MIN_PIXELS,
+    **options,
+) -> Image.Image:
+    """Render ``store`` to an RGBA image.
+
+    Args:
+        store: entities to draw.
+        size: output ``(width, height)`` in pixels.
+        bbox: world window; defaults to the store's extent, padded to the
+            image aspect ratio.
+        style: layer styles.
+        backend: ``"pillow"``, ``"matplotlib"`` or a rasterizer callable.
+        min_pixels: only entities inside ``bbox`` and at least this many
+            pixels across are rasterized; ``None`` draws everything.
+        **options: backend-specific options, e.g. ``supersample`` for Pillow.
+    """
+    if bbox is None:
+        extent = total_bounds(store)
+        bbox = fit_bounds((0, 0, 1, 1) if len(store) == 0 else extent, size)
+    if min_pixels is not None:
+        units_per_px = max((bbox[2] - bbox[0]) / size[0], (bbox[3] - bbox[1]) / size[1])
+        store = cull(store, bbox, units_per_px, min_pixels)
+    rasterize = get_backend(backend)
+    count("entities_rasterized", len(store))
+    with timed("rasterize"):
+        return rasterize(store, bbox, size, style, **options)
+
+
+def thumbnail(store: GeometryStore, size: tuple[int, int] = (256, 256),
+              style: Style = DEFAULT_STYLE) -> Image.Image:
+    """Antialiased preview of the whole store via the Pillow fast path."""
+    return render(store, size, style=style, backend="pillow", supersample=2)
@@ -0,0 +1,91 @@
+"""Viewport culling: pick the entities worth handing to a rasterizer.
+
+An entity is drawn only if its bounding box intersects the viewport and
+it is at least :data:`MIN_PIXELS` wide or tall at the current scale;
+anything smaller would land inside a single pixel.  Points have no
+extent and are always kept.
+
+:func:`cull` tests a bare store with one vectorized pass over its bounds.
+:func:`cull_drawing` uses a drawing's cached per-entity bounds and spatial
+index instead: small viewports ask the index for candidates, so panning
+around a detailed corner of a large plan costs time in proportion to what
+is on screen, while viewports covering most of the drawing scan the
+cached bounds directly, which is cheaper than a tree query returning
+nearly everything.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from ..drawing import Drawing
+from ..geometry import POINT, GeometryStore, bounds
+from ..instrument import timed
+
+MIN_PIXELS = 0.5
+INDEX_FRACTION = 0.25  # viewports larger than this share of the extent scan bounds
+
+
+def visible(entity_bounds: np.ndarray, kinds: np.ndarray, bbox,
+            units_per_pixel: float = 0.0, min_pixels: float = MIN_PIXELS) -> np.ndarray:
+    """Mask of entities inside ``bbox`` and not smaller than ``min_pixels``.
+
+    Args:
+        entity_bounds: ``(E, 4)`` per-entity bounding boxes.
+        kinds: ``(E,)`` entity kinds; points skip the size test.
+        bbox: viewport ``(minx, miny, maxx, maxy)`` in world units.
+        units_per_pixel: world size of one pixel; 0 keeps every size.
+        min_pixels: smallest drawn extent, in pixels.
+    """
+    b = entity_bounds
+    minx, miny, maxx, maxy = bbox
+    mask = (b[:, 0] <= maxx) & (b[:, 2] >= minx) & (b[:, 1] <= maxy) & (b[:, 3] >= miny)
+    threshold = min_pixels * units_per_pixel
+    if threshold > 0:
+        size = np.maximum(b[:, 2] - b[:, 0], b[:, 3] - b[:, 1])
+        mask &= (size >= threshold) | (kinds == POINT)
+    return mask
+
+
+@timed("cull")
+def cull(store: GeometryStore, bbox, units_per_pixel: float = 0.0,
+         min_pixels: float = MIN_PIXELS) -> GeometryStore:
+    """Entities of ``store`` worth drawing in ``bbox``; ``store`` itself if all are."""
+    mask = visible(bounds(store), store.kinds, bbox, units_per_pixel, min_pixels)
+    return store if mask.all() else store.subset(mask)
+
+
+def visible_positions(drawing: Drawing, bbox, units_per_pixel: float = 0.0,
+                      min_pixels: float = MIN_PIXELS) -> np.ndarray:
+    """Sorted store positions of the entities of ``drawing`` worth drawing in ``bbox``."""
+    store, b = drawing.store, drawing.bounds
+    ex = drawing.extent
+    overlap_w = min(bbox[2], ex[2]) - max(bbox[0], ex[0])
+    overlap_h = min(bbox[3], ex[3]) - max(bbox[1], ex[1])
+    if overlap_w < 0 or overlap_h < 0:
+        return np.empty(0, dtype=np.int64)
+    extent_area = (ex[2] - ex[0]) * (ex[3] - ex[1])
+    if overlap_w * overlap_h >= INDEX_FRACTION * extent_area:
+        return np.flatnonzero(visible(b, store.kinds, bbox, units_per_pixel, min_pixels))
+    pos = np.sort(drawing.positions(drawing.index.bbox_candidates(bbox)))
+    keep = visible(b[pos], store.kinds[pos], bbox, units_per_pixel, min_pixels)
+    return pos[keep]
+
+
+@timed("cull")
+def cull_drawing(drawing: Drawing, bbox, units_per_pixel: float = 0.0,
+                 min_pixels: float = MIN_PIXELS, simplify: bool = True) -> GeometryStore:
+    """Visible entities of ``drawing`` in ``bbox``, in store order.
+
+    Args:
+        drawing: drawing to cull.
+        bbox: viewport in world units.
+        units_per_pixel: world size of one pixel; 0 disables the size test
+            and simplification.
+        min_pixels: smallest drawn extent, in pixels.
+        simplify: take geometry from :attr:`Drawing.lod` for this scale.
+    """
+    pos = visible_positions(drawing, bbox, units_per_pixel, min_pixels)
+    source = drawing.lod.at(units_per_pixel) if simplify and units_per_pixel > 0 \
+        else drawing.store
+    return source.subset(pos)
@@ -0,0 +1,36 @@
+"""Per-layer drawing styles shared by all render backends.
+
+Colours are ``#rrggbb`` (or ``#rrggbbaa``) strings, which both Pillow and
+Matplotlib accept directly.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class LayerStyle:
+    stroke: str = "#1f2933"
+    fill: str | None = None
+    width: float = 1.0
+    visible: bool = True
+
+
+@dataclass(frozen=True)
+class Style:
+    background: str = "#ffffff"
+    default: LayerStyle = LayerStyle()
+    layers: dict[str, LayerStyle] = field(default_factory=dict)
+    point_radius: float = 1.5
+
+    def for_layer(self, name: str) -> LayerStyle:
+        return self.layers.get(name, self.default)
+
+    def key(self) -> str:
+        """Stable string identifying this style, for cache keys."""
+        layers = ",".join(f"{k}={v!r}" for k, v in sorted(self.layers.items()))
+        return f"{self.background}|{self.default!r}|{layers}|{self.point_radius}"
+
+
+DEFAULT_STYLE = Style()
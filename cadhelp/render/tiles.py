@@ -0,0 +1,366 @@
+"""Fixed-size PNG tiles keyed by zoom level and x/y, with an LRU cache.
+
+A drawing's extent is covered by a square tile pyramid: zoom ``z`` splits
+it into ``2**z`` by ``2**z`` tiles of ``tile_size`` pixels, row ``y = 0``
+at the top.  Panning and zooming only render tiles that are not already
+cached, and every tile only draws the entities that survive viewport
+culling (see :mod:`.cull`), taken from the drawing's level-of-detail
+pyramid for the tile's pixel size.  After an edit,
+:meth:`TileRenderer.invalidate` drops just the tiles overlapping the
+edit's dirty rectangle.
+
+Tiles are encoded with the fast ``"tile"`` preset of :mod:`.encode`
+(palette PNG) unless the renderer or the call asks for another one, and
+:meth:`TileRenderer.etag` names a tile's content without rendering it,
+so HTTP clients can revalidate unchanged tiles for free.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import math
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+from PIL import Image
+
+from ..drawing import Drawing
+from ..instrument import count, timed
+from .api import Rasterizer, get_backend
+from .cull import MIN_PIXELS, cull_drawing
+from .encode import Encoding, encode, get_encoding
+from .style import DEFAULT_STYLE, Style
+
+
+class TileKey(NamedTuple):
+    """Everything a cached tile's pixels depend on.
+
+    Renderers with different settings can share one :class:`TileCache`
+    (and its disk tier) without serving each other's tiles.
+    """
+
+    drawing: str
+    style: str
+    z: int
+    x: int
+    y: int
+    format: str = "png"
+    tile_size: int = 256
+    backend: str = "pillow"
+    simplify: bool = True
+    min_pixels: float = MIN_PIXELS
+
+    def path(self) -> Path:
+        renderer = f"{self.backend}-{self.tile_size}-{int(self.simplify)}-{self.min_pixels}"
+        return Path(self.drawing, renderer, self.style, str(self.z), str(self.x),
+                    f"{self.y}.{self.format}")
+
+
+class TileGrid(NamedTuple):
+    """Square tile pyramid anchored at ``(minx, miny)`` spanning ``extent``."""
+
+    minx: float
+    miny: float
+    extent: float
+    tile_size: int = 256
+
+    @classmethod
+    def for_bounds(cls, bbox, tile_size: int = 256) -> "TileGrid":
+        minx, miny, maxx, maxy = bbox
+        extent = max(maxx - minx, maxy - miny) or 1.0
+        pad = extent * 0.01
+        return cls(minx - pad, miny - pad, extent + 2 * pad, tile_size)
+
+    def tile_span(self, z: int) -> float:
+        """World-space width of one tile at zoom ``z``."""
+        return self.extent / (1 << z)
+
+    def tile_bounds(self, z: int, x: int, y: int) -> tuple[float, float, float, float]:
+        n = 1 << z
+        if not (0 <= x < n and 0 <= y < n):
+            raise ValueError(f"tile {z}/{x}/{y} is outside the grid")
+        span = self.tile_span(z)
+        minx = self.minx + x * span
+        maxy = self.miny + self.extent - y * span
+        return (minx, maxy - span, minx + span, maxy)
+
+    def zoom_for(self, units_per_pixel: float, max_zoom: int) -> int:
+        """Smallest zoom whose pixels are at least as fine as requested."""
+        if units_per_pixel <= 0:
+            return max_zoom
+        z = math.ceil(math.log2(self.extent / (units_per_pixel * self.tile_size)))
+        return min(max(z, 0), max_zoom)
+
+    def tile_range(self, z: int, bbox) -> tuple[range, range]:
+        """Columns and rows of the tiles at zoom ``z`` that cover ``bbox``."""
+        n = 1 << z
+        span = self.tile_span(z)
+        top = self.miny + self.extent
+
+        def clamp(v: float) -> int:
+            return min(max(int(math.floor(v)), 0), n - 1)
+
+        x0, x1 = clamp((bbox[0] - self.minx) / span), clamp((bbox[2] - self.minx) / span)
+        y0, y1 = clamp((top - bbox[3]) / span), clamp((top - bbox[1]) / span)
+        return range(x0, x1 + 1), range(y0, y1 + 1)
+
+
+class TileCache:
+    """In-memory LRU of encoded tiles with a byte budget.
+
+    If ``disk_dir`` is set, tiles are also written there and memory misses
+    fall back to disk before re-rendering.
+
+    Args:
+        max_bytes: memory budget for cached image bytes.
+        disk_dir: optional directory for the on-disk tier.
+    """
+
+    def __init__(self, max_bytes: int = 64 << 20, disk_dir: str | os.PathLike | None = None):
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir is not None else None
+        self._items: OrderedDict[TileKey, bytes] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.disk_hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._items), "bytes": self._bytes,
+            "hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+        }
+
+    def get(self, key: TileKey) -> bytes | None:
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return data
+        if self.disk_dir is not None:
+            try:
+                data = (self.disk_dir / key.path()).read_bytes()
+            except OSError:
+                data = None
+            if data is not None:
+                self._remember(key, data)
+                with self._lock:
+                    self.disk_hits += 1
+                return data
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: TileKey, data: bytes) -> None:
+        self._remember(key, data)
+        if self.disk_dir is not None:
+            path = self.disk_dir / key.path()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+
+    def _remember(self, key: TileKey, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._items[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def invalidate(self, drawing: str,
+                   tiles: Callable[[int], tuple[range, range]] | None = None) -> None:
+        """Drop tiles of ``drawing``; all of them, or those in ``tiles(z)``.
+
+        ``tiles`` maps a zoom level to the columns and rows to drop.  Without
+        it only memory tiles go: disk tiles of immutable drawings are keyed
+        by content and stay valid.  With it, matching disk tiles are deleted
+        as well, since an edited drawing keeps its key.
+        """
+
+        def hit(z: int, x: int, y: int) -> bool:
+            cols, rows = tiles(z)
+            return x in cols and y in rows
+
+        with self._lock:
+            stale = [k for k in self._items if k.drawing == drawing
+                     and (tiles is None or hit(k.z, k.x, k.y))]
+            for key in stale:
+                self._bytes -= len(self._items.pop(key))
+        if tiles is None or self.disk_dir is None:
+            return
+        root = self.disk_dir / drawing
+        for zdir in root.glob("*/*/*") if root.is_dir() else ():
+            if not zdir.name.isdigit():
+                continue
+            cols, rows = tiles(int(zdir.name))
+            for xdir in zdir.iterdir():
+                if xdir.name.isdigit() and int(xdir.name) in cols:
+                    for f in xdir.iterdir():
+                        if f.suffix != ".tmp" and f.stem.isdigit() and int(f.stem) in rows:
+                            f.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+
+class TileRenderer:
+    """Renders and caches tiles for :class:`Drawing` objects.
+
+    Args:
+        cache: tile cache; a private 64 MiB memory cache by default.
+        tile_size: tile edge in pixels.
+        max_zoom: deepest zoom level served.
+        backend: render backend name or rasterizer callable (see
+            :func:`cadhelp.render.api.render`).
+        simplify: draw zoomed-out tiles from :attr:`Drawing.lod`.
+        min_pixels: skip entities smaller than this many pixels.
+        encoding: default image encoding, an :class:`Encoding` or preset name.
+    """
+
+    def __init__(
+        self,
+        cache: TileCache | None = None,
+        tile_size: int = 256,
+        max_zoom: int = 20,
+        backend: str | Rasterizer = "pillow",
+        simplify: bool = True,
+        min_pixels: float = MIN_PIXELS,
+        encoding: str | Encoding = "tile",
+    ):
+        self.cache = cache if cache is not None else TileCache()
+        self.tile_size = tile_size
+        self.max_zoom = max_zoom
+        self.rasterizer = get_backend(backend)
+        self.backend = _backend_id(backend)
+        self.simplify = simplify
+        self.min_pixels = min_pixels
+        self.encoding = get_encoding(encoding)
+        self._grids: dict[str, TileGrid] = {}
+
+    def grid(self, drawing: Drawing) -> TileGrid:
+        """Tile grid of ``drawing``; all its tiles are dropped if the grid moved."""
+        grid = TileGrid.for_bounds(drawing.extent, self.tile_size)
+        if self._grids.setdefault(drawing.key, grid) != grid:
+            self._grids[drawing.key] = grid
+            self.cache.invalidate(drawing.key, lambda z: (range(1 << z), range(1 << z)))
+        return grid
+
+    def invalidate(self, drawing: Drawing, bbox=None) -> None:
+        """Drop the cached tiles of ``drawing`` that overlap ``bbox`` (all if ``None``)."""
+        if bbox is None:
+            self.cache.invalidate(drawing.key, lambda z: (range(1 << z), range(1 << z)))
+            return
+        grid = self.grid(drawing)
+
+        def tiles(z: int) -> tuple[range, range]:
+            # Same padding as render_tile: strokes spill a few pixels over edges.
+            pad = 4 * grid.tile_span(z) / self.tile_size
+            return grid.tile_range(z, (bbox[0] - pad, bbox[1] - pad,
+                                       bbox[2] + pad, bbox[3] + pad))
+
+        self.cache.invalidate(drawing.key, tiles)
+
+    def render_tile(self, drawing: Drawing, z: int, x: int, y: int,
+                    style: Style = DEFAULT_STYLE) -> Image.Image:
+        """Rasterize one tile without touching the cache."""
+        if not 0 <= z <= self.max_zoom:
+            raise ValueError(f"zoom {z} outside 0..{self.max_zoom}")
+        grid = self.grid(drawing)
+        bbox = grid.tile_bounds(z, x, y)
+        # Pad the query so strokes crossing the tile edge are drawn on both sides.
+        units_per_px = grid.tile_span(z) / self.tile_size
+        pad = 4 * units_per_px
+        near = cull_drawing(drawing, (bbox[0] - pad, bbox[1] - pad, bbox[2] + pad, bbox[3] + pad),
+                            units_per_px, self.min_pixels, self.simplify)
+        count("tiles_rendered")
+        count("entities_rasterized", len(near))
+        with timed("rasterize"):
+            return self.rasterizer(near, bbox, (self.tile_size, self.tile_size), style)
+
+    def tile(self, drawing: Drawing, z: int, x: int, y: int,
+             style: Style = DEFAULT_STYLE, encoding: str | Encoding | None = None) -> bytes:
+        """Encoded tile ``z/x/y``, served from the cache when possible.
+
+        ``encoding`` overrides the renderer's :attr:`encoding` for this call.
+        """
+        enc = self.encoding if encoding is None else get_encoding(encoding)
+        key = TileKey(drawing.key, _style_id(style, enc), z, x, y, enc.format,
+                      self.tile_size, self.backend, self.simplify, self.min_pixels)
+        data = self.cache.get(key)
+        if data is None:
+            data = encode(self.render_tile(drawing, z, x, y, style), enc)
+            self.cache.put(key, data)
+        return data
+
+    def etag(self, drawing: Drawing, z: int, x: int, y: int,
+             style: Style = DEFAULT_STYLE, encoding: str | Encoding | None = None) -> str:
+        """Name of the content of tile ``z/x/y``, computed without rendering it.
+
+        It changes with the drawing's geometry, the style, the encoding and
+        the renderer's settings, so it is a valid HTTP entity tag.
+        """
+        enc = self.encoding if encoding is None else get_encoding(encoding)
+        h = hashlib.blake2b(digest_size=16)
+        for part in (drawing.digest, style.key(), enc.key(), self.backend, self.tile_size,
+                     self.simplify, self.min_pixels, z, x, y):
+            h.update(f"{part}\0".encode())
+        return h.hexdigest()
+
+    def render_view(self, drawing: Drawing, bbox, size: tuple[int, int],
+                    style: Style = DEFAULT_STYLE) -> Image.Image:
+        """Compose cached tiles into an image of ``bbox`` at ``size`` pixels."""
+        width, height = size
+        grid = self.grid(drawing)
+        units_per_px = max((bbox[2] - bbox[0]) / width, (bbox[3] - bbox[1]) / height)
+        z = grid.zoom_for(units_per_px, self.max_zoom)
+        cols, rows = grid.tile_range(z, bbox)
+        ts = self.tile_size
+        mosaic = Image.new("RGBA", (len(cols) * ts, len(rows) * ts), style.background)
+        for j, y in enumerate(rows):
+            for i, x in enumerate(cols):
+                tile = Image.open(io.BytesIO(self.tile(drawing, z, x, y, style)))
+                mosaic.paste(tile, (i * ts, j * ts))
+        # Crop the mosaic to the requested world rectangle.
+        span = grid.tile_span(z)
+        ox = grid.minx + cols.start * span
+        oy = grid.miny + grid.extent - rows.start * span
+        scale = ts / span
+        crop = (
+            round((bbox[0] - ox) * scale), round((oy - bbox[3]) * scale),
+            round((bbox[2] - ox) * scale), round((oy - bbox[1]) * scale),
+        )
+        return mosaic.crop(crop).resize((width, height), Image.BILINEAR)
+
+
+def _backend_id(backend: str | Rasterizer) -> str:
+    """A backend's name, or a short stable id of a rasterizer callable."""
+    if isinstance(backend, str):
+        return backend
+    name = f"{getattr(backend, '__module__', '')}.{getattr(backend, '__qualname__', backend)}"
+    return hashlib.blake2b(name.encode(), digest_size=6).hexdigest()
+
+
+def _style_id(style: Style, encoding: Encoding) -> str:
+    return hashlib.blake2b(f"{style.key()}\0{encoding.key()}".encode(),
+                           digest_size=6).hexdigest()
@@ -0,0 +1,17 @@
+"""World-space viewport helpers shared by the render backends."""
+
+from __future__ import annotations
+
+
+def fit_bounds(bbox, size: tuple[int, int], margin: float = 0.02):
+    """Grow ``bbox`` to the aspect ratio of ``size``, keeping it centred."""
+    minx, miny, maxx, maxy = bbox
+    width, height = size
+    w, h = (maxx - minx) or 1.0, (maxy - miny) or 1.0
+    w, h = w * (1 + 2 * margin), h * (1 + 2 * margin)
+    if w / h < width / height:
+        w = h * width / height
+    else:
+        h = w * height / width
+    cx, cy = (minx + maxx) / 2, (miny + maxy) / 2
+    return (cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2)
@@ -0,0 +1,300 @@
+"""Disk cache of operation results shared by every process on a machine.
+
+Renders, takeoffs, metrics and parsed uploads are pure functions of a
+drawing's content and the request parameters.  :class:`ResultCache`
+stores each result under ``blake2b(digest, operation, parameters)`` in a
+directory that the Streamlit app, Flask workers and job processes all
+point at (``$CADHELP_CACHE_DIR``, or ``~/.cache/cadhelp`` by default),
+so whichever process computes a result first saves the others the work.
+
+Values are kept in compact native formats, chosen by type:
+
+* ``bytes``: raw (PNG renders and tiles);
+* :class:`GeometryStore`: the memory-mappable ``.cadb`` format, so a
+  cached parse opens without copying;
+* a dict of NumPy arrays: ``.npz``;
+* a Shapely geometry: WKB;
+* anything else: JSON.
+
+Every write goes to a temporary file that is renamed into place, so
+readers in other processes see a whole entry or none.  Hits refresh the
+file's modification time, and once the directory grows past
+``max_bytes`` the least recently used entries are deleted, by one
+process at a time (an advisory ``flock`` where available).  Entries
+vanishing under a reader are simply misses, and so are entries that no
+longer decode, which are deleted.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import zipfile
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import shapely
+
+from .geometry import GeometryStore
+from .io.binary import read_binary, write_binary
+
+try:
+    import fcntl
+except ImportError:  # Windows: eviction is then not serialized across processes
+    fcntl = None
+
+CACHE_DIR_ENV = "CADHELP_CACHE_DIR"
+MAX_BYTES = 2 << 30
+LOW_WATER = 0.9  # eviction frees space down to this fraction of max_bytes
+STALE_TEMP = 3600  # seconds before an unfinished write counts as abandoned
+
+_SUFFIXES = (".cadb", ".npz", ".wkb", ".json", ".bin")
+# What decoding a truncated or garbled entry raises.
+_CORRUPT = (OSError, EOFError, ValueError, zipfile.BadZipFile, shapely.errors.ShapelyError)
+
+
+def default_directory() -> Path:
+    env = os.environ.get(CACHE_DIR_ENV)
+    if env:
+        return Path(env)
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "cadhelp"
+
+
+def _jsonable(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (np.ndarray, tuple, set, frozenset)):
+        return sorted(value) if isinstance(value, (set, frozenset)) else list(value)
+    raise TypeError(f"cannot use {type(value).__name__} as a cache parameter")
+
+
+def cache_key(digest: str, op: str, params: dict | None = None) -> str:
+    """Entry name for ``op`` with ``params`` applied to content ``digest``."""
+    spec = json.dumps([digest, op, params or {}], sort_keys=True,
+                      separators=(",", ":"), default=_jsonable)
+    return hashlib.blake2b(spec.encode(), digest_size=20).hexdigest()
+
+
+def parse_key(content: str, name: str) -> str:
+    """Entry for the store parsed from upload ``name`` whose bytes hash to ``content``.
+
+    ``content`` is a 16-byte blake2b hex digest of the raw file, as computed
+    by :func:`cadhelp.ui.cache.content_hash` and the API's upload handler.
+    """
+    return cache_key(content, "parse", {"format": Path(name).suffix.lower()})
+
+
+class ResultCache:
+    """Size-bounded, content-addressed result files in one directory.
+
+    Args:
+        directory: cache root; created on first write.
+        max_bytes: total size above which old entries are evicted.
+    """
+
+    def __init__(self, directory: str | os.PathLike | None = None, max_bytes: int = MAX_BYTES):
+        self.directory = Path(directory) if directory is not None else default_directory()
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._since_evict = 0
+        self.hits = self.misses = self.writes = self.evictions = 0
+
+    def __repr__(self) -> str:
+        return f"ResultCache({str(self.directory)!r}, max_bytes={self.max_bytes})"
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "writes": self.writes,
+                "evictions": self.evictions}
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self.directory / key[:2] / f"{key}{suffix}"
+
+    # -- entries -------------------------------------------------------------
+
+    def get(self, key: str) -> Any | None:
+        """The value stored under ``key``, or ``None``."""
+        for suffix in _SUFFIXES:
+            path = self._path(key, suffix)
+            try:
+                value = _decode(path, suffix)
+            except FileNotFoundError:
+                continue
+            except _CORRUPT:
+                # Damaged on disk; drop it so the next put() replaces it.
+                try:
+                    path.unlink(missing_ok=True)
+                except OSError:
+                    pass
+                continue
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                continue
+            with self._lock:
+                self.hits += 1
+            return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, value: Any) -> bool:
+        """Store ``value`` under ``key``, replacing any previous entry atomically.
+
+        Returns ``False`` instead of raising if the value has no cacheable
+        encoding or the write fails (e.g. a full disk); a cache must never
+        break the request it is trying to speed up.
+        """
+        path = self._path(key, _suffix(value))
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if isinstance(value, GeometryStore):
+                write_binary(value, path)
+            else:
+                fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        _encode(f, value)
+                    os.replace(tmp, path)
+                except BaseException:
+                    os.unlink(tmp)
+                    raise
+            size = path.stat().st_size
+        except (OSError, TypeError, ValueError):
+            return False
+        with self._lock:
+            self.writes += 1
+            self._since_evict += size
+            due = self._since_evict > self.max_bytes // 16
+            if due:
+                self._since_evict = 0
+        if due:
+            self.evict()
+        return True
+
+    def get_or_compute(self, digest: str, op: str, params: dict | None,
+                       compute: Callable[[], Any]) -> Any:
+        """Cached result of ``compute()`` for ``op`` on content ``digest``."""
+        key = cache_key(digest, op, params)
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.put(key, value)
+        return value
+
+    def discard(self, key: str) -> None:
+        for suffix in _SUFFIXES:
+            self._path(key, suffix).unlink(missing_ok=True)
+
+    # -- eviction ------------------------------------------------------------
+
+    def _entries(self) -> list[tuple[float, int, str]]:
+        """``(mtime, size, path)`` of every entry, and of abandoned temporary files."""
+        out = []
+        if not self.directory.is_dir():
+            return out
+        stale = time.time() - STALE_TEMP
+        for sub in os.scandir(self.directory):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if entry.name.endswith(".tmp") and st.st_mtime > stale:
+                    continue  # another process is still writing it
+                out.append((st.st_mtime, st.st_size, entry.path))
+        return out
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> int:
+        """Delete least recently used entries until under budget; returns the count."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / ".lock", "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            if total <= self.max_bytes:
+                return 0
+            removed = 0
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes * LOW_WATER:
+                    break
+                try:
+                    os.unlink(path)
+                except OSError:  # gone already, or mapped by a reader on Windows
+                    continue
+                total -= size
+                removed += 1
+        with self._lock:
+            self.evictions += removed
+        return removed
+
+    def clear(self) -> None:
+        for _, _, path in self._entries():
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+def _suffix(value: Any) -> str:
+    if isinstance(value, GeometryStore):
+        return ".cadb"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return ".bin"
+    if isinstance(value, shapely.Geometry):
+        return ".wkb"
+    if isinstance(value, dict) and value and all(
+            isinstance(v, np.ndarray) for v in value.values()):
+        return ".npz"
+    return ".json"
+
+
+def _encode(f, value: Any) -> None:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        f.write(value)
+    elif isinstance(value, shapely.Geometry):
+        f.write(shapely.to_wkb(value))
+    elif isinstance(value, dict) and _suffix(value) == ".npz":
+        np.savez_compressed(f, **value)
+    else:
+        f.write(json.dumps(value, separators=(",", ":"), default=_jsonable).encode())
+
+
+def _decode(path: Path, suffix: str) -> Any:
+    if suffix == ".cadb":
+        return read_binary(path)
+    data = path.read_bytes()
+    if suffix == ".bin":
+        return data
+    if suffix == ".wkb":
+        return shapely.from_wkb(data)
+    if suffix == ".npz":
+        with np.load(io.BytesIO(data), allow_pickle=False) as npz:
+            return {name: npz[name] for name in npz.files}
+    return json.loads(data)
+
+
+_shared: ResultCache | None = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache() -> ResultCache:
+    """The process-wide cache in :func:`default_directory`."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ResultCache()
+        return _shared
@@ -0,0 +1,250 @@
+"""STRtree-backed spatial index for hit-testing, snapping and selection.
+
+Shapely's ``STRtree`` is immutable, so :class:`SpatialIndex` keeps a large
+packed tree over the bulk of the drawing plus a small overlay of entities
+inserted or replaced since it was built.  Removed entities are tombstoned
+in the packed tree.  Once the overlay and tombstones exceed a fraction of
+the packed size the whole index is repacked, which keeps edits cheap and
+queries logarithmic.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Iterable, NamedTuple
+
+import numpy as np
+import shapely
+from shapely import STRtree
+
+from .geometry import GeometryStore, to_shapely
+from .instrument import timed
+
+
+class VertexHit(NamedTuple):
+    entity_id: int
+    vertex: int
+    x: float
+    y: float
+    distance: float
+
+
+class NearestHit(NamedTuple):
+    entity_id: int
+    x: float
+    y: float
+    distance: float
+
+
+def _object_array(values) -> np.ndarray:
+    out = np.empty(len(values), dtype=object)
+    out[:] = values
+    return out
+
+
+class _Tree:
+    """A packed STRtree plus the ids of the geometries it holds."""
+
+    __slots__ = ("ids", "geoms", "tree", "alive")
+
+    def __init__(self, ids: np.ndarray, geoms: np.ndarray):
+        self.ids = ids
+        self.geoms = geoms
+        self.tree = STRtree(geoms)
+        self.alive = np.ones(len(ids), dtype=bool)
+
+
+class SpatialIndex:
+    """Incrementally maintained spatial index keyed by stable entity id.
+
+    Args:
+        ids: entity ids, parallel to ``geoms``.
+        geoms: Shapely geometries to index.
+        rebuild_ratio: repack once pending edits exceed this fraction of
+            the packed tree.
+        min_rebuild: never repack for fewer pending edits than this.
+    """
+
+    def __init__(
+        self,
+        ids: Iterable[int] = (),
+        geoms: Iterable = (),
+        rebuild_ratio: float = 0.1,
+        min_rebuild: int = 256,
+    ):
+        self.rebuild_ratio = rebuild_ratio
+        self.min_rebuild = min_rebuild
+        self._lock = threading.RLock()
+        self._pack(np.asarray(list(ids), dtype=np.int64), _object_array(list(geoms)))
+
+    @classmethod
+    def from_store(cls, store: GeometryStore, **kwargs) -> "SpatialIndex":
+        index = cls(**kwargs)
+        with timed("index"):
+            index._pack(store.ids.copy(), to_shapely(store))
+        return index
+
+    def __len__(self) -> int:
+        return int(self._base.alive.sum()) + len(self._overlay)
+
+    def __contains__(self, entity_id: int) -> bool:
+        return entity_id in self._overlay or entity_id in self._where
+
+    @property
+    def pending(self) -> int:
+        """Edits not yet folded into the packed tree."""
+        return len(self._overlay) + self._dead
+
+    def copy(self) -> "SpatialIndex":
+        """An independently editable index sharing this one's packed tree.
+
+        STRtrees are immutable, so only the tombstones, the id lookup and
+        the overlay are copied; the expensive tree build is not repeated.
+        """
+        with self._lock:
+            other = object.__new__(SpatialIndex)
+            other.rebuild_ratio = self.rebuild_ratio
+            other.min_rebuild = self.min_rebuild
+            other._lock = threading.RLock()
+            base = object.__new__(_Tree)
+            base.ids, base.geoms, base.tree = self._base.ids, self._base.geoms, self._base.tree
+            base.alive = self._base.alive.copy()
+            other._base = base
+            other._where = dict(self._where)
+            other._overlay = dict(self._overlay)
+            other._overlay_tree = None
+            other._dead = self._dead
+            return other
+
+    # -- maintenance ---------------------------------------------------------
+
+    def _pack(self, ids: np.ndarray, geoms: np.ndarray) -> None:
+        with self._lock:
+            self._base = _Tree(ids, geoms)
+            self._where = {int(i): k for k, i in enumerate(ids)}
+            self._overlay: dict[int, object] = {}
+            self._overlay_tree: _Tree | None = None
+            self._dead = 0
+
+    def _kill(self, entity_id: int) -> None:
+        k = self._where.pop(entity_id, None)
+        if k is not None:
+            self._base.alive[k] = False
+            self._dead += 1
+
+    def upsert(self, ids: Iterable[int], geoms: Iterable) -> None:
+        """Insert new entities or replace the geometry of existing ones."""
+        with self._lock:
+            for entity_id, geom in zip(ids, geoms):
+                entity_id = int(entity_id)
+                self._kill(entity_id)
+                self._overlay[entity_id] = geom
+            self._overlay_tree = None
+            self._maybe_repack()
+
+    def upsert_store(self, store: GeometryStore) -> None:
+        """Upsert every entity of ``store`` (e.g. the entities an edit touched)."""
+        self.upsert(store.ids, to_shapely(store))
+
+    def remove(self, ids: Iterable[int]) -> None:
+        with self._lock:
+            for entity_id in ids:
+                entity_id = int(entity_id)
+                if self._overlay.pop(entity_id, None) is not None:
+                    self._overlay_tree = None
+                else:
+                    self._kill(entity_id)
+            self._maybe_repack()
+
+    def _maybe_repack(self) -> None:
+        limit = max(self.min_rebuild, self.rebuild_ratio * len(self._base.ids))
+        if self.pending > limit:
+            self.repack()
+
+    def repack(self) -> None:
+        """Fold pending edits into a freshly packed tree."""
+        with self._lock:
+            alive = self._base.alive
+            ids = np.concatenate([
+                self._base.ids[alive],
+                np.fromiter(self._overlay.keys(), np.int64, len(self._overlay)),
+            ])
+            geoms = np.concatenate([
+                self._base.geoms[alive],
+                _object_array(list(self._overlay.values())),
+            ])
+            self._pack(ids, geoms)
+
+    def _trees(self) -> list[_Tree]:
+        with self._lock:
+            if self._overlay and self._overlay_tree is None:
+                self._overlay_tree = _Tree(
+                    np.fromiter(self._overlay.keys(), np.int64, len(self._overlay)),
+                    _object_array(list(self._overlay.values())),
+                )
+            trees = [self._base]
+            if self._overlay:
+                trees.append(self._overlay_tree)
+            return trees
+
+    # -- queries -------------------------------------------------------------
+
+    def _candidates(self, geom, predicate=None, distance=None):
+        ids, geoms = [], []
+        for t in self._trees():
+            hits = t.tree.query(geom, predicate=predicate, distance=distance)
+            hits = hits[t.alive[hits]]
+            ids.append(t.ids[hits])
+            geoms.append(t.geoms[hits])
+        return np.concatenate(ids), np.concatenate(geoms)
+
+    def query_box(self, bbox, mode: str = "intersects") -> np.ndarray:
+        """Ids of entities selected by a rectangle ``(minx, miny, maxx, maxy)``.
+
+        ``mode="intersects"`` gives crossing selection (anything touching the
+        box); ``mode="within"`` gives window selection (fully inside).
+        """
+        predicate = {"intersects": "intersects", "within": "contains"}.get(mode)
+        if predicate is None:
+            raise ValueError(f"unknown selection mode {mode!r}")
+        ids, _ = self._candidates(shapely.box(*bbox), predicate)
+        return ids
+
+    def bbox_candidates(self, bbox) -> np.ndarray:
+        """Ids whose bounding boxes intersect ``bbox`` (no exact test)."""
+        ids, _ = self._candidates(shapely.box(*bbox))
+        return ids
+
+    def at_point(self, x: float, y: float, tolerance: float = 0.0) -> np.ndarray:
+        """Ids of entities within ``tolerance`` of ``(x, y)``, nearest first."""
+        point = shapely.Point(x, y)
+        ids, geoms = self._candidates(point, "dwithin", tolerance)
+        if len(ids) > 1:
+            ids = ids[np.argsort(shapely.distance(geoms, point), kind="stable")]
+        return ids
+
+    def nearest_vertex(self, x: float, y: float, tolerance: float) -> VertexHit | None:
+        """Closest entity vertex within ``tolerance`` of ``(x, y)``, if any."""
+        point = shapely.Point(x, y)
+        ids, geoms = self._candidates(point, "dwithin", tolerance)
+        if not len(ids):
+            return None
+        coords, owner = shapely.get_coordinates(geoms, return_index=True)
+        d = np.hypot(coords[:, 0] - x, coords[:, 1] - y)
+        k = int(np.argmin(d))
+        if d[k] > tolerance:
+            return None
+        first = np.searchsorted(owner, owner[k])
+        return VertexHit(int(ids[owner[k]]), int(k - first),
+                         float(coords[k, 0]), float(coords[k, 1]), float(d[k]))
+
+    def nearest_point(self, x: float, y: float, tolerance: float) -> NearestHit | None:
+        """Closest point on any entity within ``tolerance`` (snap-to-nearest)."""
+        point = shapely.Point(x, y)
+        ids, geoms = self._candidates(point, "dwithin", tolerance)
+        if not len(ids):
+            return None
+        d = shapely.distance(geoms, point)
+        k = int(np.argmin(d))
+        snap = shapely.get_coordinates(shapely.shortest_line(geoms[k], point))[0]
+        return NearestHit(int(ids[k]), float(snap[0]), float(snap[1]), float(d[k]))
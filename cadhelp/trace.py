@@ -0,0 +1,751 @@
+"""Raster-to-vector tracing of scanned and photographed drawings.
+
+The pipeline, all on NumPy arrays:
+
+1. **Binarize.**  The image is decoded in horizontal stripes, converted
+   to grey and thresholded (Otsu's threshold of the whole image, from a
+   first pass over the stripes, unless one is given) into bit-packed ink
+   rows, one bit per pixel.  PNG scans are inflated and unfiltered a
+   stripe at a time straight from the file; other formats are decoded
+   whole by Pillow first, and refused above :data:`WHOLE_DECODE_PIXELS`.
+2. **Thin.**  The packed rows are cut into square tiles with an
+   overlapping margin, a row of tiles at a time.  Each tile is unpacked
+   and thinned to a one-pixel skeleton with Zhang-Suen, evaluated for
+   all ink pixels at once through a 256-entry lookup table of
+   neighbourhood codes.
+3. **Extract.**  Neighbouring skeleton pixels become unit segments (a
+   diagonal step is dropped where an L-shaped path already connects the
+   two pixels, so corners do not form triangles), and
+   ``shapely.line_merge`` joins them into maximal polylines.  A tile only
+   emits the segments starting in its own core, so tiles can be traced
+   independently, in worker processes; their polylines meet at shared
+   pixel centres and a final merge joins them across tile edges.
+4. **Fit.**  Polylines are simplified with Douglas-Peucker.  Curved ones
+   are tested against a circle fitted to all their pixels at once
+   (a vectorized algebraic fit); those within tolerance become
+   :class:`Arc` objects and are flattened to as many segments as the
+   tolerance needs.
+
+For a PNG, peak memory is a stripe of pixels, the packed rows of one
+row of tiles (5 MB for a 20k x 14k A0 scan at 600 dpi) and one tile per
+worker, so it grows with the width of the scan, not its area.  Output
+coordinates are world units: millimetres when the image records its
+dpi, pixels otherwise, with y pointing up.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import math
+import multiprocessing
+import os
+import struct
+import threading
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import IO, Callable, Iterator, NamedTuple
+
+import numpy as np
+import shapely
+from PIL import Image, UnidentifiedImageError
+
+from .geometry import GeometryStore, from_shapely
+from .jobs import report_progress
+
+TILE_SIZE = 2048
+MARGIN = 32  # strokes up to about twice this wide thin alike in neighbouring tiles
+STRIPE = 512
+MAX_PIXELS = 600_000_000
+WHOLE_DECODE_PIXELS = 100_000_000  # up to 400 MB decoded; only PNG is read by stripes
+LINE_TOLERANCE = 1.0  # pixels
+ARC_TOLERANCE = 1.0  # pixels
+MIN_ARC_POINTS = 8
+MIN_LENGTH = 4.0  # pixels; shorter polylines are specks
+TILE_SHARE = 0.8  # share of the reported progress spent tracing tiles
+
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp")
+
+
+class Arc(NamedTuple):
+    """Circular arc, counter-clockwise from ``start`` to ``end`` (degrees)."""
+
+    cx: float
+    cy: float
+    radius: float
+    start: float
+    end: float
+
+    @property
+    def closed(self) -> bool:
+        return self.end - self.start >= 360.0
+
+
+@dataclass
+class TraceResult:
+    """Traced geometry and how it was obtained.
+
+    Attributes:
+        store: one linestring entity per traced polyline or arc.
+        arcs: the fitted arcs, for callers that want exact curves.
+        threshold: grey level separating ink from paper.
+        units_per_pixel: world size of one pixel.
+        size: image ``(width, height)`` in pixels.
+    """
+
+    store: GeometryStore
+    arcs: list[Arc] = field(default_factory=list)
+    threshold: int = 128
+    units_per_pixel: float = 1.0
+    size: tuple[int, int] = (0, 0)
+
+
+# -- binarization --------------------------------------------------------------
+
+_OPEN_LOCK = threading.Lock()
+
+
+def open_image(source: str | os.PathLike | bytes | IO[bytes]) -> Image.Image:
+    """Open an image lazily, allowing scans up to :data:`MAX_PIXELS`.
+
+    Pillow's process-wide decompression-bomb limit is lifted only while
+    the header is read and restored straight after; the size is checked
+    against :data:`MAX_PIXELS` instead.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    with _OPEN_LOCK:
+        limit, Image.MAX_IMAGE_PIXELS = Image.MAX_IMAGE_PIXELS, None
+        try:
+            image = Image.open(source)
+        except UnidentifiedImageError as exc:
+            raise ValueError(str(exc)) from None
+        finally:
+            Image.MAX_IMAGE_PIXELS = limit
+    width, height = image.size
+    if width * height > MAX_PIXELS:
+        image.close()
+        raise ValueError(f"image of {width} x {height} pixels is over the limit of "
+                         f"{MAX_PIXELS} pixels")
+    return image
+
+
+def _has_alpha(image: Image.Image) -> bool:
+    return image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+
+
+def _grey(part: Image.Image, alpha: bool) -> np.ndarray:
+    """Grey ``uint8`` pixels of ``part``, transparency composited onto white."""
+    if alpha:
+        part = Image.alpha_composite(Image.new("RGBA", part.size, "white"), part.convert("RGBA"))
+    return np.asarray(part.convert("L"))
+
+
+def _stripes(image: Image.Image, stripe: int = STRIPE) -> Iterator[tuple[int, np.ndarray]]:
+    """Grey ``uint8`` stripes of ``image``, transparency composited onto white."""
+    width, height = image.size
+    alpha = _has_alpha(image)
+    for y in range(0, height, stripe):
+        yield y, _grey(image.crop((0, y, width, min(y + stripe, height))), alpha)
+
+
+# Channels per colour type, and Pillow's mode and raw mode per bit depth and colour type.
+_PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+_PNG_MODES = {
+    (1, 0): ("1", "1"), (2, 0): ("L", "L;2"), (4, 0): ("L", "L;4"), (8, 0): ("L", "L"),
+    (16, 0): ("I;16", "I;16B"), (8, 2): ("RGB", "RGB"), (1, 3): ("P", "P;1"),
+    (2, 3): ("P", "P;2"), (4, 3): ("P", "P;4"), (8, 3): ("P", "P"), (8, 4): ("LA", "LA"),
+    (16, 4): ("RGBA", "LA;16B"), (8, 6): ("RGBA", "RGBA"),
+}
+# 8-bit colour type with 1, 2, 3 or 4 bytes per pixel.  PNG filters work on
+# bytes, so rows of any image with that many bytes per pixel unfilter alike
+# as rows of this type.
+_PNG_CARRIERS = {1: 0, 2: 4, 3: 2, 4: 6}
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_PNG_READ = 1 << 20
+
+
+class _PngHeader(NamedTuple):
+    width: int
+    height: int
+    depth: int
+    colour: int
+    palette: bytes
+    idat: int  # length of the first IDAT chunk, whose data ``fp`` is at
+
+
+def _png_header(fp: IO[bytes]) -> _PngHeader | None:
+    """Read a PNG up to its image data; ``None`` unless it decodes by stripes.
+
+    Interlaced images and 16-bit colour are left to Pillow.
+    """
+    if fp.read(8) != _PNG_SIGNATURE:
+        return None
+    ihdr, palette = None, b""
+    while True:
+        head = fp.read(8)
+        if len(head) < 8:
+            return None
+        length, kind = struct.unpack(">I4s", head)
+        if kind == b"IDAT":
+            break
+        data = fp.read(length)
+        fp.read(4)  # CRC
+        if kind == b"IHDR":
+            ihdr = struct.unpack(">IIBBBBB", data)
+        elif kind == b"PLTE":
+            palette = data
+    if ihdr is None:
+        return None
+    width, height, depth, colour, _, _, interlace = ihdr
+    if interlace or (depth, colour) not in _PNG_MODES:
+        return None
+    return _PngHeader(width, height, depth, colour, palette, length)
+
+
+def _png_data(fp: IO[bytes], length: int) -> Iterator[bytes]:
+    """Compressed image data from the IDAT chunk at ``fp`` and the ones after it."""
+    while True:
+        while length:
+            piece = fp.read(min(length, _PNG_READ))
+            if not piece:
+                raise ValueError("PNG image data is truncated")
+            length -= len(piece)
+            yield piece
+        fp.read(4)  # CRC; zlib's checksum covers the data
+        head = fp.read(8)
+        if len(head) < 8:
+            return
+        length, kind = struct.unpack(">I4s", head)
+        if kind != b"IDAT":
+            return
+
+
+def _png_chunk(kind: bytes, data: bytes) -> list[bytes]:
+    crc = zlib.crc32(data, zlib.crc32(kind))
+    return [struct.pack(">I", len(data)), kind, data, struct.pack(">I", crc)]
+
+
+def _unfilter(filtered: bytes, previous: bytes, stride: int, bpp: int) -> np.ndarray:
+    """Raw ``(rows, stride)`` bytes of filtered PNG rows following ``previous``.
+
+    Pillow does the unfiltering: the rows go to it as a small 8-bit PNG
+    behind the row above them, stored unfiltered.
+    """
+    if previous:
+        filtered = b"\0" + previous + filtered
+    rows = len(filtered) // (stride + 1)
+    header = struct.pack(">IIBBBBB", stride // bpp, rows, 8, _PNG_CARRIERS[bpp], 0, 0, 0)
+    png = b"".join([_PNG_SIGNATURE, *_png_chunk(b"IHDR", header),
+                    *_png_chunk(b"IDAT", zlib.compress(filtered, 0)),
+                    *_png_chunk(b"IEND", b"")])
+    with open_image(png) as carrier:
+        raw = np.asarray(carrier).reshape(rows, stride)
+    return raw[1:] if previous else raw
+
+
+def _png_stripes(fp: IO[bytes], header: _PngHeader, image: Image.Image,
+                 stripe: int = STRIPE) -> Iterator[tuple[int, np.ndarray]]:
+    """Grey stripes of a PNG, inflated from its image data a stripe at a time.
+
+    ``image`` is the file opened by Pillow, for its transparency.
+    """
+    width, height, depth, colour = header[:4]
+    channels = _PNG_CHANNELS[colour]
+    bpp = max(channels * depth // 8, 1)
+    stride = (width * channels * depth + 7) // 8
+    mode, rawmode = _PNG_MODES[depth, colour]
+    alpha = _has_alpha(image)
+    data = _png_data(fp, header.idat)
+    inflate = zlib.decompressobj()
+    pending, previous = b"", b""
+    for y in range(0, height, stripe):
+        rows = min(stripe, height - y)
+        size = rows * (stride + 1)
+        parts = [pending]
+        have = len(pending)
+        while have < size:
+            piece = inflate.unconsumed_tail or next(data, b"")
+            if not piece:
+                raise ValueError("PNG image data is truncated")
+            out = inflate.decompress(piece, size - have)
+            parts.append(out)
+            have += len(out)
+        filtered = b"".join(parts)
+        filtered, pending = filtered[:size], filtered[size:]
+        raw = _unfilter(filtered, previous, stride, bpp)
+        previous = raw[-1].tobytes()
+        part = Image.frombuffer(mode, (width, rows), raw, "raw", rawmode, 0, 1)
+        if header.palette:
+            part.putpalette(header.palette)
+        if "transparency" in image.info:
+            part.info["transparency"] = image.info["transparency"]
+        yield y, _grey(part, alpha)
+
+
+@contextlib.contextmanager
+def _reopen(source: str | os.PathLike | bytes | IO[bytes], start: int) -> Iterator[IO[bytes]]:
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as fp:
+            yield fp
+    elif isinstance(source, bytes):
+        yield io.BytesIO(source)
+    else:
+        source.seek(start)
+        yield source
+
+
+def _stripe_source(source) -> tuple[Image.Image, Callable[[], Iterator[tuple[int, np.ndarray]]]]:
+    """The image at ``source`` and a function yielding its grey stripes afresh.
+
+    PNG files are decoded a stripe at a time straight from ``source``
+    (read again on every call), so only a stripe of pixels is ever held.
+    Other formats, and open Pillow images, are decoded whole by Pillow;
+    files over :data:`WHOLE_DECODE_PIXELS` that would be are refused with
+    a :class:`ValueError`.
+    """
+    if isinstance(source, Image.Image):
+        return source, lambda: _stripes(source)
+    if isinstance(source, (bytearray, memoryview)):
+        source = bytes(source)
+    elif not isinstance(source, (bytes, str, os.PathLike)) and not source.seekable():
+        source = source.read()
+    start = 0 if isinstance(source, (bytes, str, os.PathLike)) else source.tell()
+    image = open_image(source)
+    if image.format == "PNG":
+        with _reopen(source, start) as fp:
+            header = _png_header(fp)
+        if header is not None:
+            def stripes():
+                with _reopen(source, start) as fp:
+                    yield from _png_stripes(fp, _png_header(fp), image)
+            return image, stripes
+    width, height = image.size
+    if width * height > WHOLE_DECODE_PIXELS:
+        kind = image.format or "image"
+        image.close()
+        raise ValueError(f"{kind} of {width} x {height} pixels is over the limit of "
+                         f"{WHOLE_DECODE_PIXELS} pixels for decoding whole; "
+                         f"convert it to a non-interlaced PNG")
+    return image, lambda: _stripes(image)
+
+
+def otsu(histogram) -> int:
+    """Grey level maximizing the between-class variance of a 256-bin histogram."""
+    h = np.asarray(histogram[:256], dtype=np.float64)
+    levels = np.arange(256)
+    w0 = np.cumsum(h)
+    w1 = w0[-1] - w0
+    m0 = np.cumsum(h * levels)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = w0 * w1 * (m0 / w0 - (m0[-1] - m0) / w1) ** 2
+    if not np.isfinite(between).any():
+        return 128
+    # Clean two-tone images tie over the whole gap; take its middle.
+    best = np.flatnonzero(between >= np.nanmax(between) * (1 - 1e-9))
+    return int(best[0] + best[-1]) // 2
+
+
+def _histogram(stripes: Iterator[tuple[int, np.ndarray]]) -> np.ndarray:
+    hist = np.zeros(256, dtype=np.int64)
+    for _, grey in stripes:
+        # Pillow counts in place; bincount would widen the stripe to int64.
+        hist += Image.fromarray(grey).histogram()
+    return hist
+
+
+def _pack(stripes: Iterator[tuple[int, np.ndarray]], threshold: int,
+          invert: bool) -> Iterator[tuple[int, np.ndarray]]:
+    """Bit-packed ink rows of each stripe."""
+    for y, grey in stripes:
+        ink = grey > threshold if invert else grey <= threshold
+        yield y, np.packbits(ink, axis=1)
+
+
+def binarize(image: Image.Image, threshold: int | None = None, invert: bool = False,
+             stripe: int = STRIPE) -> tuple[np.ndarray, int]:
+    """Bit-packed ink mask ``(H, ceil(W / 8))`` and the threshold used.
+
+    Args:
+        image: source image, any mode.
+        threshold: grey level; pixels darker than it are ink.  Otsu's
+            threshold of the whole image by default.
+        invert: light ink on a dark background (e.g. blueprints).
+        stripe: rows converted at a time.
+    """
+    width, height = image.size
+    if threshold is None:
+        threshold = otsu(_histogram(_stripes(image, stripe)))
+    packed = np.empty((height, (width + 7) // 8), dtype=np.uint8)
+    for y, rows in _pack(_stripes(image, stripe), threshold, invert):
+        packed[y:y + len(rows)] = rows
+    return packed, int(threshold)
+
+
+class _Rows:
+    """Rolling window over packed mask rows arriving in stripes, top to bottom."""
+
+    def __init__(self, stripes: Iterator[tuple[int, np.ndarray]]):
+        self._stripes = stripes
+        self._top = 0
+        self._rows: np.ndarray | None = None
+
+    def get(self, row0: int, row1: int) -> np.ndarray:
+        """Rows ``row0:row1``; rows above ``row0`` are dropped for good."""
+        parts = []
+        if self._rows is not None:
+            parts.append(self._rows[row0 - self._top:])
+        have = row0 + len(parts[0]) if parts else self._top
+        while have < row1:
+            y, rows = next(self._stripes)
+            parts.append(rows)
+            have = y + len(rows)
+        self._rows = parts[0] if len(parts) == 1 else np.concatenate(parts)
+        self._top = row0
+        return self._rows[:row1 - row0]
+
+
+# -- thinning --------------------------------------------------------------------
+
+# Neighbour bit k of a pixel's code, clockwise from north: N NE E SE S SW W NW.
+_DIRECTIONS = ((-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1))
+
+
+def _zhang_suen_tables() -> tuple[np.ndarray, np.ndarray]:
+    first = np.zeros(256, dtype=bool)
+    second = np.zeros(256, dtype=bool)
+    for code in range(256):
+        p = [(code >> k) & 1 for k in range(8)]
+        count = sum(p)
+        transitions = sum(p[k] == 0 and p[(k + 1) % 8] == 1 for k in range(8))
+        if not (2 <= count <= 6 and transitions == 1):
+            continue
+        n, e, s, w = p[0], p[2], p[4], p[6]
+        first[code] = n * e * s == 0 and e * s * w == 0
+        second[code] = n * e * w == 0 and n * s * w == 0
+    return first, second
+
+
+_THIN_TABLES = _zhang_suen_tables()
+
+
+def thin(mask: np.ndarray) -> np.ndarray:
+    """Zhang-Suen skeleton of a boolean image.
+
+    Each pass computes the 8-neighbour code of every remaining ink pixel
+    with eight gathers and looks the deletion rule up in a table, so a
+    pass costs time in proportion to the ink, not the image.
+    """
+    h, w = mask.shape
+    stride = w + 2
+    img = np.zeros((h + 2, stride), dtype=np.uint8)
+    img[1:-1, 1:-1] = mask
+    flat = img.ravel()
+    offsets = [dr * stride + dc for dr, dc in _DIRECTIONS]
+    on = np.flatnonzero(flat)
+    changed = True
+    while changed:
+        changed = False
+        for table in _THIN_TABLES:
+            code = np.zeros(len(on), dtype=np.uint8)
+            for k, off in enumerate(offsets):
+                code |= flat[on + off] << k
+            kill = table[code]
+            if kill.any():
+                flat[on[kill]] = 0
+                on = on[~kill]
+                changed = True
+    return img[1:-1, 1:-1].astype(bool)
+
+
+# -- extraction --------------------------------------------------------------------
+
+
+def skeleton_segments(skeleton: np.ndarray, core=None) -> np.ndarray:
+    """Segments ``(S, 2, 2)`` joining neighbouring skeleton pixels.
+
+    Coordinates are ``(column, row)`` pixel indices.  Each unit step is
+    listed once, from its first pixel in row-major order; with ``core =
+    (row0, row1, col0, col1)`` only steps starting inside it are kept.
+    Straight runs of steps through pixels where nothing branches off are
+    returned as a single segment, which leaves ``line_merge`` a fraction
+    of the work.
+    """
+    h, w = skeleton.shape
+    s = np.zeros((h + 2, w + 2), dtype=bool)
+    s[1:-1, 1:-1] = skeleton
+    r, c = np.nonzero(skeleton)
+    pr, pc = r + 1, c + 1  # padded coordinates
+    east, south = s[pr, pc + 1], s[pr + 1, pc]
+    steps = [
+        ((0, 1), east),
+        ((1, 0), south),
+        # Diagonals only where no L-shaped path already joins the two pixels.
+        ((1, 1), s[pr + 1, pc + 1] & ~east & ~south),
+        ((1, -1), s[pr + 1, pc - 1] & ~s[pr, pc - 1] & ~south),
+    ]
+    # Degree over every step in the window, owned or not, so runs never
+    # swallow a junction whose other branch belongs to a neighbouring tile.
+    degree = np.zeros(h * w, dtype=np.int8)
+    for (dr, dc), present in steps:
+        np.add.at(degree, r[present] * w + c[present], 1)
+        np.add.at(degree, (r[present] + dr) * w + c[present] + dc, 1)
+    if core is not None:
+        inside = (r >= core[0]) & (r < core[1]) & (c >= core[2]) & (c < core[3])
+    parts = []
+    for (dr, dc), present in steps:
+        if core is not None:
+            present = present & inside
+        sr, sc = r[present], c[present]
+        # Steps along one grid line, in order; a step continues the one
+        # before it if they share a pixel of degree two.
+        line, along = [(sr, sc), (sc, sr), (sc - sr, sr), (sc + sr, sr)][
+            [(0, 1), (1, 0), (1, 1), (1, -1)].index((dr, dc))]
+        order = np.lexsort((along, line))
+        sr, sc, line, along = sr[order], sc[order], line[order], along[order]
+        follows = np.zeros(len(sr), dtype=bool)
+        follows[1:] = (line[1:] == line[:-1]) & (along[1:] == along[:-1] + 1)
+        follows &= degree[sr * w + sc] == 2
+        heads = np.flatnonzero(~follows)
+        tails = np.r_[heads[1:] - 1, len(sr) - 1] if len(heads) else heads
+        first = np.column_stack([sc[heads], sr[heads]])
+        last = np.column_stack([sc[tails] + dc, sr[tails] + dr])
+        parts.append(np.stack([first, last], axis=1))
+    return np.concatenate(parts).astype(np.float64)
+
+
+def merge_segments(segments) -> np.ndarray:
+    """Join lines sharing endpoints into maximal polylines (Shapely array).
+
+    ``segments`` is a coordinate array ``(S, 2, 2)`` or an array of lines.
+    """
+    segments = np.asarray(segments)
+    lines = segments if segments.dtype == object else shapely.linestrings(segments)
+    if not len(lines):
+        return np.empty(0, dtype=object)
+    return shapely.get_parts(shapely.line_merge(shapely.multilinestrings(lines)))
+
+
+def _trace_tile(packed: np.ndarray, width: int, row0: int, col0: int,
+                core: tuple[int, int, int, int]) -> tuple[np.ndarray, np.ndarray]:
+    """Polylines of one tile window, as global pixel coordinates and owners."""
+    mask = np.unpackbits(packed, axis=1, count=width).astype(bool)
+    if not mask.any():
+        return np.empty((0, 2)), np.empty(0, np.int64)
+    local = (core[0] - row0, core[1] - row0, core[2] - col0, core[3] - col0)
+    segments = skeleton_segments(thin(mask), local)
+    if not len(segments):
+        return np.empty((0, 2)), np.empty(0, np.int64)
+    segments += (col0, row0)
+    return shapely.get_coordinates(merge_segments(segments), return_index=True)
+
+
+def tiles(height: int, width: int, tile_size: int = TILE_SIZE,
+          margin: int = MARGIN) -> Iterator[tuple[int, int, int, int, tuple]]:
+    """Yield ``(row0, row1, col0, col1, core)`` windows covering the image.
+
+    Windows are tiles grown by ``margin`` (clipped to the image); ``core``
+    is the tile itself, ``(row0, row1, col0, col1)``.
+    """
+    for top in range(0, height, tile_size):
+        for left in range(0, width, tile_size):
+            core = (top, min(top + tile_size, height), left, min(left + tile_size, width))
+            yield (max(top - margin, 0), min(core[1] + margin, height),
+                   max(left - margin, 0), min(core[3] + margin, width), core)
+
+
+# -- fitting ---------------------------------------------------------------------
+
+
+def fit_arcs(lines: np.ndarray, tolerance: float,
+             min_points: int = MIN_ARC_POINTS) -> tuple[np.ndarray, np.ndarray]:
+    """Fit a circle to every polyline at once.
+
+    Returns ``(circles, ok)``: ``(L, 3)`` centre and radius per line, and a
+    mask of the lines with at least ``min_points`` vertices whose vertices
+    and segment midpoints all lie within ``tolerance`` of their circle.
+    """
+    pts, owner = shapely.get_coordinates(lines, return_index=True)
+    k = len(lines)
+    n = np.bincount(owner, minlength=k).astype(np.float64)
+    circles = np.full((k, 3), np.nan)
+    ok = n >= min_points
+    if not ok.any():
+        return circles, ok
+    mean = np.column_stack([np.bincount(owner, pts[:, i], k) for i in (0, 1)]) / \
+        np.maximum(n, 1)[:, None]
+    u, v = (pts - mean[owner]).T
+
+    def total(values):
+        return np.bincount(owner, values, k)
+
+    suu, svv, suv = total(u * u), total(v * v), total(u * v)
+    rhs_u = 0.5 * (total(u ** 3) + total(u * v * v))
+    rhs_v = 0.5 * (total(v ** 3) + total(v * u * u))
+    det = suu * svv - suv * suv
+    ok &= np.abs(det) > 1e-9 * np.maximum(suu * svv, 1e-300)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        uc = (rhs_u * svv - rhs_v * suv) / det
+        vc = (rhs_v * suu - rhs_u * suv) / det
+        radius = np.sqrt(uc ** 2 + vc ** 2 + (suu + svv) / n)
+    circles[:, 0], circles[:, 1], circles[:, 2] = mean[:, 0] + uc, mean[:, 1] + vc, radius
+    # Midpoints catch polygons whose corners happen to lie on a circle.
+    inner = owner[1:] == owner[:-1]
+    mu, mv = (u[1:][inner] + u[:-1][inner]) / 2, (v[1:][inner] + v[:-1][inner]) / 2
+    u, v, at = np.r_[u, mu], np.r_[v, mv], np.r_[owner, owner[1:][inner]]
+    error = np.abs(np.hypot(u - uc[at], v - vc[at]) - radius[at])
+    worst = np.zeros(k)
+    np.maximum.at(worst, at, np.nan_to_num(error, nan=np.inf))
+    ok &= np.isfinite(radius) & (worst <= tolerance)
+    return circles, ok
+
+
+def _arc(line, circle, tolerance: float) -> tuple[Arc, np.ndarray]:
+    """The arc through ``line``'s ends around ``circle`` and its flattened points."""
+    cx, cy, r = circle
+    pts = shapely.get_coordinates(line)
+    angles = np.unwrap(np.arctan2(pts[:, 1] - cy, pts[:, 0] - cx))
+    start, sweep = angles[0], angles[-1] - angles[0]
+    closed = bool(shapely.is_closed(line)) or abs(sweep) >= 2 * math.pi
+    if closed:
+        start, sweep = 0.0, 2 * math.pi
+    elif sweep < 0:
+        start, sweep = angles[-1], -sweep
+    step = 2 * math.acos(max(1 - tolerance / r, -1.0)) if r > tolerance else math.pi / 2
+    count = max(int(math.ceil(sweep / step)), 2)
+    t = start + np.linspace(0.0, sweep, count + 1)
+    arc = Arc(float(cx), float(cy), float(r), math.degrees(start),
+              math.degrees(start + sweep))
+    return arc, np.column_stack([cx + r * np.cos(t), cy + r * np.sin(t)])
+
+
+def fit(lines: np.ndarray, tolerance: float, arc_tolerance: float,
+        min_length: float = 0.0) -> tuple[np.ndarray, list[Arc]]:
+    """Simplify traced polylines and replace circular ones by arcs.
+
+    Returns the output linestrings (arcs flattened within ``tolerance``)
+    and the fitted arcs.
+    """
+    if min_length > 0 and len(lines):
+        lines = lines[shapely.length(lines) >= min_length]
+    simple = shapely.simplify(lines, tolerance, preserve_topology=False)
+    curved = shapely.get_num_coordinates(simple) >= 4
+    circles, ok = fit_arcs(lines, arc_tolerance)
+    arcs = []
+    for i in np.flatnonzero(curved & ok):
+        arc, pts = _arc(lines[i], circles[i], tolerance)
+        arcs.append(arc)
+        simple[i] = shapely.linestrings(pts)
+    return simple, arcs
+
+
+# -- pipeline --------------------------------------------------------------------
+
+
+def _units_per_pixel(image: Image.Image) -> float:
+    dpi = image.info.get("dpi")
+    try:
+        return 25.4 / float(dpi[0]) if dpi and float(dpi[0]) > 1 else 1.0
+    except (TypeError, ValueError):
+        return 1.0
+
+
+def trace(
+    source: str | os.PathLike | bytes | IO[bytes] | Image.Image,
+    threshold: int | None = None,
+    invert: bool = False,
+    units_per_pixel: float | None = None,
+    tolerance: float = LINE_TOLERANCE,
+    arc_tolerance: float = ARC_TOLERANCE,
+    layer: str = "trace",
+    tile_size: int = TILE_SIZE,
+    margin: int = MARGIN,
+    workers: int | None = None,
+    mp_context: str = "spawn",
+) -> TraceResult:
+    """Trace the line work of a scanned drawing into vector geometry.
+
+    Args:
+        source: image file, bytes or an open Pillow image.
+        threshold: grey level separating ink from paper (Otsu by default).
+        invert: light ink on a dark background.
+        units_per_pixel: output scale; millimetres per pixel from the
+            image's dpi, or 1, by default.
+        tolerance: line simplification tolerance, in pixels.
+        arc_tolerance: largest distance of traced pixels from a fitted
+            arc, in pixels.
+        layer: layer of the traced entities.
+        tile_size: tile edge in pixels; memory per worker grows with its
+            square.  Must be a multiple of 8, as must ``margin``.
+        margin: overlap around each tile, in pixels.
+        workers: processes tracing tiles; ``os.cpu_count()`` by default,
+            and 1 traces in this process.
+        mp_context: multiprocessing start method of the workers.
+    """
+    if tile_size % 8 or margin % 8 or tile_size <= 0:
+        raise ValueError("tile_size and margin must be positive multiples of 8")
+    image, stripes = _stripe_source(source)
+    width, height = image.size
+    if units_per_pixel is None:
+        units_per_pixel = _units_per_pixel(image)
+    if threshold is None:
+        threshold = otsu(_histogram(stripes()))
+
+    def jobs():
+        rows = _Rows(_pack(stripes(), threshold, invert))
+        for row0, row1, col0, col1, core in tiles(height, width, tile_size, margin):
+            # A copy: the rows are reused once the next row of tiles comes in.
+            window = rows.get(row0, row1)[:, col0 // 8:(col1 + 7) // 8].copy()
+            yield window, col1 - col0, row0, col0, core
+
+    parts: list[np.ndarray] = []
+    windows = math.ceil(height / tile_size) * math.ceil(width / tile_size)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or windows == 1:
+        for job in jobs():
+            parts.append(_lines(*_trace_tile(*job)))
+            report_progress(TILE_SHARE * len(parts) / windows, "Tracing tiles")
+    else:
+        ctx = multiprocessing.get_context(mp_context)
+        with ProcessPoolExecutor(workers, mp_context=ctx) as pool:
+            pending = set()
+            for job in jobs():
+                # Keep a few tiles in flight so queued windows stay bounded.
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    parts.extend(_lines(*f.result()) for f in done)
+                    report_progress(TILE_SHARE * len(parts) / windows, "Tracing tiles")
+                pending.add(pool.submit(_trace_tile, *job))
+            parts.extend(_lines(*f.result()) for f in pending)
+
+    report_progress(TILE_SHARE, "Fitting lines and arcs")
+    lines = merge_segments(np.concatenate(parts)) if parts else np.empty(0, dtype=object)
+    lines, arcs = fit(lines, tolerance, arc_tolerance, MIN_LENGTH)
+    # Pixel centres to world units, y up.
+    matrix = np.array([[units_per_pixel, 0.0], [0.0, -units_per_pixel]])
+    shift = np.array([0.5 * units_per_pixel, (height - 0.5) * units_per_pixel])
+    lines = shapely.transform(lines, lambda xy: xy @ matrix + shift)
+    arcs = [_to_world(arc, units_per_pixel, height) for arc in arcs]
+    store = from_shapely(lines, layer) if len(lines) else GeometryStore.empty((layer,))
+    return TraceResult(store, arcs, int(threshold), units_per_pixel, (width, height))
+
+
+def _lines(coords: np.ndarray, owner: np.ndarray) -> np.ndarray:
+    if not len(coords):
+        return np.empty(0, dtype=object)
+    return shapely.linestrings(coords, indices=owner)
+
+
+def _to_world(arc: Arc, scale: float, height: int) -> Arc:
+    # Flipping y mirrors the arc, so it runs from -end to -start.
+    return Arc(
+        (arc.cx + 0.5) * scale, (height - 0.5 - arc.cy) * scale, arc.radius * scale,
+        -arc.end % 360.0 if not arc.closed else 0.0,
+        (-arc.end % 360.0) + (arc.end - arc.start) if not arc.closed else 360.0,
+    )
+
+
+def read_image(source: bytes | IO[bytes]) -> GeometryStore:
+    """Reader for scanned drawings: :func:`trace` with default settings."""
+    return trace(source).store
@@ -0,0 +1 @@
+"""Streamlit components for the CAD helper app."""
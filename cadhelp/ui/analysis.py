@@ -0,0 +1,60 @@
+"""Clearance check and high-resolution export panels, run as background jobs."""
+
+from __future__ import annotations
+
+import streamlit as st
+
+from .. import ops
+from ..drawing import Drawing
+from ..render import sniff_mimetype
+from .jobs import current_job, job_progress, submit_latest
+
+MAX_LISTED = 1000
+
+
+def clearance_panel(drawing: Drawing, key: str = "clearance") -> None:
+    """Check minimum clearance between entities; re-checks when inputs change."""
+    names = list(drawing.store.layer_names)
+    col_dist, col_layers, col_against = st.columns([1, 2, 2])
+    distance = col_dist.number_input("Minimum distance", min_value=0.0, value=0.0,
+                                     key=f"{key}-distance")
+    layers = col_layers.multiselect("Layers", names, key=f"{key}-layers")
+    against = col_against.multiselect("Against layers", names, key=f"{key}-against")
+    if distance <= 0:
+        st.caption("Set a minimum distance to check.")
+        return
+
+    params = {"min_distance": distance, "layers": layers, "against": against,
+              "limit": MAX_LISTED}
+    inputs = (drawing.key, drawing.revision, distance, tuple(layers), tuple(against))
+    job = submit_latest(key, inputs, "clearance", drawing.key,
+                        ops.run, "clearance", drawing.store, params)
+    found = job_progress(job, "Checking clearance", key)
+    if found is None:
+        return
+    more = "+" if found["truncated"] else ""
+    st.caption(f"{found['count']:,}{more} violation(s) closer than {distance:g}")
+    if found["violations"]:
+        st.dataframe(found["violations"], hide_index=True)
+
+
+def export_panel(drawing: Drawing, key: str = "export") -> None:
+    """Render the whole drawing to a large PNG or WebP for download."""
+    col_w, col_h, col_fmt, col_go = st.columns([2, 2, 1, 1])
+    width = col_w.number_input("Width", 1, 8192, 4096, step=256, key=f"{key}-width")
+    height = col_h.number_input("Height", 1, 8192, 4096, step=256, key=f"{key}-height")
+    fmt = col_fmt.selectbox("Format", list(ops.EXPORT_ENCODINGS), key=f"{key}-format")
+    params = {"width": int(width), "height": int(height), "format": fmt}
+    inputs = (drawing.key, drawing.revision, int(width), int(height), fmt)
+    if col_go.button("Export", key=f"{key}-go"):
+        submit_latest(key, inputs, "render", drawing.key,
+                      ops.run, "render", drawing.store, params)
+    job = current_job(key)
+    if job is None:
+        return
+    data = job_progress(job, "Exporting", key)
+    if data is not None:
+        mimetype = sniff_mimetype(data)
+        suffix = mimetype.split("/")[1]
+        st.download_button(f"Download {suffix.upper()}", data, f"{drawing.name}.{suffix}",
+                           mimetype, key=f"{key}-download")
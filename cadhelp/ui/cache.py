@@ -0,0 +1,244 @@
+"""Streamlit caches for parsed drawings and everything derived from them.
+
+Streamlit re-runs the whole script on every widget interaction.  The
+functions here key their caches on content hashes (of the uploaded bytes,
+or of the parsed :class:`GeometryStore`) and pass the heavy objects as
+underscore-prefixed arguments, which Streamlit does not hash.  Heavy,
+immutable objects (drawings, spatial indexes) live in ``cache_resource``
+so reruns get the same instance without copying; small results (metrics,
+preview PNGs) live in ``cache_data``.  Keys of derived results include
+the drawing's revision, so edits to a :class:`cadhelp.document.Document`
+are never served stale.
+
+Streamlit's caches live in one server process.  Parsed uploads, metrics
+and previews of unedited drawings are also kept in the shared
+:class:`cadhelp.resultcache.ResultCache`, under the same keys the Flask
+API uses, so a file parsed or rendered by either (or by an earlier run
+of the app) is read back from disk instead of being recomputed.
+
+Every cached function records calls and misses in :data:`STATS`, which
+:func:`cache_dashboard` displays.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import IO
+
+import numpy as np
+import streamlit as st
+
+from ..drawing import Drawing
+from ..io import StreamingLoad, load_in_background
+from ..render import DEFAULT_STYLE, Style, encode, fit_bounds, render, thumbnail
+from ..resultcache import ResultCache, parse_key, shared_cache
+from ..spatial import SpatialIndex
+from ..trace import IMAGE_SUFFIXES, read_image
+from .jobs import forget, job_progress, submit_latest
+from .viewer import tile_renderer
+
+DRAWING_ENTRIES = 8
+DRAWING_TTL = 3600
+DERIVED_ENTRIES = 64
+DERIVED_TTL = 1800
+PROGRESS_INTERVAL = 0.3
+
+
+class CacheStats:
+    """Process-wide call/miss counters per cached function."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls: Counter[str] = Counter()
+        self.misses: Counter[str] = Counter()
+
+    def call(self, name: str) -> None:
+        with self._lock:
+            self.calls[name] += 1
+
+    def miss(self, name: str) -> None:
+        with self._lock:
+            self.misses[name] += 1
+
+    def rows(self) -> list[dict]:
+        with self._lock:
+            out = []
+            for name, calls in sorted(self.calls.items()):
+                misses = min(self.misses[name], calls)
+                out.append({
+                    "cache": name, "calls": calls, "hits": calls - misses,
+                    "misses": misses, "hit rate": (calls - misses) / calls if calls else 0.0,
+                })
+            return out
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls.clear()
+            self.misses.clear()
+
+
+STATS = CacheStats()
+
+
+def shared_results(drawing: Drawing) -> ResultCache | None:
+    """The cross-process result cache for ``drawing``, or ``None`` once edited.
+
+    Edited documents are private to their session, and hashing a large
+    store after every edit would cost more than the results it could find.
+    """
+    return shared_cache() if drawing.revision == 0 else None
+
+
+def content_hash(upload: IO[bytes]) -> str:
+    """Hash an in-memory upload without copying it."""
+    h = hashlib.blake2b(digest_size=16)
+    with upload.getbuffer() as view:
+        h.update(view)
+    return h.hexdigest()
+
+
+@st.cache_resource(max_entries=DRAWING_ENTRIES, ttl=DRAWING_TTL, show_spinner=False)
+def _start_parse(digest: str, name: str, _upload: IO[bytes]) -> StreamingLoad:
+    STATS.miss("parse")
+    _upload.seek(0)
+    return load_in_background(_upload, name)
+
+
+@st.cache_resource(max_entries=DRAWING_ENTRIES, ttl=DRAWING_TTL, show_spinner=False)
+def _finish_parse(digest: str, name: str, _loader: StreamingLoad) -> Drawing:
+    store = _loader.result()
+    shared_cache().put(parse_key(digest, name), store)
+    return Drawing(store, name)
+
+
+@st.cache_resource(max_entries=DRAWING_ENTRIES, ttl=DRAWING_TTL, show_spinner=False)
+def _parsed_elsewhere(digest: str, name: str) -> Drawing | None:
+    """The drawing another process already parsed from the same bytes."""
+    store = shared_cache().get(parse_key(digest, name))
+    return None if store is None else Drawing(store, name)
+
+
+@st.cache_resource(max_entries=DRAWING_ENTRIES, ttl=DRAWING_TTL, show_spinner=False)
+def _traced(digest: str, name: str, _store) -> Drawing:
+    STATS.miss("parse")
+    shared_cache().put(parse_key(digest, name), _store)
+    return Drawing(_store, name)
+
+
+def load_drawing(upload, progress: bool = True) -> Drawing:
+    """Parse an upload once per distinct content, across reruns and sessions.
+
+    On a cache miss the file is parsed on a background thread; with
+    ``progress`` set, entities parsed so far are previewed while the rest
+    of the file is still being read.  Scanned images are traced by a
+    background job instead (see :mod:`cadhelp.ui.jobs`): the script stops
+    here with a progress box until it finishes, and uploading something
+    else cancels it.
+    """
+    STATS.call("parse")
+    digest = content_hash(upload)
+    drawing = _parsed_elsewhere(digest, upload.name)
+    if drawing is not None:
+        return drawing
+    if Path(upload.name).suffix.lower() in IMAGE_SUFFIXES:
+        job = submit_latest("parse", digest, "trace", digest, read_image, upload.getvalue())
+        store = job_progress(job, f"Tracing {upload.name}", "parse")
+        if store is None:
+            st.stop()
+        return _traced(digest, upload.name, store)
+    forget("parse")
+    loader = _start_parse(digest, upload.name, upload)
+    if progress and not loader.done:
+        status = st.empty()
+        picture = st.empty()
+        while not loader.done:
+            snapshot = loader.snapshot()
+            status.caption(f"Parsing {upload.name}: {len(snapshot):,} entities so far…")
+            if len(snapshot):
+                picture.image(thumbnail(snapshot, (600, 400)))
+            time.sleep(PROGRESS_INTERVAL)
+        status.empty()
+        picture.empty()
+    if loader.error is not None:
+        _start_parse.clear()
+    return _finish_parse(digest, upload.name, loader)
+
+
+@st.cache_resource(max_entries=DRAWING_ENTRIES, ttl=DRAWING_TTL, show_spinner="Indexing…")
+def _index(key: str, _drawing: Drawing) -> SpatialIndex:
+    STATS.miss("index")
+    return _drawing.index
+
+
+def spatial_index(drawing: Drawing) -> SpatialIndex:
+    STATS.call("index")
+    return _index(drawing.key, drawing)
+
+
+@st.cache_data(max_entries=DERIVED_ENTRIES, ttl=DERIVED_TTL, show_spinner=False)
+def _metrics(key: str, revision: int, _drawing: Drawing) -> dict[str, np.ndarray]:
+    STATS.miss("metrics")
+    results = shared_results(_drawing)
+    if results is None or "metrics" in _drawing.__dict__:
+        return _drawing.metrics
+    metrics = results.get_or_compute(_drawing.digest, "metrics", None, lambda: _drawing.metrics)
+    _drawing.__dict__["metrics"] = metrics  # takeoffs reuse what came from disk
+    return metrics
+
+
+def entity_metrics(drawing: Drawing) -> dict[str, np.ndarray]:
+    """Per-entity area and length arrays."""
+    STATS.call("metrics")
+    return _metrics(drawing.key, drawing.revision, drawing)
+
+
+@st.cache_data(max_entries=DERIVED_ENTRIES, ttl=DERIVED_TTL, show_spinner=False)
+def _preview(key: str, revision: int, size: tuple[int, int], backend: str,
+             style_key: str, _drawing: Drawing, _style: Style) -> bytes:
+    STATS.miss("preview")
+
+    def draw() -> bytes:
+        bbox = fit_bounds(_drawing.extent, size)
+        store = _drawing.lod.at((bbox[2] - bbox[0]) / size[0])
+        return encode(render(store, size, bbox=bbox, style=_style, backend=backend), "preview")
+
+    results = shared_results(_drawing)
+    if results is None:
+        return draw()
+    params = {"size": list(size), "backend": backend, "style": style_key}
+    return results.get_or_compute(_drawing.digest, "preview", params, draw)
+
+
+def preview_png(drawing: Drawing, size: tuple[int, int] = (512, 512),
+                backend: str = "pillow", style: Style = DEFAULT_STYLE) -> bytes:
+    """Whole-drawing preview image as PNG bytes."""
+    STATS.call("preview")
+    return _preview(drawing.key, drawing.revision, tuple(size), backend, style.key(),
+                    drawing, style)
+
+
+def cache_dashboard() -> None:
+    """Show hit rates of the caches above and of the tile cache."""
+    rows = STATS.rows()
+    tiles = tile_renderer().cache.stats()
+    tile_calls = tiles["hits"] + tiles["disk_hits"] + tiles["misses"]
+    if tile_calls:
+        rows.append({
+            "cache": "tiles", "calls": tile_calls,
+            "hits": tiles["hits"] + tiles["disk_hits"], "misses": tiles["misses"],
+            "hit rate": (tiles["hits"] + tiles["disk_hits"]) / tile_calls,
+        })
+    if not rows:
+        st.caption("No cache activity yet.")
+        return
+    st.dataframe(rows, hide_index=True, column_config={
+        "hit rate": st.column_config.ProgressColumn("hit rate", min_value=0.0, max_value=1.0,
+                                                    format="percent"),
+    })
+    st.caption(f"Tile cache: {tiles['entries']} tiles, {tiles['bytes'] / 2**20:.1f} MiB")
+    if st.button("Reset counters", key="cache-dashboard-reset"):
+        STATS.reset()
@@ -0,0 +1,32 @@
+"""Debug panel: per-stage timings and counters of this Streamlit process."""
+
+from __future__ import annotations
+
+import streamlit as st
+
+from .. import instrument
+
+
+def metrics_panel(key: str = "metrics") -> None:
+    """Latency percentiles per stage, counters, and switches to reset or pause them."""
+    on = st.toggle("Record timings", value=instrument.enabled(), key=f"{key}-on")
+    if on != instrument.enabled():
+        instrument.enable(on)
+    snapshot = instrument.REGISTRY.snapshot()
+    if not snapshot["stages"] and not snapshot["counters"]:
+        st.caption("Nothing recorded yet.")
+        return
+    number = st.column_config.NumberColumn
+    st.dataframe(snapshot["stages"], hide_index=True, column_config={
+        "total_s": number("total (s)", format="%.2f"),
+        "mean_ms": number("mean (ms)", format="%.1f"),
+        "p50_ms": number("p50 (ms)", format="%.1f"),
+        "p95_ms": number("p95 (ms)", format="%.1f"),
+        "max_ms": number("max (ms)", format="%.1f"),
+    })
+    if snapshot["counters"]:
+        st.dataframe(snapshot["counters"], hide_index=True)
+    st.caption("Percentiles are estimated from histogram buckets.")
+    if st.button("Reset", key=f"{key}-reset"):
+        instrument.REGISTRY.reset()
+        st.rerun()
@@ -0,0 +1,81 @@
+"""Per-session editable document with undo/redo and voice-driven edits.
+
+Parsed drawings are cached and shared between sessions, so each session
+edits its own :class:`Document` over the shared store.  Every edit drops
+only the tiles under its dirty rectangle from the shared tile renderer.
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import streamlit as st
+
+from ..document import Document
+from ..drawing import Drawing
+from ..geometry import LINESTRING, POINT, POLYGON
+from ..render import TileRenderer
+from ..voice import Command
+from .viewer import tile_renderer
+
+CIRCLE_SEGMENTS = 64
+EDIT_LAYER = "voice"
+
+
+def session_document(drawing: Drawing, renderer: TileRenderer | None = None,
+                     key: str = "document") -> Document:
+    """This session's document for ``drawing``, created on first use."""
+    state = st.session_state
+    doc = state.get(key)
+    if doc is None or state.get(f"{key}-source") != drawing.key:
+        renderer = renderer or tile_renderer()
+        doc = Document.from_drawing(drawing)
+        doc.subscribe(lambda d, edit: renderer.invalidate(d, edit.dirty))
+        state[key], state[f"{key}-source"] = doc, drawing.key
+    return doc
+
+
+def apply_command(doc: Document, command: Command) -> str:
+    """Carry out a voice command on ``doc``; returns what was done."""
+    a = command.args
+    if command.name == "undo":
+        return "Undone" if doc.undo() else "Nothing to undo"
+    if command.name == "redo":
+        return "Redone" if doc.redo() else "Nothing to redo"
+    if command.name == "draw_point":
+        doc.add(POINT, [(a["x"], a["y"])], EDIT_LAYER, "draw point")
+    elif command.name == "draw_line":
+        doc.add(LINESTRING, [(a["x1"], a["y1"]), (a["x2"], a["y2"])], EDIT_LAYER, "draw line")
+    elif command.name == "draw_rectangle":
+        x1, y1, x2, y2 = a["x1"], a["y1"], a["x2"], a["y2"]
+        doc.add(POLYGON, [(x1, y1), (x2, y1), (x2, y2), (x1, y2)], EDIT_LAYER,
+                "draw rectangle")
+    elif command.name == "draw_circle":
+        t = np.linspace(0.0, 2 * math.pi, CIRCLE_SEGMENTS, endpoint=False)
+        ring = np.column_stack([a["x"] + a["radius"] * np.cos(t),
+                                a["y"] + a["radius"] * np.sin(t)])
+        doc.add(POLYGON, ring, EDIT_LAYER, "draw circle")
+    else:
+        return f"“{command.text}” is not an editing command"
+    return f"{command.name.replace('_', ' ').capitalize()}: {command.text}"
+
+
+def edit_toolbar(doc: Document, commands: list | None = None,
+                 key: str = "document") -> None:
+    """Undo/redo buttons; applies and clears pending voice command events."""
+    if commands:
+        for event in commands:
+            try:
+                st.toast(apply_command(doc, event.command))
+            except (KeyError, ValueError) as exc:
+                st.toast(f"Could not apply “{event.text}”: {exc}")
+        commands.clear()
+    col_undo, col_redo, col_info = st.columns([1, 1, 4])
+    if col_undo.button("Undo", disabled=not doc.can_undo, key=f"{key}-undo"):
+        doc.undo()
+        st.rerun()
+    if col_redo.button("Redo", disabled=not doc.can_redo, key=f"{key}-redo"):
+        doc.redo()
+        st.rerun()
+    col_info.caption(f"{len(doc.store):,} entities · revision {doc.revision}")
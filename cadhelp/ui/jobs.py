@@ -0,0 +1,100 @@
+"""Background jobs for Streamlit: submit, watch progress, cancel when stale.
+
+Long operations run in the process-wide :class:`JobManager`'s worker
+processes instead of the script thread.  :func:`submit_latest` keeps one
+job per session and slot and, when the inputs change, cancels the old
+job (killing its worker, so its CPU is free at once) before submitting
+the new one.  :func:`job_progress` shows a running job in ``st.status``
+with a progress bar from a fragment that re-runs on a timer by itself,
+so polling never re-runs or blocks the rest of the page; the whole app
+re-runs once when the job finishes.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Hashable
+
+import streamlit as st
+
+from ..jobs import CANCELLED, DONE, FAILED, QUEUED, RUNNING, Job, JobManager
+
+POLL_INTERVAL = 0.5
+
+
+@st.cache_resource
+def job_manager() -> JobManager:
+    """Process-wide job queue; its workers outlive script reruns and sessions."""
+    return JobManager()
+
+
+def submit_latest(slot: str, inputs: Hashable, op: str, drawing: str,
+                  func: Callable[..., Any], *args) -> Job:
+    """This session's job for ``slot``, resubmitted when ``inputs`` change.
+
+    A job for the same ``inputs`` is reused, whatever its state.  A job for
+    different inputs is cancelled, running or not, and replaced.
+
+    Args:
+        slot: name of the job within the session (e.g. ``"clearance"``).
+        inputs: everything the result depends on.
+        op: label shown in the status box.
+        drawing: key of the drawing the job works on.
+        func: picklable callable run as ``func(*args)`` in a worker.
+    """
+    state = st.session_state
+    name = f"job-{slot}"
+    current = state.get(name)
+    if current is not None:
+        previous, job = current
+        if previous == inputs:
+            return job
+        job_manager().cancel(job.id)
+    job = job_manager().submit(op, drawing, func, *args)
+    state[name] = (inputs, job)
+    return job
+
+
+def current_job(slot: str) -> Job | None:
+    """This session's latest job for ``slot``, if any."""
+    current = st.session_state.get(f"job-{slot}")
+    return None if current is None else current[1]
+
+
+def forget(slot: str) -> None:
+    """Cancel and drop this session's job for ``slot``, if any."""
+    current = st.session_state.pop(f"job-{slot}", None)
+    if current is not None:
+        job_manager().cancel(current[1].id)
+
+
+def job_progress(job: Job, label: str, key: str) -> Any | None:
+    """Show ``job`` and return its result once done, ``None`` until then.
+
+    While the job is queued or running, a fragment polls it every
+    :data:`POLL_INTERVAL` seconds with a progress bar and a cancel button.
+    Failures are shown as errors.
+    """
+    status = job.status
+    if status == DONE:
+        return job.future.result()
+    if status == FAILED:
+        st.error(f"{label} failed: {job.future.exception()}")
+        return None
+    if status == CANCELLED:
+        st.caption(f"{label} cancelled.")
+        return None
+
+    @st.fragment(run_every=POLL_INTERVAL)
+    def poll() -> None:
+        now = job.status
+        if now not in (QUEUED, RUNNING):
+            st.rerun(scope="app")
+        with st.status(f"{label}…" if now == RUNNING else f"{label} (queued)",
+                       state="running"):
+            st.progress(job.progress or 0.0, text=job.message or None)
+        if st.button("Cancel", key=f"{key}-cancel"):
+            job_manager().cancel(job.id)
+            st.rerun(scope="app")
+
+    poll()
+    return None
@@ -0,0 +1,38 @@
+"""Quantity takeoff panel for Streamlit."""
+
+from __future__ import annotations
+
+import streamlit as st
+
+from ..drawing import Drawing
+from ..takeoff import GROUP_BY, UNASSIGNED, cached_takeoff
+from .cache import shared_results
+
+
+def takeoff_panel(drawing: Drawing, key: str = "takeoff") -> None:
+    """Group-by controls, a material table, the report and CSV/JSON downloads."""
+    by = st.multiselect("Group by", GROUP_BY, default=["layer"], key=f"{key}-by")
+    materials = {}
+    if "material" in by:
+        table = st.data_editor(
+            [{"layer": name, "material": UNASSIGNED} for name in drawing.store.layer_names],
+            disabled=["layer"], hide_index=True, key=f"{key}-materials",
+        )
+        materials = {row["layer"]: row["material"] for row in table if row["material"]}
+    if not by:
+        st.caption("Pick at least one column to group by.")
+        return
+
+    report = cached_takeoff(drawing, by, materials=materials, cache=shared_results(drawing))
+    st.dataframe(report.rows(), hide_index=True, column_config={
+        "area": st.column_config.NumberColumn(format="%.2f"),
+        "length": st.column_config.NumberColumn(format="%.2f"),
+    })
+    total = report.total
+    st.caption(f"{total['count']:,} entities · area {total['area']:,.2f} · "
+               f"length {total['length']:,.2f}")
+    col_csv, col_json = st.columns(2)
+    col_csv.download_button("CSV", report.to_csv(), f"{drawing.name}-takeoff.csv",
+                            "text/csv", key=f"{key}-csv")
+    col_json.download_button("JSON", report.to_json(indent=2), f"{drawing.name}-takeoff.json",
+                             "application/json", key=f"{key}-json")
@@ -0,0 +1,39 @@
+"""Tile-backed drawing viewer component for Streamlit."""
+
+from __future__ import annotations
+
+import streamlit as st
+
+from ..drawing import Drawing
+from ..render import TileCache, TileRenderer
+
+
+@st.cache_resource
+def tile_renderer(max_bytes: int = 256 << 20, disk_dir: str | None = None) -> TileRenderer:
+    """Process-wide renderer, so tiles survive script reruns and sessions."""
+    return TileRenderer(TileCache(max_bytes, disk_dir))
+
+
+def tile_viewer(drawing: Drawing, renderer: TileRenderer | None = None,
+                size: tuple[int, int] = (900, 600), key: str = "viewer") -> None:
+    """Show ``drawing`` with zoom and pan controls, composed from cached tiles."""
+    renderer = renderer or tile_renderer()
+    minx, miny, maxx, maxy = drawing.extent
+    cx0, cy0 = (minx + maxx) / 2, (miny + maxy) / 2
+    full = max(maxx - minx, maxy - miny) or 1.0
+
+    col_zoom, col_x, col_y = st.columns(3)
+    zoom = col_zoom.slider("Zoom", 0.0, float(renderer.max_zoom), 0.0, 0.25, key=f"{key}-z")
+    cx = col_x.slider("Pan X", minx, maxx, cx0, key=f"{key}-x") if maxx > minx else cx0
+    cy = col_y.slider("Pan Y", miny, maxy, cy0, key=f"{key}-y") if maxy > miny else cy0
+
+    width, height = size
+    half_w = full / 2 ** zoom / 2
+    half_h = half_w * height / width
+    bbox = (cx - half_w, cy - half_h, cx + half_w, cy + half_h)
+    st.image(renderer.render_view(drawing, bbox, size))
+    stats = renderer.cache.stats()
+    st.caption(
+        f"{len(drawing.store):,} entities · tile cache {stats['entries']} tiles, "
+        f"{stats['bytes'] / 2**20:.1f} MiB, {stats['hits']} hits / {stats['misses']} misses"
+    )
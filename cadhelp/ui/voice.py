@@ -0,0 +1,85 @@
+"""Voice command panel for Streamlit.
+
+Recordings from ``st.audio_input`` are handed to a process-wide
+:class:`VoicePipeline` and the script moves on immediately.  Results are
+picked up by a fragment that re-runs on a timer by itself, so polling for
+voice events never re-runs (or delays) the drawing views around it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+
+import streamlit as st
+
+from ..voice import (
+    COMMAND,
+    DEFAULT_BACKEND,
+    ERROR,
+    UNRECOGNIZED,
+    VoiceEvent,
+    VoicePipeline,
+    get_recognizer,
+)
+
+POLL_INTERVAL = 1.0
+SHOWN_EVENTS = 5
+
+
+@st.cache_resource
+def voice_pipeline(backend: str = DEFAULT_BACKEND) -> VoicePipeline:
+    """Process-wide pipeline; its worker threads and model outlive script reruns."""
+    return VoicePipeline(get_recognizer(backend))
+
+
+def _describe(event: VoiceEvent) -> str:
+    if event.kind == COMMAND:
+        return f"**{event.command.name}** — “{event.text}”"
+    if event.kind == UNRECOGNIZED:
+        return "_(not understood)_"
+    if event.kind == ERROR:
+        return f":red[{event.error}]"
+    return f"“{event.text}”"
+
+
+def voice_panel(pipeline: VoicePipeline | None = None, key: str = "voice") -> list[VoiceEvent]:
+    """Record voice commands and list what was recognized.
+
+    Command events accumulate in ``st.session_state[f"{key}-commands"]``,
+    which is returned; the caller applies and clears it.  A new command
+    re-runs the app once so it takes effect right away.
+    """
+    pipeline = pipeline or voice_pipeline()
+    state = st.session_state
+    state.setdefault(f"{key}-seq", 0)
+    state.setdefault(f"{key}-commands", [])
+
+    recording = st.audio_input("Voice command", key=f"{key}-input")
+    if recording is not None:
+        digest = hashlib.blake2b(recording.getvalue(), digest_size=16).hexdigest()
+        if state.get(f"{key}-last") != digest:
+            state[f"{key}-last"] = digest
+            try:
+                pipeline.submit_wav(recording.getvalue())
+            except ValueError as exc:
+                st.error(str(exc))
+
+    @st.fragment(run_every=POLL_INTERVAL)
+    def events() -> None:
+        new = pipeline.events(state[f"{key}-seq"])
+        if new:
+            state[f"{key}-seq"] = new[-1].seq
+            commands = [e for e in new if e.kind == COMMAND]
+            if commands:
+                state[f"{key}-commands"].extend(commands)
+                st.rerun(scope="app")
+        recent = pipeline.events()[-SHOWN_EVENTS:]
+        for event in reversed(recent):
+            st.markdown(_describe(event))
+        if pipeline.pending:
+            st.caption(f"{pipeline.pending} recording(s) being transcribed…")
+        if recent and recent[-1].recognition:
+            st.caption(f"Recognized in {recent[-1].recognition * 1000:.0f} ms")
+
+    events()
+    return state[f"{key}-commands"]
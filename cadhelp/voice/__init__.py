@@ -0,0 +1,51 @@
+"""Voice commands: background speech recognition and command parsing.
+
+:mod:`.recognizers` holds the speech backends (offline Vosk and
+PocketSphinx with models loaded once per process); :mod:`.pipeline`
+runs them on worker threads and publishes the results as events, and
+:mod:`.grammar` turns transcripts into commands.
+"""
+
+from .grammar import COMMANDS, DEFAULT_GRAMMAR, Command, CommandGrammar, parse_numbers
+from .pipeline import (
+    COMMAND,
+    ERROR,
+    TRANSCRIPT,
+    UNRECOGNIZED,
+    VoiceEvent,
+    VoicePipeline,
+    audio_from_wav,
+)
+from .recognizers import (
+    DEFAULT_BACKEND,
+    RECOGNIZERS,
+    GoogleRecognizer,
+    LatencyStats,
+    Recognizer,
+    SphinxRecognizer,
+    VoskRecognizer,
+    get_recognizer,
+)
+
+__all__ = [
+    "COMMAND",
+    "COMMANDS",
+    "Command",
+    "CommandGrammar",
+    "DEFAULT_BACKEND",
+    "DEFAULT_GRAMMAR",
+    "ERROR",
+    "GoogleRecognizer",
+    "LatencyStats",
+    "RECOGNIZERS",
+    "Recognizer",
+    "SphinxRecognizer",
+    "TRANSCRIPT",
+    "UNRECOGNIZED",
+    "VoiceEvent",
+    "VoicePipeline",
+    "VoskRecognizer",
+    "audio_from_wav",
+    "get_recognizer",
+    "parse_numbers",
+]
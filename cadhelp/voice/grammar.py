@@ -0,0 +1,257 @@
+"""Grammar-constrained parsing of voice transcripts into commands.
+
+Commands are declared as phrase templates::
+
+    "draw|add circle radius {radius:number} [at] {x:number} {y:number}"
+
+Plain words must match literally; ``a|b`` accepts either word, ``[w]``
+(or ``[a|b]``) may be left out, and ``{name:type}`` captures a slot.
+Slot types are ``number`` (digits or number words such as "two hundred
+and five" or "minus three point five"), ``word`` (any single word) and
+an inline choice such as ``{side:left|right}``.
+
+:class:`CommandGrammar` compiles all templates into a single trie keyed
+by word, so matching costs one dictionary lookup per transcript word no
+matter how many commands the grammar holds; slot edges are only tried
+where a template has a slot.  Where several parses exist (``ten twenty``
+could be one number or two) the longest number that still lets the rest
+of the phrase match wins.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Iterable, Mapping, NamedTuple
+
+UNITS = {
+    w: i for i, w in enumerate(
+        "zero one two three four five six seven eight nine ten eleven twelve thirteen "
+        "fourteen fifteen sixteen seventeen eighteen nineteen".split()
+    )
+}
+TENS = {
+    w: 10 * i for i, w in enumerate(
+        "twenty thirty forty fifty sixty seventy eighty ninety".split(), start=2
+    )
+}
+SCALES = {"thousand": 1_000, "million": 1_000_000}
+NEGATIVE = {"minus", "negative"}
+FILLER = {"the", "please", "um", "uh"}  # dropped before matching
+
+_TOKEN = re.compile(r"[-+]?\d+(?:\.\d+)?|[a-z]+(?:'[a-z]+)?")
+_WORD_HYPHEN = re.compile(r"(?<=[a-z])-(?=[a-z])")
+_SLOT = re.compile(r"\{(\w+)(?::([^}]*))?\}")
+
+
+class Command(NamedTuple):
+    name: str
+    args: dict[str, Any]
+    text: str
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-cased words and digit strings; punctuation and filler words are dropped.
+
+    Hyphenated words are split ("twenty-five"); a leading minus on digits is kept.
+    """
+    text = _WORD_HYPHEN.sub(" ", text.lower()).replace(",", "")
+    return [t for t in _TOKEN.findall(text) if t not in FILLER]
+
+
+def parse_numbers(tokens: list[str], start: int) -> list[tuple[float, int]]:
+    """Every number that can be read from ``tokens[start:]``.
+
+    Returns ``(value, end)`` pairs, longest reading first.  Digit strings
+    are numbers on their own; number words combine the way they are
+    spoken ("twenty five", "three hundred and two", "one point five"), so
+    "ten twenty" reads as 10 (then 20), never 30.
+    """
+    out: list[tuple[float, int]] = []
+    i, n = start, len(tokens)
+    sign = 1.0
+    if i < n and tokens[i] in NEGATIVE:
+        sign, i = -1.0, i + 1
+    if i < n and tokens[i][-1].isdigit():
+        return [(sign * float(tokens[i]), i + 1)]
+
+    total = group = 0
+    scale = float("inf")  # the next scale word must be smaller than the last
+    last = None  # previous word: unit, teen, tens, hundred, scale or and
+    while i < n:
+        w = tokens[i]
+        if w in UNITS:
+            v = UNITS[w]
+            if last in ("unit", "teen") or (last == "tens" and v >= 10) or (v == 0 and last):
+                break
+            group += v
+            last = "teen" if v >= 10 else "unit"
+        elif w in TENS:
+            if last in ("unit", "teen", "tens"):
+                break
+            group += TENS[w]
+            last = "tens"
+        elif w == "hundred":
+            if last not in ("unit", "teen") or group >= 100:
+                break
+            group *= 100
+            last = "hundred"
+        elif w in SCALES:
+            if not group or last == "and" or SCALES[w] >= scale:
+                break
+            total += group * SCALES[w]
+            group, scale, last = 0, SCALES[w], "scale"
+        elif w == "and" and last in ("hundred", "scale"):
+            last = "and"
+            i += 1
+            continue  # only counts if another number word follows
+        else:
+            break
+        i += 1
+        out.append((sign * (total + group), i))
+
+    if out and out[-1][1] == i and i < n and tokens[i] == "point":
+        # Decimals are read digit by digit: "three point one four".
+        whole, j, digits = abs(out[-1][0]), i + 1, ""
+        while j < n and tokens[j] in UNITS and UNITS[tokens[j]] < 10:
+            digits += str(UNITS[tokens[j]])
+            j += 1
+            out.append((sign * float(f"{whole:.0f}.{digits}"), j))
+    out.reverse()
+    return out
+
+
+def _match_slot(kind: str, tokens: list[str], i: int) -> list[tuple[object, int]]:
+    if kind == "number":
+        return [(int(v) if float(v).is_integer() else v, end)
+                for v, end in parse_numbers(tokens, i)]
+    if i >= len(tokens):
+        return []
+    if kind == "word" or tokens[i] in kind.split("|"):
+        return [(tokens[i], i + 1)]
+    return []
+
+
+class _Node:
+    __slots__ = ("words", "slots", "command")
+
+    def __init__(self):
+        self.words: dict[str, _Node] = {}
+        self.slots: dict[str, _Node] = {}  # slot type -> child
+        self.command: tuple[str, tuple[str, ...]] | None = None
+
+
+class CommandGrammar:
+    """A set of command templates compiled into one word trie.
+
+    Instances are callable, so they can serve as the ``parse`` function
+    of :class:`cadhelp.voice.VoicePipeline`.
+
+    Args:
+        commands: command name -> template, or several alternative templates.
+    """
+
+    def __init__(self, commands: Mapping[str, str | Iterable[str]]):
+        self.root = _Node()
+        self.commands = {}
+        for name, templates in commands.items():
+            templates = [templates] if isinstance(templates, str) else list(templates)
+            self.commands[name] = templates
+            for template in templates:
+                self._add(name, template)
+
+    def __len__(self) -> int:
+        return len(self.commands)
+
+    def _add(self, name: str, template: str) -> None:
+        nodes = [self.root]
+        slots: list[str] = []
+        for part in template.split():
+            slot = _SLOT.fullmatch(part)
+            if slot:
+                slot_name, kind = slot.group(1), (slot.group(2) or "word")
+                if kind not in ("number", "word") and not re.fullmatch(r"[a-z|]+", kind):
+                    raise ValueError(f"bad slot type {kind!r} in {template!r}")
+                slots.append(slot_name)
+                nodes = [node.slots.setdefault(kind, _Node()) for node in nodes]
+                continue
+            optional = part.startswith("[") and part.endswith("]")
+            words = part.strip("[]").lower().split("|")
+            reached = [node.words.setdefault(w, _Node()) for node in nodes for w in words]
+            nodes = list({id(n): n for n in reached + (nodes if optional else [])}.values())
+        for node in nodes:
+            if node.command is not None and node.command[0] != name:
+                raise ValueError(
+                    f"template {template!r} of {name!r} is ambiguous with {node.command[0]!r}"
+                )
+            node.command = (name, tuple(slots))
+
+    def _match(self, node: _Node, tokens: list[str], i: int, values: list):
+        if i == len(tokens):
+            return (node.command, values) if node.command is not None else None
+        child = node.words.get(tokens[i])
+        if child is not None:
+            found = self._match(child, tokens, i + 1, values)
+            if found is not None:
+                return found
+        for kind, child in node.slots.items():
+            for value, end in _match_slot(kind, tokens, i):
+                found = self._match(child, tokens, end, values + [value])
+                if found is not None:
+                    return found
+        return None
+
+    def parse(self, text: str) -> Command | None:
+        """The command ``text`` spells out in full, or ``None``."""
+        tokens = tokenize(text)
+        if not tokens:
+            return None
+        found = self._match(self.root, tokens, 0, [])
+        if found is None:
+            return None
+        (name, slots), values = found
+        return Command(name, dict(zip(slots, values)), text)
+
+    __call__ = parse
+
+    def vocabulary(self) -> set[str]:
+        """Every literal word and number word the grammar can match."""
+        words = set(UNITS) | set(TENS) | set(SCALES) | NEGATIVE | {"hundred", "and", "point"}
+        for templates in self.commands.values():
+            for template in templates:
+                for part in template.split():
+                    slot = _SLOT.fullmatch(part)
+                    kind = slot.group(2) or "word" if slot else part.strip("[]")
+                    if kind not in ("number", "word"):
+                        words.update(kind.lower().split("|"))
+        return words
+
+
+COMMANDS: dict[str, str | list[str]] = {
+    "draw_point": "draw|add point [at] {x:number} {y:number}",
+    "draw_line": "draw|add line [from] {x1:number} {y1:number} to {x2:number} {y2:number}",
+    "draw_rectangle": (
+        "draw|add rectangle|rect|box [from] {x1:number} {y1:number} to {x2:number} {y2:number}"
+    ),
+    "draw_circle": [
+        "draw|add circle radius {radius:number} [at] {x:number} {y:number}",
+        "draw|add circle [at] {x:number} {y:number} radius {radius:number}",
+    ],
+    "move": "move [selection|selected] [by] {dx:number} {dy:number}",
+    "rotate": "rotate [selection|selected] [by] {angle:number} [degrees]",
+    "scale": "scale [selection|selected] [by] {factor:number}",
+    "offset": "offset [selection|selected] [by] {distance:number}",
+    "delete": "delete|remove|erase [selection|selected]",
+    "select_layer": "select layer {layer:word}",
+    "show_layer": "show layer {layer:word}",
+    "hide_layer": "hide layer {layer:word}",
+    "zoom_in": "zoom in",
+    "zoom_out": "zoom out",
+    "zoom_extents": ["zoom [to] extents|fit|all", "fit [to] screen|view|drawing"],
+    "zoom_to": "zoom [to] [level] {level:number}",
+    "pan": "pan|move {direction:left|right|up|down} [by] {distance:number}",
+    "undo": "undo",
+    "redo": "redo",
+    "takeoff": ["takeoff|measure", "takeoff|measure [layer] {layer:word}"],
+}
+
+DEFAULT_GRAMMAR = CommandGrammar(COMMANDS)
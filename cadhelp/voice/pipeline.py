@@ -0,0 +1,222 @@
+"""Speech recognition off the interactive threads.
+
+``Recognizer.recognize_*`` calls block for seconds, so they never run on
+a Streamlit script thread or a Flask request thread.  Audio arrives as
+short utterances (one :class:`speech_recognition.AudioData` per phrase)
+and is handed to :meth:`VoicePipeline.submit`, which only enqueues it.
+A small pool of worker threads transcribes and parses utterances and
+publishes the outcome as :class:`VoiceEvent` objects.
+
+Both queues are bounded.  When recognition falls behind, the *oldest*
+pending utterance is dropped: a stale voice command is worse than a
+missed one.  Events are kept in a ring buffer with sequence numbers, so
+any number of pollers (a Streamlit fragment, HTTP clients) can read them
+with :meth:`VoicePipeline.events` without consuming each other's
+events; callbacks registered with :meth:`VoicePipeline.subscribe` are
+called on the worker thread.
+"""
+
+from __future__ import annotations
+
+import io
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, NamedTuple
+
+import speech_recognition as sr
+
+from .grammar import DEFAULT_GRAMMAR, Command
+from .recognizers import get_recognizer
+
+MAX_PENDING = 8  # utterances waiting for a worker
+MAX_EVENTS = 256  # events kept for pollers
+PHRASE_SECONDS = 4.0  # longest utterance captured from a microphone
+
+# Event kinds.
+COMMAND = "command"  # transcript parsed into a command
+TRANSCRIPT = "transcript"  # transcript that is not a known command
+UNRECOGNIZED = "unrecognized"  # no speech could be made out
+ERROR = "error"  # recognizer failure (missing model, service down, ...)
+
+
+class VoiceEvent(NamedTuple):
+    seq: int
+    kind: str
+    text: str = ""
+    command: Command | None = None
+    error: str = ""
+    latency: float = 0.0  # seconds from submit() to the event
+    recognition: float = 0.0  # seconds of that spent in the recognizer
+
+    def to_dict(self) -> dict:
+        d = self._asdict()
+        if self.command is not None:
+            d["command"] = self.command._asdict()
+        return d
+
+
+Recognize = Callable[[sr.AudioData], str]
+Parse = Callable[[str], "Command | None"]
+
+
+def audio_from_wav(data: bytes) -> sr.AudioData:
+    """Decode a WAV/AIFF/FLAC recording, e.g. from a browser, into audio data."""
+    try:
+        with sr.AudioFile(io.BytesIO(data)) as source:
+            return sr.Recognizer().record(source)
+    except ValueError as exc:
+        raise ValueError(f"unreadable audio: {exc}") from None
+
+
+class VoicePipeline:
+    """Bounded queue of utterances transcribed by background threads.
+
+    Worker threads are started on the first :meth:`submit`.
+
+    Args:
+        recognize: audio -> transcript; may raise
+            ``speech_recognition.UnknownValueError`` for silence or noise.
+            Defaults to the shared offline recognizer from
+            :func:`cadhelp.voice.get_recognizer`.
+        parse: transcript -> :class:`Command`, or ``None`` if it is not one;
+            by default the built-in :data:`cadhelp.voice.grammar.COMMANDS`.
+        workers: number of recognition threads.
+        max_pending: utterances that may wait for a worker.
+        max_events: events kept for :meth:`events`.
+    """
+
+    def __init__(self, recognize: Recognize | None = None, parse: Parse = DEFAULT_GRAMMAR,
+                 workers: int = 1, max_pending: int = MAX_PENDING,
+                 max_events: int = MAX_EVENTS):
+        if workers < 1 or max_pending < 1:
+            raise ValueError("workers and max_pending must be positive")
+        self.recognize = recognize or get_recognizer()
+        self.parse = parse
+        self.workers = workers
+        self.dropped = 0
+        self._pending: queue.Queue = queue.Queue(max_pending)
+        self._events: deque[VoiceEvent] = deque(maxlen=max_events)
+        self._seq = itertools.count(1)
+        self._subscribers: list[Callable[[VoiceEvent], None]] = []
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+
+    # -- input ---------------------------------------------------------------
+
+    def submit(self, audio: sr.AudioData) -> None:
+        """Queue an utterance; never blocks.  Evicts the oldest if full."""
+        self._start()
+        item = (audio, time.perf_counter())
+        while True:
+            try:
+                self._pending.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._pending.get_nowait()
+                    self._pending.task_done()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def submit_wav(self, data: bytes) -> None:
+        self.submit(audio_from_wav(data))
+
+    def listen(self, device_index: int | None = None,
+               phrase_seconds: float = PHRASE_SECONDS) -> Callable[..., None]:
+        """Capture microphone phrases in the background; returns a stop function.
+
+        Needs PyAudio.  Capture runs on its own thread and only enqueues, so
+        a slow recognizer never holds up the microphone.
+        """
+        recognizer = sr.Recognizer()
+        mic = sr.Microphone(device_index=device_index)
+        with mic as source:
+            recognizer.adjust_for_ambient_noise(source, duration=0.5)
+        return recognizer.listen_in_background(
+            mic, lambda _, audio: self.submit(audio), phrase_time_limit=phrase_seconds
+        )
+
+    @property
+    def pending(self) -> int:
+        return self._pending.qsize()
+
+    # -- output --------------------------------------------------------------
+
+    def subscribe(self, callback: Callable[[VoiceEvent], None]) -> None:
+        """Call ``callback(event)`` on the worker thread for every new event."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def events(self, after: int = 0) -> list[VoiceEvent]:
+        """Buffered events with ``seq > after``, oldest first."""
+        with self._lock:
+            return [e for e in self._events if e.seq > after]
+
+    def wait(self, after: int = 0, timeout: float | None = None) -> list[VoiceEvent]:
+        """Like :meth:`events`, but block until there is at least one."""
+        with self._changed:
+            self._changed.wait_for(
+                lambda: self._events and self._events[-1].seq > after, timeout
+            )
+        return self.events(after)
+
+    def join(self) -> None:
+        """Block until every queued utterance has been processed."""
+        self._pending.join()
+
+    # -- workers -------------------------------------------------------------
+
+    def _start(self) -> None:
+        if self._threads:
+            return
+        with self._lock:
+            if not self._threads:
+                self._threads = [
+                    threading.Thread(target=self._work, name=f"voice-{i}", daemon=True)
+                    for i in range(self.workers)
+                ]
+                for t in self._threads:
+                    t.start()
+
+    def _work(self) -> None:
+        while True:
+            audio, submitted = self._pending.get()
+            try:
+                self._emit(self._process(audio), submitted)
+            finally:
+                self._pending.task_done()
+
+    def _process(self, audio: sr.AudioData) -> dict:
+        start = time.perf_counter()
+        try:
+            text = self.recognize(audio)
+        except sr.UnknownValueError:
+            return {"kind": UNRECOGNIZED, "recognition": time.perf_counter() - start}
+        except Exception as exc:  # surfaced as an event, the worker keeps going
+            return {"kind": ERROR, "error": f"{type(exc).__name__}: {exc}"}
+        elapsed = time.perf_counter() - start
+        text = (text or "").strip()
+        if not text:
+            return {"kind": UNRECOGNIZED, "recognition": elapsed}
+        command = self.parse(text)
+        if command is None:
+            return {"kind": TRANSCRIPT, "text": text, "recognition": elapsed}
+        return {"kind": COMMAND, "text": text, "command": command, "recognition": elapsed}
+
+    def _emit(self, fields: dict, submitted: float) -> None:
+        with self._changed:
+            event = VoiceEvent(next(self._seq), latency=time.perf_counter() - submitted,
+                               **fields)
+            self._events.append(event)
+            subscribers = list(self._subscribers)
+            self._changed.notify_all()
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception:  # a broken subscriber must not stop recognition
+                pass
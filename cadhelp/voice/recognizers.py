@@ -0,0 +1,281 @@
+"""Speech recognition backends with models loaded once per process.
+
+SpeechRecognition's own ``recognize_vosk``/``recognize_sphinx`` build a
+new model or decoder on every call, which costs seconds per command.
+The backends here load their model once (:meth:`Recognizer.load`, or
+:meth:`Recognizer.warm` to do it on a background thread at start-up)
+and reuse it for every utterance.  :func:`get_recognizer` hands out one
+shared instance per backend and options, so every pipeline, request and
+Streamlit session in a process uses the same warm model.
+
+Offline backends:
+
+* ``vosk``: a Vosk (Kaldi) model directory, e.g. ``vosk-model-small-en-us``.
+  The model is shared and thread-safe; each utterance gets its own
+  lightweight ``KaldiRecognizer``.
+* ``sphinx``: a PocketSphinx 5 decoder, using the bundled US English model
+  unless ``hmm``/``lm``/``dict`` are given.  A decoder handles one
+  utterance at a time, so calls are serialized.
+
+``google`` (the Web Speech API) is kept for development; it needs network
+access.  Every recognizer records per-utterance latency in
+:attr:`Recognizer.latency`.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any
+
+import numpy as np
+import speech_recognition as sr
+
+from ..instrument import observe
+
+SAMPLE_RATE = 16_000
+LATENCY_WINDOW = 256
+DEFAULT_BACKEND = "vosk"
+VOSK_MODEL_ENV = "CADHELP_VOSK_MODEL"
+
+
+class LatencyStats:
+    """Rolling window of per-utterance recognition times, in seconds."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._times: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._times.append(seconds)
+            self.count += 1
+
+    def summary(self) -> dict[str, float]:
+        with self._lock:
+            t = np.fromiter(self._times, dtype=np.float64)
+            count = self.count
+        if not len(t):
+            return {"count": count}
+        return {
+            "count": count, "last": float(t[-1]), "mean": float(t.mean()),
+            "p50": float(np.percentile(t, 50)), "p95": float(np.percentile(t, 95)),
+            "max": float(t.max()),
+        }
+
+
+class Recognizer:
+    """Base class: audio in, transcript out, with a lazily loaded model.
+
+    Subclasses implement :meth:`_load` (expensive, run once) and
+    :meth:`_transcribe`.  Instances are callable, so they plug straight
+    into :class:`cadhelp.voice.VoicePipeline`.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self.latency = LatencyStats()
+        self.load_time: float | None = None
+        self.load_error: BaseException | None = None
+        self._model: Any = None
+        self._load_lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(loaded={self.loaded})"
+
+    @property
+    def loaded(self) -> bool:
+        return self.load_time is not None
+
+    def load(self) -> None:
+        """Load the model if that has not happened yet; safe to call from any thread.
+
+        A failed load is remembered and re-raised on every later call, so a
+        missing model costs one attempt, not one per utterance.
+        """
+        if self.loaded:
+            return
+        with self._load_lock:
+            if self.loaded:
+                return
+            if self.load_error is not None:
+                raise self.load_error
+            start = time.perf_counter()
+            try:
+                self._model = self._load()
+            except BaseException as exc:
+                self.load_error = exc
+                raise
+            self.load_time = time.perf_counter() - start
+
+    def warm(self) -> threading.Thread:
+        """Start loading on a background thread; callers block in ``load`` until done."""
+
+        def run():
+            try:
+                self.load()
+            except Exception:  # kept in load_error, reported by __call__
+                pass
+
+        thread = threading.Thread(target=run, name=f"{self.name}-load", daemon=True)
+        thread.start()
+        return thread
+
+    def __call__(self, audio: sr.AudioData) -> str:
+        self.load()
+        start = time.perf_counter()
+        try:
+            return self._transcribe(audio)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.latency.record(elapsed)
+            observe("recognize", elapsed)
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name, "loaded": self.loaded, "load_time": self.load_time,
+            "load_error": None if self.load_error is None else str(self.load_error),
+            "latency": self.latency.summary(),
+        }
+
+    def _load(self) -> Any:
+        return None
+
+    def _transcribe(self, audio: sr.AudioData) -> str:
+        raise NotImplementedError
+
+
+class VoskRecognizer(Recognizer):
+    """Offline recognition with a Vosk model directory.
+
+    Args:
+        model_path: unpacked model directory; defaults to ``$CADHELP_VOSK_MODEL``.
+        sample_rate: rate audio is resampled to before decoding.
+        vocabulary: restrict decoding to these words (e.g.
+            ``CommandGrammar.vocabulary()``), which is faster and more
+            accurate for commands but turns free words such as layer names
+            into ``[unk]``.
+    """
+
+    name = "vosk"
+
+    def __init__(self, model_path: str | None = None, sample_rate: int = SAMPLE_RATE,
+                 vocabulary: tuple[str, ...] | None = None):
+        super().__init__()
+        self.model_path = model_path or os.environ.get(VOSK_MODEL_ENV)
+        self.sample_rate = sample_rate
+        self.grammar = json.dumps([*sorted(vocabulary), "[unk]"]) if vocabulary else None
+
+    def _load(self):
+        try:
+            import vosk
+        except ImportError:
+            raise sr.RequestError("the vosk backend needs the 'vosk' package") from None
+        if not self.model_path or not os.path.isdir(self.model_path):
+            raise sr.RequestError(
+                f"Vosk model directory not found: {self.model_path!r} "
+                f"(pass model_path or set {VOSK_MODEL_ENV})"
+            )
+        vosk.SetLogLevel(-1)
+        return vosk.Model(self.model_path)
+
+    def _transcribe(self, audio: sr.AudioData) -> str:
+        from vosk import KaldiRecognizer
+
+        if self.grammar is None:
+            rec = KaldiRecognizer(self._model, self.sample_rate)
+        else:
+            rec = KaldiRecognizer(self._model, self.sample_rate, self.grammar)
+        rec.AcceptWaveform(audio.get_raw_data(convert_rate=self.sample_rate, convert_width=2))
+        text = json.loads(rec.FinalResult()).get("text", "")
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+class SphinxRecognizer(Recognizer):
+    """Offline recognition with a PocketSphinx 5 decoder.
+
+    Args:
+        hmm, lm, dict: acoustic model directory, language model and
+            pronunciation dictionary; PocketSphinx's bundled US English
+            model is used for any left out.
+    """
+
+    name = "sphinx"
+
+    def __init__(self, hmm: str | None = None, lm: str | None = None,
+                 dict: str | None = None):  # noqa: A002 - PocketSphinx's option name
+        super().__init__()
+        self.options = {k: v for k, v in (("hmm", hmm), ("lm", lm), ("dict", dict)) if v}
+        self._decode_lock = threading.Lock()
+
+    def _load(self):
+        try:
+            from pocketsphinx import Decoder
+        except ImportError:
+            raise sr.RequestError("the sphinx backend needs 'pocketsphinx' >= 5") from None
+        return Decoder(**self.options)
+
+    def _transcribe(self, audio: sr.AudioData) -> str:
+        raw = audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=2)
+        with self._decode_lock:
+            decoder = self._model
+            decoder.start_utt()
+            decoder.process_raw(raw, full_utt=True)
+            decoder.end_utt()
+            hyp = decoder.hyp()
+        if hyp is None or not hyp.hypstr:
+            raise sr.UnknownValueError()
+        return hyp.hypstr
+
+
+class GoogleRecognizer(Recognizer):
+    """Google Web Speech API; needs network access, so development only."""
+
+    name = "google"
+
+    def _load(self):
+        return sr.Recognizer()
+
+    def _transcribe(self, audio: sr.AudioData) -> str:
+        return self._model.recognize_google(audio)
+
+
+RECOGNIZERS: dict[str, type[Recognizer]] = {
+    "google": GoogleRecognizer,
+    "sphinx": SphinxRecognizer,
+    "vosk": VoskRecognizer,
+}
+
+_shared: dict[tuple, Recognizer] = {}
+_shared_lock = threading.Lock()
+
+
+def get_recognizer(name: str = DEFAULT_BACKEND, warm: bool = True, **options) -> Recognizer:
+    """The process-wide recognizer for ``name`` and ``options``.
+
+    Args:
+        name: a key of :data:`RECOGNIZERS`.
+        warm: start loading the model in the background right away.
+        options: constructor arguments of the backend.
+    """
+    try:
+        cls = RECOGNIZERS[name]
+    except KeyError:
+        raise ValueError(
+            f"unknown speech backend {name!r}; expected one of {sorted(RECOGNIZERS)}"
+        ) from None
+    key = (name, tuple(sorted(options.items())))
+    with _shared_lock:
+        recognizer = _shared.get(key)
+        if recognizer is None:
+            recognizer = _shared[key] = cls(**options)
+            if warm:
+                recognizer.warm()
+    return recognizer
@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from cadhelp.api import create_app, get_state
+from cadhelp.geometry import GeometryBuilder
+from cadhelp.io import write_geojson
+
+
+def plan():
+    """Two rooms, a wall line and a pipe, on three layers."""
+    b = GeometryBuilder()
+    b.add_polygon([(0, 0), (4, 0), (4, 3), (0, 3)], "rooms")
+    b.add_polygon([(5, 0), (9, 0), (9, 3), (5, 3)], "rooms")
+    b.add_linestring([(0, 4), (9, 4)], "walls")
+    b.add_linestring([(0, 6), (9, 6)], "pipes")
+    return b.build()
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({"RESULT_CACHE_DIR": tmp_path / "results", "JOB_WORKERS": 1,
+                      "TESTING": True})
+    yield app
+    with app.app_context():
+        get_state().jobs.shutdown(wait=False)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def key(client):
+    """Key of :func:`plan` uploaded to ``client``."""
+    response = client.post("/drawings?name=plan.geojson", data=json.dumps(write_geojson(plan())))
+    assert response.status_code == 201
+    return response.json["key"]
@@ -0,0 +1,124 @@
+import io
+import time
+
+import pytest
+
+from benchmarks.synthetic import scanned_plan
+
+
+def test_upload_and_show(client, key):
+    body = client.get(f"/drawings/{key}").json
+    assert body["entities"] == 4
+    assert sorted(body["layers"]) == ["pipes", "rooms", "walls"]
+    assert client.get("/drawings/nope").status_code == 404
+    response = client.post("/drawings?name=plan.doc", data=b"x")
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("name, data", [
+    ("plan.geojson", b"[1, 2]"),
+    ("plan.geojson", b'{"type": "Point", "coordinates": "x"}'),
+    ("plan.svg", b'<svg><path d="10 20 L 3 4"/></svg>'),
+    ("plan.svg", b'<svg>\n  <g id="walls"><rect width="2"'),
+])
+def test_malformed_upload_is_400(client, name, data):
+    assert client.post(f"/drawings?name={name}", data=data).status_code == 400
+
+
+def test_inline_op_and_etag(client, key):
+    response = client.post(f"/drawings/{key}/ops/boolean", json={"op": "union", "layers": "rooms"})
+    assert response.status_code == 200
+    assert response.json["geometry"]["type"] == "MultiPolygon"
+    again = client.post(f"/drawings/{key}/ops/boolean", json={"op": "union", "layers": "rooms"},
+                        headers={"If-None-Match": response.headers["ETag"]})
+    assert again.status_code == 304
+
+
+@pytest.mark.parametrize("params", [
+    {"op": "difference", "bbox": [1, 2]},
+    {"op": "difference", "bbox": [0, 0, "x", 1]},
+    {"op": "intersection", "bbox": [0, 0, float("inf"), 1]},
+    {"op": "intersection", "region": "POLYGON (("},
+    {"op": "difference", "region": 5},
+    {"op": "difference"},
+    {"op": "xor", "bbox": [0, 0, 1, 1]},
+    {"op": "union", "layers": "nope"},
+    {"op": "union", "colour": "red"},
+])
+def test_bad_boolean_params_are_400(client, key, params):
+    response = client.post(f"/drawings/{key}/ops/boolean", json=params)
+    assert response.status_code == 400, response.json
+
+
+@pytest.mark.parametrize("params", [{"op": "difference", "bbox": [1, 2]}, {"op": "difference"}])
+def test_bad_params_of_a_job_are_400(client, key, params):
+    response = client.post(f"/drawings/{key}/ops/boolean?async=1", json=params)
+    assert response.status_code == 202
+    deadline = time.monotonic() + 60
+    status = response.json
+    while status["status"] in ("queued", "running") and time.monotonic() < deadline:
+        time.sleep(0.05)
+        status = client.get(response.json["status_url"]).json
+    assert status["status"] == "failed" and status["bad_input"]
+    inline = client.post(f"/drawings/{key}/ops/boolean", json=params)
+    result = client.get(response.json["result_url"])
+    assert result.status_code == inline.status_code == 400
+    assert result.json["error"] == inline.json["description"]
+
+
+def test_unknown_op_and_non_object_params(client, key):
+    assert client.post(f"/drawings/{key}/ops/explode", json={}).status_code == 404
+    assert client.post(f"/drawings/{key}/ops/takeoff", json=[1, 2]).status_code == 400
+
+
+def test_takeoff_report_materials(client, key):
+    url = f"/drawings/{key}/takeoff"
+    rows = client.get(f"{url}?by=material&materials=rooms:concrete,walls:brick").json["rows"]
+    assert {r["material"]: r["count"] for r in rows} == {
+        "brick": 1, "concrete": 2, "unassigned": 1,
+    }
+    posted = client.post(url, json={"by": ["material", "kind"],
+                                    "materials": {"rooms": "concrete"}}).json
+    assert posted["total"]["count"] == 4 and len(posted["rows"]) == 2
+    csv = client.get(f"{url}?by=layer&format=csv")
+    assert csv.mimetype == "text/csv" and csv.data.decode().startswith("layer,count")
+
+
+@pytest.mark.parametrize("method, query, body", [
+    ("get", "?by=material&materials=x", None),
+    ("get", "?by=material&materials=rooms:", None),
+    ("post", "", {"by": "material", "materials": ["rooms", "concrete"]}),
+    ("post", "", {"by": "material", "materials": {"rooms": 5}}),
+    ("post", "", {"by": 5}),
+    ("post", "", [1, 2]),
+    ("get", "?by=colour", None),
+    ("get", "?layers=nope", None),
+])
+def test_takeoff_report_bad_params_are_400(client, key, method, query, body):
+    url = f"/drawings/{key}/takeoff{query}"
+    response = client.get(url) if method == "get" else client.post(url, json=body)
+    assert response.status_code == 400, response.json
+
+
+def test_takeoff_op_rejects_non_mapping_materials(client, key):
+    response = client.post(f"/drawings/{key}/ops/takeoff",
+                           json={"by": "material", "materials": "rooms:concrete"})
+    assert response.status_code == 400
+
+
+def test_image_upload_is_traced_by_a_job(client):
+    scan = scanned_plan(4)
+    response = client.post("/drawings", data={"file": (io.BytesIO(scan), "scan.png")})
+    assert response.status_code == 202
+    assert response.headers["Location"] == response.json["status_url"]
+    deadline = time.monotonic() + 60
+    status = response.json
+    while not status["drawing"] and time.monotonic() < deadline:
+        time.sleep(0.05)
+        status = client.get(response.json["status_url"]).json
+    assert status["status"] == "done" and status["drawing"]
+    assert client.get(f"/drawings/{status['drawing']}").json["name"] == "scan.png"
+    assert client.get(response.json["result_url"]).json["type"] == "FeatureCollection"
+    # The traced store is cached by content, so the same scan again is registered inline.
+    again = client.post("/drawings", data={"file": (io.BytesIO(scan), "scan.png")})
+    assert again.status_code == 201 and again.json["key"] == status["drawing"]
@@ -0,0 +1,48 @@
+import io
+
+import numpy as np
+import pytest
+
+from cadhelp.geometry import GeometryBuilder
+from cadhelp.io import open_drawing, read_binary, read_drawing, write_binary
+
+
+def build():
+    b = GeometryBuilder()
+    b.add_polygon([(0, 0), (4, 0), (4, 3), (0, 3)], "walls")
+    b.add_linestring([(0, 0), (3, 4), (3, 10)], "pipes")
+    b.add_point((5, 5), "marks")
+    return b.build()
+
+
+def assert_same(a, b):
+    for field in ("coords", "offsets", "kinds", "layers", "ids"):
+        np.testing.assert_array_equal(getattr(a, field), getattr(b, field))
+    assert a.layer_names == b.layer_names
+
+
+def test_round_trip_memory_maps(tmp_path):
+    store = build()
+    path = write_binary(store, tmp_path / "plan.cadb")
+    mapped = open_drawing(path)
+    assert_same(mapped, store)
+    assert not mapped.coords.flags.writeable  # a read-only view of the file
+    assert_same(read_binary(path, mmap=False), store)
+    assert mapped.digest() == store.digest()
+    data = path.read_bytes()
+    assert_same(read_binary(data), store)
+    assert_same(read_drawing(io.BytesIO(data), "plan.cadb"), store)
+
+
+def test_empty_store_round_trips(tmp_path):
+    empty = GeometryBuilder().build()
+    assert len(read_binary(write_binary(empty, tmp_path / "empty.cadb"))) == 0
+
+
+@pytest.mark.parametrize("data, match", [
+    (b"CADHELPB", "truncated"),
+    (b"NOTADRAW" + bytes(120), "not a"),
+])
+def test_rejects_foreign_files(data, match):
+    with pytest.raises(ValueError, match=match):
+        read_binary(data)
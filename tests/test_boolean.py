@@ -0,0 +1,78 @@
+import numpy as np
+import shapely
+
+from cadhelp.geometry import (
+    GeometryBuilder,
+    areas,
+    dissolve,
+    intersect_layer,
+    subtract_layer,
+    to_shapely,
+    union_layer,
+)
+
+
+def build():
+    b = GeometryBuilder()
+    b.add_polygon([(0, 0), (2, 0), (2, 2), (0, 2)], "rooms")     # inside the region
+    b.add_polygon([(3, 0), (6, 0), (6, 2), (3, 2)], "rooms")     # crosses x=4
+    b.add_linestring([(1, 5), (9, 5)], "pipes")                  # crosses x=4
+    b.add_polygon([(20, 20), (21, 20), (21, 21), (20, 21)], "rooms")  # far away
+    b.add_polygon([(1, 1), (3, 1), (3, 3), (1, 3)], "rooms")     # overlaps the first
+    return b.build()
+
+
+def test_union_and_dissolve():
+    store = build()
+    assert union_layer(store, "rooms").area == 4 + 6 + 1 + 4 - 1
+    merged = dissolve(store)
+    assert set(merged) == {"rooms"}
+    assert merged["rooms"].area == union_layer(store).area
+
+
+def test_intersect_passes_contained_entities_through():
+    store = build()
+    region = shapely.box(-1, -1, 4, 10)
+    out = intersect_layer(store, region)
+    assert list(out.ids) == [0, 1, 2, 4]
+    assert out.layer_names == store.layer_names
+    np.testing.assert_array_equal(out.entity_coords(0), store.entity_coords(0))
+    np.testing.assert_allclose(areas(out), [4, 2, 0, 4])
+    for got, ref in zip(to_shapely(out), shapely.intersection(to_shapely(store, out.ids), region)):
+        assert got.equals(ref)
+
+
+def test_intersect_layer_filter():
+    out = intersect_layer(build(), shapely.box(-1, -1, 4, 10), "pipes")
+    assert list(out.ids) == [2]
+    assert to_shapely(out)[0].length == 3
+
+
+def test_subtract_keeps_order_and_untouched_entities():
+    store = build()
+    cutter = shapely.box(4, -1, 5, 10)
+    out = subtract_layer(store, cutter)
+    # The pipe is split in two; both parts keep its id, in place.
+    assert list(out.ids) == [0, 1, 1, 2, 2, 3, 4]
+    np.testing.assert_array_equal(out.entity_coords(6), store.entity_coords(4))
+    np.testing.assert_allclose(areas(out)[[0, 5, 6]], [4, 1, 4])
+    assert sum(g.area for g in to_shapely(out)[1:3]) == 4
+    assert sum(g.length for g in to_shapely(out)[3:5]) == 7
+
+
+def test_subtract_layer_filter_drops_other_layers():
+    out = subtract_layer(build(), shapely.box(4, -1, 5, 10), "pipes")
+    assert list(out.ids) == [2, 2]
+    assert {out.layer_names[i] for i in out.layers} == {"pipes"}
+
+
+def test_subtract_inner_cutter_keeps_the_hole():
+    b = GeometryBuilder()
+    b.add_polygon([(0, 0), (10, 0), (10, 10), (0, 10)], "rooms")
+    b.add_linestring([(0, 20), (5, 20)], "pipes")
+    out = subtract_layer(b.build(), shapely.box(2, 3, 6, 5))
+    # Holes are not stored: the room is cut into hole-free pieces of the same area.
+    assert list(out.ids) == [0, 0, 1]
+    assert areas(out).sum() == 100 - 8
+    assert shapely.union_all(to_shapely(out)[:2]).equals(
+        shapely.box(0, 0, 10, 10).difference(shapely.box(2, 3, 6, 5)))
@@ -0,0 +1,53 @@
+import pytest
+
+from benchmarks.synthetic import mixed
+from cadhelp.clearance import _strip, check, check_parallel, iter_violations, partitions
+from cadhelp.geometry import GeometryBuilder
+
+
+def build():
+    b = GeometryBuilder()
+    b.add_polygon([(0, 0), (4, 0), (4, 3), (0, 3)], "walls")      # 0
+    b.add_polygon([(4.5, 0), (8, 0), (8, 3), (4.5, 3)], "walls")  # 1: 0.5 from 0
+    b.add_point((2, 3.2), "furniture")                           # 2: 0.2 from 0
+    b.add_point((20, 20), "furniture")                           # 3: far away
+    b.add_linestring([(0, 0), (-3, -3)], "walls")                # 4: touches 0
+    return b.build()
+
+
+def pairs(found):
+    return sorted((v.a, v.b) for v in found)
+
+
+def test_pairs_within_and_across_layers():
+    store = build()
+    assert pairs(check(store, 1.0)) == [(0, 1), (0, 2), (0, 4)]
+    assert pairs(check(store, 1.0, layers="walls")) == [(0, 1), (0, 4)]
+    found = check(store, 1.0, layers="furniture", against="walls")
+    assert pairs(found) == [(0, 2)]
+    assert pairs(check(store, 3.0, layers="furniture", against="walls")) == [(0, 2), (1, 2)]
+    v = found[0]
+    assert v.distance == pytest.approx(0.2) and (v.x, v.y) == pytest.approx((2, 3.1))
+    touching = [v for v in check(store, 1.0) if (v.a, v.b) == (0, 4)]
+    assert touching[0].distance == 0
+    assert len(check(store, 1.0, limit=2)) == 2
+    with pytest.raises(ValueError):
+        check(store, 0)
+
+
+@pytest.mark.parametrize("count", [1, 3, 8, 40])
+def test_every_violation_is_owned_by_exactly_one_strip(count):
+    store = mixed(600, seed=3)
+    expected = pairs(iter_violations(store, 2.0))
+    found = []
+    for part, lo, hi in partitions(store, 2.0, count):
+        found += _strip(part, 2.0, None, None, lo, hi)
+    assert len(expected) > 100
+    assert pairs(found) == expected
+
+
+def test_check_parallel_matches_serial():
+    store = mixed(400, seed=5)
+    expected = pairs(iter_violations(store, 1.5, layers="A-ROOM", against="hatch"))
+    found = check_parallel(store, 1.5, layers="A-ROOM", against="hatch", workers=2, strips=5)
+    assert pairs(found) == expected
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import mixed
+from cadhelp.drawing import Drawing
+from cadhelp.geometry import GeometryBuilder, bounds
+from cadhelp.render import cull, visible, visible_positions
+
+
+def build():
+    b = GeometryBuilder()
+    b.add_polygon([(0, 0), (10, 0), (10, 10), (0, 10)], "rooms")   # large
+    b.add_polygon([(20, 20), (20.1, 20), (20.1, 20.1)], "rooms")    # tiny
+    b.add_point((20, 21), "marks")                                  # points always stay
+    b.add_linestring([(100, 100), (110, 100)], "walls")             # off screen
+    return b.build()
+
+
+def test_visible_by_bbox_and_pixel_size():
+    store = build()
+    b = bounds(store)
+    assert list(np.flatnonzero(visible(b, store.kinds, (0, 0, 50, 50)))) == [0, 1, 2]
+    assert list(np.flatnonzero(visible(b, store.kinds, (0, 0, 50, 50), 1.0))) == [0, 2]
+    assert list(np.flatnonzero(visible(b, store.kinds, (0, 0, 50, 50), 1.0, 0.0))) == [0, 1, 2]
+
+
+def test_cull_returns_the_store_when_everything_is_visible():
+    store = build()
+    assert cull(store, (-1, -1, 200, 200)) is store
+    assert list(cull(store, (0, 0, 50, 50), 1.0).ids) == [0, 2]
+
+
+@pytest.mark.parametrize("bbox", [(0, 0, 30, 30), (50, 50, 120, 90), (-1e3, -1e3, 1e4, 1e4),
+                                  (1e5, 1e5, 1e5 + 1, 1e5 + 1)])
+def test_index_and_scan_agree(bbox):
+    drawing = Drawing(mixed(3000, seed=2))
+    expected = np.flatnonzero(visible(bounds(drawing.store), drawing.store.kinds, bbox, 0.2))
+    np.testing.assert_array_equal(visible_positions(drawing, bbox, 0.2), expected)
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from cadhelp.document import Document
+from cadhelp.drawing import Drawing
+from cadhelp.geometry import LINESTRING, POLYGON, GeometryBuilder, areas, bounds
+
+
+def build():
+    b = GeometryBuilder()
+    b.add_polygon([(0, 0), (4, 0), (4, 3), (0, 3)], "rooms")
+    b.add_linestring([(0, 5), (10, 5)], "walls")
+    b.add_polygon([(20, 0), (22, 0), (22, 2), (20, 2)], "rooms")
+    return b.build()
+
+
+def by_id(doc):
+    """``{id: (layer, coords)}`` for every entity of ``doc``."""
+    store = doc.store
+    return {int(i): (store.layer_names[store.layers[k]], store.entity_coords(k).tolist())
+            for k, i in enumerate(store.ids)}
+
+
+def warm(doc):
+    """Build every piece of derived data, so edits have to patch it."""
+    doc.index, doc.bounds, doc.metrics, doc.extent, doc.lod  # noqa: B018
+
+
+def assert_derived_fresh(doc):
+    fresh = Document(doc.store)
+    np.testing.assert_array_equal(doc.bounds, bounds(doc.store))
+    np.testing.assert_allclose(doc.metrics["area"], areas(doc.store))
+    assert len(doc.index) == len(doc.store)
+    for bbox in [(-1, -1, 5, 4), (15, -1, 30, 10), (-100, -100, 100, 100)]:
+        assert sorted(doc.index.query_box(bbox)) == sorted(fresh.index.query_box(bbox))
+
+
+def test_edits_undo_and_redo_round_trip():
+    doc = Document(build(), "plan")
+    warm(doc)
+    original = by_id(doc)
+    seen = []
+    doc.subscribe(lambda d, edit: seen.append(edit.label))
+
+    new = doc.add(LINESTRING, [(30, 30), (31, 31)], "pipes")
+    doc.move([0, new], 100, 0)
+    doc.set_layer([1], "demo")
+    doc.delete([2])
+    assert doc.revision == 4
+    assert sorted(by_id(doc)) == [0, 1, new]
+    assert by_id(doc)[0][1][0] == [100.0, 0.0]
+    assert by_id(doc)[1][0] == "demo"
+    assert_derived_fresh(doc)
+    # The extent only grows while editing.
+    assert doc.extent[2] >= 131
+
+    edited = by_id(doc)
+    while doc.can_undo:
+        doc.undo()
+    assert by_id(doc) == original
+    assert_derived_fresh(doc)
+    assert doc.undo() is None
+
+    while doc.can_redo:
+        doc.redo()
+    assert by_id(doc) == edited
+    assert_derived_fresh(doc)
+    labels = ["add", "move", "set layer", "delete"]
+    assert seen == labels + labels[::-1] + labels
+
+
+def test_new_edit_clears_redo():
+    doc = Document(build())
+    doc.delete([1])
+    doc.undo()
+    assert doc.can_redo
+    doc.move([0], 1, 1)
+    assert not doc.can_redo and doc.redo() is None
+
+
+def test_dirty_rectangle_covers_old_and_new_geometry():
+    doc = Document(build())
+    edit = doc.move([0], 10, 10)
+    assert edit.dirty == (0.0, 0.0, 14.0, 13.0)
+    assert list(edit.touched) == [0]
+
+
+def test_unknown_ids_raise():
+    doc = Document(build())
+    with pytest.raises(KeyError):
+        doc.delete([0, 99])
+    assert doc.revision == 0 and not doc.can_undo
+
+
+def test_from_drawing_shares_derived_data():
+    drawing = Drawing(build())
+    warm(drawing)
+    doc = Document.from_drawing(drawing)
+    assert doc.key != drawing.key and doc.bounds is drawing.bounds
+    doc.add_store(build())
+    # The original drawing's index is untouched by the document's edits.
+    assert len(drawing.index) == 3 and len(doc.index) == 6
+    assert_derived_fresh(doc)
+    assert (doc.store.kinds == POLYGON).sum() == 4
+
+
+def test_history_is_bounded():
+    doc = Document(build(), max_history=2)
+    for _ in range(3):
+        doc.move([0], 1, 0)
+    assert doc.undo() and doc.undo() and doc.undo() is None
+    assert by_id(doc)[0][1][0] == [1.0, 0.0]
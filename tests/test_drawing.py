@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from cadhelp.drawing import Drawing, DrawingRegistry
+from cadhelp.geometry import GeometryBuilder
+
+
+def build():
+    b = GeometryBuilder()
+    b.add_polygon([(0, 0), (4, 0), (4, 3), (0, 3)], "walls")
+    b.add_linestring([(10, 10), (13, 14)], "pipes")
+    b.add_point((20, 20), "marks")
+    return b.build()
+
+
+def test_drawing_derived_data():
+    drawing = Drawing(build(), "plan")
+    assert drawing.key == drawing.store.digest() == drawing.digest
+    assert drawing.extent == (0.0, 0.0, 20.0, 20.0)
+    np.testing.assert_allclose(drawing.metrics["area"], [12, 0, 0])
+    np.testing.assert_allclose(drawing.metrics["length"], [14, 5, 0])
+    assert list(drawing.query((9, 9, 21, 21)).ids) == [1, 2]
+
+
+def test_positions():
+    drawing = Drawing(build())
+    assert list(drawing.positions([2, 0])) == [2, 0]
+    with pytest.raises(KeyError):
+        drawing.positions([7])
+
+
+def test_registry_in_memory():
+    registry = DrawingRegistry()
+    drawing = registry.add(build(), "plan")
+    assert registry.add(build()) is drawing
+    assert drawing.key in registry and registry.keys() == [drawing.key]
+    assert registry.get(drawing.key) is drawing
+    registry.remove(drawing.key)
+    with pytest.raises(KeyError):
+        registry.get(drawing.key)
+
+
+def test_registry_shares_directory(tmp_path):
+    first = DrawingRegistry(tmp_path)
+    drawing = first.add(build(), "plan")
+    assert first.add(build()) is drawing
+    assert (tmp_path / f"{drawing.key}.cadb").is_file()
+
+    # A second process (another registry) maps the saved file back.
+    second = DrawingRegistry(tmp_path)
+    assert drawing.key in second and second.keys() == [drawing.key]
+    loaded = second.get(drawing.key)
+    assert loaded.digest == drawing.digest
+    np.testing.assert_array_equal(loaded.store.coords, drawing.store.coords)
+
+    second.remove(drawing.key)
+    assert drawing.key not in second
+    with pytest.raises(KeyError):
+        second.get(drawing.key)
+    with pytest.raises(KeyError):
+        second.get("../escape")
@@ -0,0 +1,74 @@
+import io
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from cadhelp.render.encode import (
+    PRESETS,
+    Encoding,
+    encode,
+    get_encoding,
+    sniff_mimetype,
+    to_palette,
+)
+
+
+def line_work(size=(64, 48)):
+    image = Image.new("RGBA", size, "white")
+    draw = ImageDraw.Draw(image)
+    draw.line((0, 0, size[0], size[1]), fill=(200, 30, 30, 255), width=3)
+    draw.rectangle((5, 5, 30, 20), outline=(20, 20, 160, 255))
+    return image
+
+
+@pytest.mark.parametrize("preset", sorted(PRESETS))
+def test_presets_round_trip(preset):
+    image = line_work()
+    data = encode(image, preset)
+    enc = PRESETS[preset]
+    assert sniff_mimetype(data) == enc.mimetype
+    decoded = Image.open(io.BytesIO(data))
+    assert decoded.format == enc.format.upper() and decoded.size == image.size
+    assert (decoded.mode == "P") == (enc.format == "png" and enc.palette)
+    # Line work has few colours: palettes and lossless WebP keep them all.
+    np.testing.assert_array_equal(np.asarray(decoded.convert("RGBA")), np.asarray(image))
+
+
+def test_reused_buffer_returns_only_this_image():
+    big = encode(line_work((512, 512)), "preview")
+    small = encode(line_work(), "preview")
+    assert len(small) < len(big)
+    assert Image.open(io.BytesIO(small)).size == (64, 48)
+    assert encode(line_work(), "preview") == small
+
+
+def test_to_palette_keeps_few_colours_exactly():
+    image = line_work()
+    assert sorted(to_palette(image).convert("RGBA").getcolors()) == sorted(image.getcolors())
+    busy = Image.fromarray(np.random.default_rng(0).integers(0, 255, (32, 32, 3), np.uint8))
+    assert len(to_palette(busy).getcolors()) <= 256
+
+
+def test_get_encoding():
+    assert get_encoding("tile") is PRESETS["tile"]
+    custom = Encoding("webp", level=2)
+    assert get_encoding(custom) is custom and custom.mimetype == "image/webp"
+    assert custom.key() != PRESETS["tile-webp"].key()
+    with pytest.raises(ValueError):
+        get_encoding("jpeg")
+    with pytest.raises(ValueError):
+        get_encoding(Encoding("gif"))
+
+
+def test_render_op_answers_conditional_requests(client, key):
+    url = f"/drawings/{key}/ops/render"
+    response = client.post(url, json={"width": 64, "height": 64, "format": "webp"})
+    assert response.status_code == 200 and response.mimetype == "image/webp"
+    etag = response.headers["ETag"]
+    again = client.post(url, json={"width": 64, "height": 64, "format": "webp"},
+                        headers={"If-None-Match": etag})
+    assert again.status_code == 304 and not again.data
+    assert client.post(url, json={"width": 64, "height": 64},
+                       headers={"If-None-Match": etag}).status_code == 200
+    assert client.post(url, json={"format": "gif"}).status_code == 400
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+import shapely
+
+from cadhelp.geometry import (
+    LINESTRING,
+    POINT,
+    POLYGON,
+    GeometryBuilder,
+    GeometryStore,
+    areas,
+    bounds,
+    centroids,
+    perimeters,
+    rotation,
+    signed_areas,
+    to_shapely,
+    total_bounds,
+    transform,
+    translation,
+)
+
+
+@pytest.fixture
+def store():
+    b = GeometryBuilder()
+    b.add_polygon([(0, 0), (4, 0), (4, 3), (0, 3), (0, 0)], "walls")
+    b.add_linestring([(0, 0), (3, 4), (3, 10)], "pipes")
+    b.add_point((5, 5), "marks")
+    b.add_polygon([(10, 0), (10, 2), (12, 2), (12, 0)], "walls")  # clockwise
+    return b.build()
+
+
+def test_builder_drops_closing_vertex_and_merges_layers(store):
+    assert len(store) == 4
+    assert list(store.counts) == [4, 3, 1, 4]
+    assert store.layer_names == ("walls", "pipes", "marks")
+    assert list(store.layers) == [0, 1, 2, 0]
+    assert list(store.ids) == [0, 1, 2, 3]
+
+
+def test_builder_rejects_short_entities():
+    with pytest.raises(ValueError):
+        GeometryBuilder().add_polygon([(0, 0), (1, 1)])
+
+
+def test_store_validates_offsets_and_layers():
+    with pytest.raises(ValueError):
+        GeometryStore(np.zeros((3, 2)), [0, 2], [LINESTRING])
+    with pytest.raises(ValueError):
+        GeometryStore(np.zeros((2, 2)), [0, 2], [LINESTRING], layers=[3])
+    with pytest.raises(ValueError):
+        GeometryStore(np.zeros((2, 2)), [0, 2], [POLYGON])
+
+
+def test_measurements_match_shapely(store):
+    geoms = to_shapely(store)
+    np.testing.assert_allclose(areas(store), shapely.area(geoms))
+    np.testing.assert_allclose(perimeters(store), shapely.length(geoms))
+    np.testing.assert_allclose(bounds(store), shapely.bounds(geoms))
+    c = shapely.get_coordinates(shapely.centroid(geoms))
+    np.testing.assert_allclose(centroids(store), c)
+
+
+def test_signed_area_follows_orientation(store):
+    signed = signed_areas(store)
+    assert signed[0] == pytest.approx(12.0)
+    assert signed[3] == pytest.approx(-4.0)
+    assert signed[1] == signed[2] == 0.0
+
+
+def test_total_bounds_of_empty_store_is_nan():
+    assert np.isnan(total_bounds(GeometryStore.empty())).all()
+    assert bounds(GeometryStore.empty()).shape == (0, 4)
+
+
+def test_transform_selected_entities(store):
+    moved = transform(store, translation(10, 0), selector=[2])
+    np.testing.assert_array_equal(moved.entity_coords(2), [[15, 5]])
+    np.testing.assert_array_equal(moved.entity_coords(0), store.entity_coords(0))
+    turned = transform(store, rotation(90))
+    np.testing.assert_allclose(turned.entity_coords(2), [[-5, 5]])
+
+
+def test_subset_concat_and_positions(store):
+    sub = store.subset(store.layer_mask("walls"))
+    assert list(sub.ids) == [0, 3]
+    np.testing.assert_array_equal(sub.entity_coords(1), store.entity_coords(3))
+    assert list(store.positions([3, 1])) == [3, 1]
+    with pytest.raises(KeyError):
+        store.positions([99])
+    with pytest.raises(KeyError):
+        store.layer_mask("nope")
+
+    other = GeometryStore(np.array([[1.0, 1.0]]), [0, 1], [POINT], [0], [7], ("pipes",))
+    both = GeometryStore.concat([store, other])
+    assert both.layer_names == ("walls", "pipes", "marks")
+    assert both.layers[-1] == 1
+    assert both.num_vertices == store.num_vertices + 1
+
+
+def test_digest_tracks_content(store):
+    assert store.digest() == store.subset(np.arange(len(store))).digest()
+    assert store.digest() != transform(store, translation(1, 0)).digest()
@@ -0,0 +1,67 @@
+import pytest
+
+from cadhelp.voice.grammar import DEFAULT_GRAMMAR, CommandGrammar, parse_numbers, tokenize
+
+
+def test_tokenize_drops_filler_and_splits_hyphens():
+    assert tokenize("Please draw the twenty-five, -3.5") == ["draw", "twenty", "five", "-3.5"]
+
+
+@pytest.mark.parametrize("words, value", [
+    ("seven", 7),
+    ("twenty five", 25),
+    ("three hundred and two", 302),
+    ("two thousand five hundred", 2500),
+    ("minus three point one four", -3.14),
+    ("forty two", 42),
+    ("12.5", 12.5),
+])
+def test_parse_numbers_longest_reading_first(words, value):
+    tokens = words.split()
+    readings = parse_numbers(tokens, 0)
+    assert readings[0] == (pytest.approx(value), len(tokens))
+
+
+def test_number_words_do_not_run_together():
+    # "ten twenty" is 10 then 20, never 30; "five six" is two numbers.
+    assert parse_numbers(["ten", "twenty"], 0) == [(10, 1)]
+    assert parse_numbers(["five", "six"], 0) == [(5, 1)]
+
+
+@pytest.mark.parametrize("text, name, args", [
+    ("draw a line from 0 0 to 10 twenty", None, None),
+    ("draw line from zero zero to ten twenty", "draw_line",
+     {"x1": 0, "y1": 0, "x2": 10, "y2": 20}),
+    ("add circle at five five radius two point five", "draw_circle",
+     {"x": 5, "y": 5, "radius": 2.5}),
+    ("add circle radius 3 at 1 2", "draw_circle", {"radius": 3, "x": 1, "y": 2}),
+    ("move selection by minus five twenty", "move", {"dx": -5, "dy": 20}),
+    ("move left by 3", "pan", {"direction": "left", "distance": 3}),
+    ("please zoom to extents", "zoom_extents", {}),
+    ("fit screen", "zoom_extents", {}),
+    ("zoom to level three", "zoom_to", {"level": 3}),
+    ("hide layer walls", "hide_layer", {"layer": "walls"}),
+    ("measure", "takeoff", {}),
+    ("measure layer pipes", "takeoff", {"layer": "pipes"}),
+    ("zoom in now", None, None),
+    ("", None, None),
+])
+def test_default_grammar(text, name, args):
+    command = DEFAULT_GRAMMAR(text)
+    if name is None:
+        assert command is None
+    else:
+        assert (command.name, command.args, command.text) == (name, args, text)
+
+
+def test_template_errors():
+    with pytest.raises(ValueError, match="bad slot type"):
+        CommandGrammar({"x": "go {where:Up!}"})
+    with pytest.raises(ValueError, match="ambiguous"):
+        CommandGrammar({"a": "go [now]", "b": "go"})
+
+
+def test_vocabulary():
+    words = CommandGrammar({"pan": "pan {direction:left|right} [by] {d:number}"}).vocabulary()
+    assert {"pan", "by", "left", "right", "twenty", "point"} <= words
+    assert "number" not in words
@@ -0,0 +1,85 @@
+import math
+
+import pytest
+
+from cadhelp import instrument
+from cadhelp.instrument import Histogram, Registry, prometheus
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = Registry()
+    monkeypatch.setattr(instrument, "REGISTRY", registry)
+    monkeypatch.setattr(instrument, "_enabled", True)
+    return registry
+
+
+def test_histogram_buckets_and_quantiles():
+    h = Histogram((0.01, 0.1, 1.0))
+    assert math.isnan(h.quantile(0.5))
+    for seconds in (0.005, 0.005, 0.05, 0.5, 2.0):
+        h.observe(seconds)
+    assert h.counts == [2, 1, 1, 1] and h.count == 5 and h.max == 2.0
+    assert h.sum == pytest.approx(2.56)
+    assert 0.0 < h.quantile(0.2) <= 0.01
+    assert 0.1 < h.quantile(0.8) <= 1.0
+    assert h.quantile(1.0) == 2.0  # the open bucket ends at the largest observation
+    h.reset()
+    assert h.count == 0 and h.max == 0.0
+
+
+def test_timed_as_block_and_decorator(registry):
+    with instrument.timed("parse"):
+        pass
+
+    @instrument.timed("index")
+    def build(fail=False):
+        if fail:
+            raise ValueError
+        return 7
+
+    assert build() == 7
+    with pytest.raises(ValueError):
+        build(fail=True)
+    instrument.count("hits", 2)
+    snapshot = registry.snapshot()
+    assert [(row["stage"], row["count"]) for row in snapshot["stages"]] == [
+        ("index", 2), ("parse", 1)]
+    assert snapshot["counters"] == [{"counter": "hits", "value": 2}]
+    registry.reset()
+    assert registry.snapshot() == {"stages": [], "counters": []}
+    # Timers bound to a histogram before the reset keep recording into it.
+    build()
+    assert registry.snapshot()["stages"][0]["count"] == 1
+
+
+def test_disabled_records_nothing(registry, monkeypatch):
+    monkeypatch.setattr(instrument, "_enabled", False)
+    with instrument.timed("parse"):
+        pass
+    instrument.count("hits")
+    instrument.observe("render", 0.1)
+    assert registry.snapshot() == {"stages": [], "counters": []}
+
+
+def test_prometheus_text(registry):
+    instrument.observe("cull", 0.002)
+    instrument.observe("cull", 0.2)
+    instrument.count("jobs submitted")
+    text = prometheus({"tile_cache_bytes": 10}, {"result_cache_hits": 3}, registry)
+    lines = text.splitlines()
+    assert "# TYPE cadhelp_stage_seconds histogram" in lines
+    assert 'cadhelp_stage_seconds_bucket{stage="cull",le="0.0025"} 1' in lines
+    assert 'cadhelp_stage_seconds_bucket{stage="cull",le="+Inf"} 2' in lines
+    assert 'cadhelp_stage_seconds_count{stage="cull"} 2' in lines
+    assert "cadhelp_jobs_submitted_total 1" in lines
+    assert "cadhelp_result_cache_hits_total 3" in lines
+    assert "cadhelp_tile_cache_bytes 10" in lines
+    assert text.endswith("\n")
+
+
+def test_metrics_endpoint(client, key):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    assert "cadhelp_jobs_queued 0" in response.text.splitlines()
@@ -0,0 +1,129 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from cadhelp.geometry import GeometryBuilder, GeometryStore, areas
+from cadhelp.io import (
+    iter_drawing,
+    load_in_background,
+    read_drawing,
+    read_geojson,
+    write_geojson,
+)
+from cadhelp.io.svg import parse_path
+
+
+def build():
+    b = GeometryBuilder()
+    b.add_polygon([(0, 0), (4, 0), (4, 3), (0, 3)], "walls")
+    b.add_linestring([(0, 0), (3, 4)], "pipes")
+    b.add_point((5, 5), "marks")
+    return b.build()
+
+
+def geojson_bytes(store):
+    return json.dumps(write_geojson(store)).encode()
+
+
+def test_read_drawing_dispatches_on_suffix():
+    store = build()
+    data = geojson_bytes(store)
+    for name in ("plan.geojson", "PLAN.JSON"):
+        parsed = read_drawing(data, name)
+        np.testing.assert_array_equal(parsed.coords, store.coords)
+        assert [parsed.layer_names[i] for i in parsed.layers] == ["walls", "pipes", "marks"]
+    assert read_drawing(io.BytesIO(data), "plan.geojson").digest() == parsed.digest()
+    with pytest.raises(ValueError, match="unsupported drawing format"):
+        read_drawing(data, "plan.doc")
+    with pytest.raises(ValueError):
+        read_drawing(data, "plan")
+
+
+@pytest.mark.parametrize("source", [
+    "[1, 2]",
+    "null",
+    '{"type": "FeatureCollection", "features": {}}',
+    '{"type": "FeatureCollection", "features": [1]}',
+    '{"type": "Point", "coordinates": "x"}',
+    '{"type": "Blob"}',
+    "not json",
+])
+def test_read_geojson_rejects_malformed_documents(source):
+    with pytest.raises(ValueError):
+        read_geojson(source)
+
+
+def test_read_geojson_layers_and_empty_features():
+    doc = {"type": "FeatureCollection", "features": [
+        {"type": "Feature", "properties": {"layer": "walls"},
+         "geometry": {"type": "LineString", "coordinates": [[0, 0], [1, 1]]}},
+        {"type": "Feature", "properties": None, "geometry": None},
+        {"type": "Feature", "properties": None,
+         "geometry": {"type": "Point", "coordinates": [2, 3]}},
+    ]}
+    store = read_geojson(json.dumps(doc))
+    assert [store.layer_names[i] for i in store.layers] == ["walls", "0"]
+
+
+def test_parse_path_commands():
+    (square, closed), = parse_path("M0 0 h4 v3 H0 z")
+    assert closed and square == [(0, 0), (4, 0), (4, 3), (0, 3)]
+    # Extra pairs after a moveto are linetos; a second moveto starts a new subpath.
+    (first, open_), (second, _) = parse_path("m1 1 2 0 0 2 M 9 9 L 10 10")
+    assert not open_ and first == [(1, 1), (3, 1), (3, 3)]
+    assert second == [(9, 9), (10, 10)]
+    (curve, _), = parse_path("M0 0 C 0 1 1 1 1 0")
+    assert curve[0] == (0, 0) and tuple(curve[-1]) == (1, 0) and len(curve) > 4
+
+
+@pytest.mark.parametrize("d", ["10 20 L 3 4", "1 2 3 4 5 6"])
+def test_parse_path_needs_a_leading_command(d):
+    with pytest.raises(ValueError, match="must start with a command"):
+        parse_path(d)
+
+
+def test_read_svg_layers_and_transforms():
+    svg = b"""<svg xmlns="http://www.w3.org/2000/svg">
+      <g id="walls" transform="translate(10 0)">
+        <rect x="0" y="0" width="4" height="3"/>
+        <line x1="0" y1="0" x2="5" y2="0"/>
+      </g>
+      <path d="M 0 0 L 1 1"/>
+    </svg>"""
+    store = read_drawing(svg, "plan.svg")
+    assert [store.layer_names[i] for i in store.layers] == ["walls", "walls", "0"]
+    # SVG's y axis points down; drawings are stored y-up.
+    np.testing.assert_allclose(store.entity_coords(1), [(10, 0), (15, 0)])
+    np.testing.assert_allclose(store.entity_coords(2), [(0, 0), (1, -1)])
+
+
+@pytest.mark.parametrize("svg, where", [
+    (b'<svg>\n  <g id="walls"><rect width="2"', "line 2, column"),
+    (b'<svg><g></svg>', "line 1, column 10"),
+])
+def test_malformed_svg_is_a_value_error(svg, where):
+    with pytest.raises(ValueError, match=f"malformed SVG at {where}"):
+        read_drawing(svg, "plan.svg")
+
+
+def dxf(*entities):
+    lines = ["0", "SECTION", "2", "ENTITIES"]
+    for e in entities:
+        lines += e
+    return ("\n".join(lines + ["0", "ENDSEC", "0", "EOF"]) + "\n").encode()
+
+
+def test_dxf_streams_in_batches():
+    line = ["0", "LINE", "8", "walls", "10", "0", "20", "0", "11", "3", "21", "4"]
+    poly = ["0", "LWPOLYLINE", "8", "rooms", "70", "1",
+            "10", "0", "20", "0", "10", "4", "20", "0", "10", "4", "20", "3"]
+    data = dxf(line, poly, line)
+    whole = read_drawing(data, "plan.dxf")
+    assert [whole.layer_names[i] for i in whole.layers] == ["walls", "rooms", "walls"]
+    np.testing.assert_allclose(areas(whole), [0, 6, 0])
+    parts = list(iter_drawing(io.BytesIO(data), "plan.dxf", batch_size=2))
+    assert [len(p) for p in parts] == [2, 1]
+    assert GeometryStore.concat(parts).digest() == whole.digest()
+    assert load_in_background(data, "plan.dxf").result(5).digest() == whole.digest()
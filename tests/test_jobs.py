@@ -0,0 +1,73 @@
+import operator
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from cadhelp import jobs
+from cadhelp.jobs import CANCELLED, DONE, FAILED, JobManager
+
+
+@pytest.fixture
+def manager():
+    manager = JobManager(max_workers=1)
+    yield manager
+    manager.shutdown(wait=False)
+
+
+def wait_for(predicate, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_results_and_failures(manager):
+    job = manager.submit("add", "d", operator.add, 2, 3)
+    assert job.future.result(30) == 5
+    assert job.status == DONE and job.started is not None
+    bad = manager.submit("div", "d", operator.truediv, 1, 0)
+    with pytest.raises(ZeroDivisionError):
+        bad.future.result(30)
+    assert bad.to_dict()["status"] == FAILED and "division" in bad.to_dict()["error"]
+    assert bad.to_dict()["error_type"] == "ZeroDivisionError" and not bad.bad_input
+    invalid = manager.submit("int", "d", int, "x")
+    with pytest.raises(ValueError):
+        invalid.future.result(30)
+    assert invalid.bad_input and invalid.to_dict()["error_type"] == "ValueError"
+    assert manager.get(job.id) is job
+    with pytest.raises(KeyError):
+        manager.get("nope")
+
+
+def test_cancel_queued_and_running(manager):
+    running = manager.submit("sleep", "d", time.sleep, 60)
+    queued = manager.submit("sleep", "d", time.sleep, 60)
+    wait_for(running.future.running)
+    assert manager.cancel(queued.id) and queued.status == CANCELLED
+    started = time.monotonic()
+    assert manager.cancel(running.id)
+    wait_for(running.future.done)
+    assert running.status == CANCELLED and time.monotonic() - started < 10
+    # The killed worker is replaced for the next job.
+    assert manager.submit("add", "d", operator.add, 1, 1).future.result(30) == 2
+    assert not manager.cancel(running.id)
+
+
+class SlowStart(Future):
+    """Pauses once running, before the manager can have recorded the job's worker."""
+
+    def set_running_or_notify_cancel(self):
+        running = super().set_running_or_notify_cancel()
+        time.sleep(0.2)
+        return running
+
+
+def test_cancel_as_soon_as_a_job_starts(manager, monkeypatch):
+    monkeypatch.setattr(jobs, "Future", SlowStart)
+    job = manager.submit("sleep", "d", time.sleep, 60)
+    wait_for(job.future.running)
+    # A job that has left the queue is always found running.
+    assert manager.cancel(job.id)
+    wait_for(job.future.done)
+    assert job.status == CANCELLED
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from cadhelp.document import Document
+from cadhelp.geometry import GeometryBuilder
+from cadhelp.lod import LodPyramid
+
+
+def wiggly(n=4, vertices=2000):
+    """Nearly straight polylines with tiny wiggles a coarse level removes."""
+    b = GeometryBuilder()
+    x = np.linspace(0, 1000, vertices)
+    for k in range(n):
+        y = k * 100 + 0.01 * np.sin(x)
+        b.add_linestring(np.column_stack([x, y]), "contours")
+    return b.build()
+
+
+def test_levels_lose_vertices_but_keep_entities():
+    store = wiggly()
+    lod = LodPyramid(store, (0, 0, 1000, 1000))
+    assert lod.level_for(0) is None and lod.level(None) is store
+    assert lod.level_for(lod.base) is None  # finer than the finest level
+    coarse = lod.level(lod.levels - 1)
+    assert len(coarse) == len(store) and list(coarse.ids) == list(store.ids)
+    assert coarse.num_vertices < store.num_vertices / 100
+    assert lod.level_for(1e9) == lod.levels - 1
+    with pytest.raises(ValueError):
+        lod.level(lod.levels)
+
+
+def test_at_falls_back_until_warm():
+    lod = LodPyramid(wiggly(), (0, 0, 1000, 1000))
+    units_per_px = 1000 / 256
+    assert lod.at(units_per_px) is lod.store  # not built yet: the source
+    built = lod.at(units_per_px, wait=True)
+    assert built is lod.level(lod.level_for(units_per_px))
+    assert lod.at(units_per_px) is built
+
+
+def test_documents_patch_built_levels():
+    doc = Document(wiggly())
+    coarse = doc.lod.level(5)
+    doc.move([1], 0, 5000)
+    patched = doc.lod.level(5)
+    assert patched is not coarse and len(patched) == len(doc.store)
+    assert list(patched.ids) == list(doc.store.ids)
+    assert patched.num_vertices == coarse.num_vertices
+    np.testing.assert_allclose(patched.entity_coords(3)[:, 1].min(), 5100, atol=0.1)
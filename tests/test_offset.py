@@ -0,0 +1,99 @@
+import threading
+
+import numpy as np
+import pytest
+import shapely
+
+from cadhelp.geometry import GeometryBuilder, OffsetCache, geometry_keys, to_shapely
+
+
+def walls(n=4):
+    """``n`` identical walls at the same place, then one distinct wall."""
+    b = GeometryBuilder()
+    for _ in range(n):
+        b.add_linestring([(0, 0), (10, 0)], "walls")
+    b.add_linestring([(0, 5), (10, 5)], "walls")
+    return b.build()
+
+
+def test_geometry_keys_ignore_id_and_layer_only():
+    b = GeometryBuilder()
+    b.add_linestring([(0, 0), (1, 0)], "a")
+    b.add_linestring([(0, 0), (1, 0)], "b")
+    b.add_linestring([(1, 0), (0, 0)], "a")  # reversed
+    b.add_polygon([(0, 0), (1, 0), (1, 1)], "a")
+    b.add_linestring([(0, 0), (1, 0), (1, 1)], "a")  # same vertices, other kind
+    keys = [tuple(k) for k in geometry_keys(b.build()).tolist()]
+    assert keys[0] == keys[1]
+    assert len(set(keys)) == 4
+
+
+def test_buffer_matches_shapely_and_shares_entries():
+    cache = OffsetCache()
+    store = walls()
+    out = cache.buffer(store, 1.0, join_style="round")
+    expected = shapely.buffer(to_shapely(store), 1.0, join_style="round")
+    assert all(a.equals(b) for a, b in zip(out, expected))
+    # Duplicates within a call are buffered once, as one miss.
+    assert len(cache) == 2 and cache.misses == 2 and cache.hits == 0
+    cache.buffer(store, 1.0, join_style="round")
+    assert cache.misses == 2 and cache.hits == 5
+    # Other parameters are other entries.
+    cache.buffer(store, 1.0, join_style="bevel")
+    assert len(cache) == 4
+
+
+def test_offset_keeps_ids_and_layers():
+    out = OffsetCache().offset(walls(2), 0.5)
+    assert list(out.ids) == [0, 1, 2]
+    assert {out.layer_names[i] for i in out.layers} == {"walls"}
+    expected = shapely.buffer(shapely.LineString([(0, 0), (10, 0)]), 0.5, join_style="mitre")
+    np.testing.assert_allclose(shapely.area(to_shapely(out)), expected.area)
+
+
+def test_offset_drops_collapsed_and_splits_parts():
+    b = GeometryBuilder()
+    b.add_polygon([(0, 0), (1, 0), (1, 1), (0, 1)], "rooms")  # shrinks away
+    # Two squares joined by a thin neck: shrinking parts them.
+    b.add_polygon([(0, 0), (4, 0), (4, 1.8), (6, 1.8), (6, 0), (10, 0), (10, 4), (6, 4),
+                   (6, 2.2), (4, 2.2), (4, 4), (0, 4)], "rooms")
+    b.add_polygon([(20, 0), (24, 0), (24, 4), (20, 4)], "rooms")
+    out = OffsetCache().offset(b.build(), -0.5)
+    assert list(out.ids) == [1, 1, 2]
+    np.testing.assert_allclose(shapely.area(to_shapely(out)), [9, 9, 9])
+
+
+def test_eviction():
+    cache = OffsetCache(max_entries=2)
+    for d in (1.0, 2.0, 3.0):
+        cache.buffer(walls(1), d)
+    assert len(cache) == 2 and cache.evictions == 4
+
+
+@pytest.mark.parametrize("kwargs", [{"join_style": "zigzag"}, {"cap_style": "pointy"},
+                                    {"quad_segs": 0}])
+def test_bad_params(kwargs):
+    with pytest.raises(ValueError):
+        OffsetCache().buffer(walls(1), 1.0, **kwargs)
+
+
+def test_threads_get_results_for_their_own_parameters():
+    cache = OffsetCache()
+    store = walls(1)
+    errors = []
+
+    def work(distance):
+        try:
+            for _ in range(50):
+                got = shapely.area(cache.buffer(store, distance, cap_style="flat"))
+                np.testing.assert_allclose(got, [20 * distance, 20 * distance])
+                cache.clear()
+        except AssertionError as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=work, args=(d,)) for d in (1.0, 2.0, 3.0, 4.0)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
@@ -0,0 +1,58 @@
+import pytest
+import speech_recognition as sr
+
+from cadhelp.voice.recognizers import RECOGNIZERS, Recognizer, get_recognizer
+
+
+class Counting(Recognizer):
+    name = "counting"
+    loads = 0
+    fail = False
+
+    def _load(self):
+        type(self).loads += 1
+        if self.fail:
+            raise OSError("no model here")
+        return "model"
+
+    def _transcribe(self, audio):
+        return f"{self._model}:{audio.frame_data.decode()}"
+
+
+@pytest.fixture
+def counting(monkeypatch):
+    monkeypatch.setitem(RECOGNIZERS, "counting", Counting)
+    Counting.loads, Counting.fail = 0, False
+    return Counting
+
+
+def utterance(text):
+    return sr.AudioData(text.encode(), 16_000, 2)
+
+
+def test_model_loads_once_and_latency_is_recorded(counting):
+    recognizer = counting()
+    recognizer.warm().join()
+    assert recognizer(utterance("a")) == "model:a"
+    assert recognizer(utterance("b")) == "model:b"
+    assert counting.loads == 1
+    stats = recognizer.stats()
+    assert stats["loaded"] and stats["latency"]["count"] == 2
+    assert set(stats["latency"]) >= {"mean", "p50", "p95", "max"}
+
+
+def test_failed_load_is_remembered(counting):
+    counting.fail = True
+    recognizer = counting()
+    recognizer.warm().join()
+    with pytest.raises(OSError):
+        recognizer(utterance("a"))
+    assert counting.loads == 1
+    assert recognizer.stats()["load_error"] == "no model here"
+
+
+def test_get_recognizer_shares_instances(counting):
+    a = get_recognizer("counting", warm=False)
+    assert get_recognizer("counting", warm=False) is a
+    with pytest.raises(ValueError, match="unknown speech backend"):
+        get_recognizer("parrot")
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from cadhelp.geometry import GeometryBuilder
+from cadhelp.render import Annotation, export, fit_bounds, get_backend, mpl, render, thumbnail
+
+
+def build():
+    b = GeometryBuilder()
+    b.add_polygon([(0, 0), (40, 0), (40, 30), (0, 30)], "walls")
+    b.add_linestring([(0, 0), (40, 30)], "pipes")
+    b.add_point((20, 15), "marks")
+    return b.build()
+
+
+def ink(image):
+    """Number of pixels that are not the white background."""
+    return int((np.asarray(image.convert("L")) < 250).sum())
+
+
+def test_fit_bounds_keeps_centre_and_aspect():
+    minx, miny, maxx, maxy = fit_bounds((0, 0, 10, 2), (200, 100), margin=0.0)
+    assert ((minx + maxx) / 2, (miny + maxy) / 2) == (5, 1)
+    assert (maxx - minx) / (maxy - miny) == pytest.approx(2.0)
+
+
+def test_get_backend():
+    assert callable(get_backend("pillow"))
+    assert get_backend(print) is print
+    with pytest.raises(ValueError):
+        get_backend("cairo")
+
+
+def test_pillow_render_draws_and_culls():
+    store = build()
+    image = render(store, (128, 96))
+    assert image.size == (128, 96) and image.mode == "RGBA"
+    assert ink(image) > 0
+    # A window away from every entity leaves a blank image.
+    assert ink(render(store, (64, 64), bbox=(100, 100, 110, 110))) == 0
+    assert thumbnail(store, (32, 32)).size == (32, 32)
+
+
+def test_matplotlib_canvas_is_reused_across_renders():
+    store = build()
+    first = render(store, (120, 90), backend="matplotlib")
+    figure = mpl.canvas().figure
+    second = render(store, (60, 45), backend="matplotlib")
+    assert mpl.canvas().figure is figure
+    assert first.size == (120, 90) and second.size == (60, 45)
+    assert ink(first) > 0 and ink(second) > 0
+    # reset() clears the axes, so a blank window is blank again.
+    assert ink(render(store, (60, 45), bbox=(100, 100, 110, 110), backend="matplotlib")) == 0
+
+
+@pytest.mark.parametrize("fmt, magic", [("pdf", b"%PDF"), ("svg", b"<?xml"), ("png", b"\x89PNG")])
+def test_export_formats(fmt, magic):
+    data = export(build(), format=fmt, size=(200, 150),
+                  annotations=[Annotation(20, 15, "A1")])
+    assert data.startswith(magic)
@@ -0,0 +1,75 @@
+import os
+
+import numpy as np
+import pytest
+import shapely
+
+from cadhelp.geometry import GeometryBuilder
+from cadhelp.resultcache import ResultCache, cache_key, parse_key
+
+
+def build():
+    b = GeometryBuilder()
+    b.add_polygon([(0, 0), (4, 0), (4, 3), (0, 3)], "walls")
+    b.add_linestring([(0, 0), (3, 4)], "pipes")
+    return b.build()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(tmp_path)
+
+
+def test_keys():
+    assert cache_key("d", "op", {"a": 1, "b": 2}) == cache_key("d", "op", {"b": 2, "a": 1})
+    assert cache_key("d", "op", {"a": (1, 2)}) == cache_key("d", "op", {"a": [1, 2]})
+    assert cache_key("d", "op") != cache_key("e", "op")
+    assert parse_key("c", "plan.DXF") == parse_key("c", "other.dxf") != parse_key("c", "a.svg")
+
+
+def test_round_trips_by_type(cache):
+    store = build()
+    values = {
+        "bytes": b"\x89PNG...",
+        "store": store,
+        "arrays": {"area": np.array([12.0, 0.0]), "ids": np.arange(2)},
+        "geometry": shapely.box(0, 0, 2, 1),
+        "json": {"rows": [1, 2], "total": 3},
+    }
+    for key, value in values.items():
+        assert cache.put(key, value)
+    assert cache.get("bytes") == values["bytes"]
+    assert cache.get("store").digest() == store.digest()
+    arrays = cache.get("arrays")
+    np.testing.assert_array_equal(arrays["area"], values["arrays"]["area"])
+    assert cache.get("geometry").equals(values["geometry"])
+    assert cache.get("json") == values["json"]
+    assert cache.get("missing") is None
+    assert cache.stats()["hits"] == 5 and cache.stats()["misses"] == 1
+
+
+@pytest.mark.parametrize("value, damage", [
+    ({"a": np.arange(100)}, b""),
+    ({"a": np.arange(100)}, b"PK\x03\x04 not a zip"),
+    (build(), b"junk"),
+    (shapely.box(0, 0, 1, 1), b"\x01\x02"),
+    ({"rows": []}, b"{"),
+])
+def test_corrupt_entries_are_misses_and_removed(cache, value, damage):
+    assert cache.put("k", value)
+    path, = (p for p in cache.directory.rglob("k.*"))
+    path.write_bytes(damage)
+    assert cache.get("k") is None
+    assert not path.exists()
+    assert cache.put("k", value) and cache.get("k") is not None
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=2500)
+    cache.put("k0", bytes(1000))
+    cache.put("k1", bytes(1000))
+    os.utime(next(tmp_path.rglob("k1.*")), (1, 1))  # long unused
+    cache.put("k2", bytes(1000))
+    assert cache.get("k1") is None
+    assert cache.get("k0") is not None and cache.get("k2") is not None
+    assert cache.evictions == 1 and cache.size() <= 2500
@@ -0,0 +1,65 @@
+import pytest
+import shapely
+
+from cadhelp.geometry import GeometryBuilder
+from cadhelp.spatial import SpatialIndex
+
+
+def grid_store(n=5):
+    b = GeometryBuilder()
+    for i in range(n):
+        for j in range(n):
+            b.add_polygon([(i * 10, j * 10), (i * 10 + 5, j * 10),
+                           (i * 10 + 5, j * 10 + 5), (i * 10, j * 10 + 5)], "rooms")
+    return b.build()
+
+
+@pytest.fixture
+def index():
+    return SpatialIndex.from_store(grid_store(), min_rebuild=1000)
+
+
+def test_query_box_modes(index):
+    assert sorted(index.query_box((0, 0, 12, 4))) == [0, 5]
+    assert sorted(index.query_box((-1, -1, 6, 16), mode="within")) == [0, 1]
+    with pytest.raises(ValueError):
+        index.query_box((0, 0, 1, 1), mode="fence")
+
+
+def test_point_queries(index):
+    assert list(index.at_point(7, 2, tolerance=3)) == [0, 5]
+    hit = index.nearest_vertex(6, 6, tolerance=2)
+    assert (hit.entity_id, hit.vertex, hit.x, hit.y) == (0, 2, 5.0, 5.0)
+    assert index.nearest_vertex(7.5, 7.5, tolerance=1) is None
+    snap = index.nearest_point(7, 2, tolerance=3)
+    assert (snap.entity_id, snap.x, snap.y, snap.distance) == (0, 5.0, 2.0, 2.0)
+
+
+def test_overlay_and_tombstones(index):
+    index.upsert([0, 100], [shapely.box(100, 100, 101, 101), shapely.box(0, 0, 1, 1)])
+    index.remove([6, 100])
+    assert index.pending == 3  # two tombstones in the packed tree, one overlay entry
+    assert len(index) == 24
+    assert 100 not in index and 6 not in index and 0 in index
+    assert list(index.query_box((0, 0, 2, 2))) == []
+    assert list(index.query_box((99, 99, 102, 102))) == [0]
+    assert list(index.bbox_candidates((0, 0, 6, 16))) == [1]
+
+
+def test_repack_folds_pending_edits():
+    index = SpatialIndex.from_store(grid_store(), min_rebuild=2, rebuild_ratio=0.0)
+    index.upsert([200], [shapely.box(0, 0, 1, 1)])
+    index.remove([0])
+    assert index.pending == 2
+    index.remove([1])  # three pending edits exceed min_rebuild
+    assert index.pending == 0
+    assert len(index) == 24
+    assert sorted(index.query_box((0, 0, 6, 16))) == [200]
+
+
+def test_copy_is_independent(index):
+    other = index.copy()
+    other.remove([0])
+    other.upsert([300], [shapely.box(0, 0, 1, 1)])
+    assert list(index.query_box((0, 0, 1, 1))) == [0]
+    assert list(other.query_box((0, 0, 1, 1))) == [300]
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from cadhelp.drawing import Drawing
+from cadhelp.geometry import GeometryBuilder
+from cadhelp.resultcache import ResultCache
+from cadhelp.takeoff import TakeoffReport, cached_takeoff, takeoff
+
+
+def build():
+    b = GeometryBuilder()
+    b.add_polygon([(0, 0), (4, 0), (4, 3), (0, 3)], "rooms")
+    b.add_polygon([(0, 0), (2, 0), (2, 2), (0, 2)], "rooms")
+    b.add_linestring([(0, 0), (3, 4)], "walls")
+    b.add_point((1, 1), "marks")
+    return b.build()
+
+
+def test_group_by_layer():
+    report = takeoff(build())
+    rows = {r["layer"]: r for r in report.rows()}
+    assert rows["rooms"] == {"layer": "rooms", "count": 2, "vertices": 8,
+                             "area": 16.0, "length": 22.0}
+    assert rows["walls"]["length"] == 5.0
+    assert report.total == {"count": 4, "vertices": 11, "area": 16.0, "length": 27.0}
+
+
+def test_group_by_material_and_kind():
+    report = takeoff(Drawing(build()), ("material", "kind"), materials={"rooms": "concrete"})
+    got = {(r["material"], r["kind"]): r["count"] for r in report.rows()}
+    assert got == {("concrete", "polygon"): 2, ("unassigned", "linestring"): 1,
+                   ("unassigned", "point"): 1}
+
+
+def test_layer_filter():
+    report = takeoff(build(), "kind", layers=["walls", "marks"])
+    assert report.total["count"] == 2
+
+
+@pytest.mark.parametrize("materials", ["rooms:concrete", [("rooms", "concrete")],
+                                       {"rooms": 1}, {1: "concrete"}])
+def test_materials_must_map_names_to_names(materials):
+    with pytest.raises(ValueError, match="materials"):
+        takeoff(build(), "material", materials=materials)
+    with pytest.raises(ValueError, match="materials"):
+        cached_takeoff(Drawing(build()), "material", materials=materials)
+
+
+@pytest.mark.parametrize("by", [(), "colour"])
+def test_bad_grouping(by):
+    with pytest.raises(ValueError):
+        takeoff(build(), by)
+
+
+def test_csv_and_round_trip():
+    report = takeoff(build(), ("layer", "kind"))
+    lines = report.to_csv().splitlines()
+    assert lines[0] == "layer,kind,count,vertices,area,length"
+    assert lines[-1] == "total,,4,11,16.0,27.0"
+    again = TakeoffReport.from_dict(report.to_dict())
+    assert again.rows() == report.rows() and again.total == report.total
+
+
+def test_cached_takeoff_reuses_reports(tmp_path):
+    cache = ResultCache(tmp_path)
+    drawing = Drawing(build())
+    first = cached_takeoff(drawing, "material", materials={"rooms": "concrete"}, cache=cache)
+    # A different process sees the same content and reads the report back.
+    again = cached_takeoff(Drawing(build()), "material", materials={"rooms": "concrete"},
+                           cache=ResultCache(tmp_path))
+    assert again.rows() == first.rows()
+    other = cached_takeoff(drawing, "material", materials={"rooms": "timber"}, cache=cache)
+    assert "timber" in set(other.keys["material"])
+    np.testing.assert_array_equal(other.quantities["count"], first.quantities["count"])
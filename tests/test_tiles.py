@@ -0,0 +1,129 @@
+import io
+import threading
+
+import pytest
+from PIL import Image
+
+from cadhelp.document import Document
+from cadhelp.drawing import Drawing
+from cadhelp.geometry import GeometryBuilder
+from cadhelp.render import TileCache, TileGrid, TileKey, TileRenderer, mpl, pil
+
+
+def build():
+    b = GeometryBuilder()
+    for i in range(8):
+        b.add_polygon([(i * 10, 0), (i * 10 + 8, 0), (i * 10 + 8, 8), (i * 10, 8)], "rooms")
+    b.add_linestring([(0, 40), (80, 40)], "walls")
+    return b.build()
+
+
+def test_grid_math():
+    grid = TileGrid(0.0, 0.0, 100.0, 256)
+    assert grid.tile_bounds(1, 0, 0) == (0.0, 50.0, 50.0, 100.0)  # row 0 is the top
+    assert grid.tile_range(2, (30, 10, 60, 20)) == (range(1, 3), range(3, 4))
+    assert grid.zoom_for(100 / 256, 10) == 0
+    assert grid.zoom_for(100 / 1024, 10) == 2
+    with pytest.raises(ValueError):
+        grid.tile_bounds(1, 2, 0)
+
+
+def test_cache_byte_budget_evicts_least_recent():
+    cache = TileCache(max_bytes=10)
+    keys = [TileKey("d", "s", 0, 0, y) for y in range(3)]
+    cache.put(keys[0], b"aaaa")
+    cache.put(keys[1], b"bbbb")
+    assert cache.get(keys[0]) == b"aaaa"  # now most recent
+    cache.put(keys[2], b"cccc")
+    assert cache.get(keys[1]) is None and cache.nbytes == 8
+    cache.put(TileKey("d", "s", 0, 0, 9), b"x" * 11)  # larger than the budget
+    assert len(cache) == 2
+
+
+def test_counters_add_up_under_concurrent_gets(tmp_path):
+    cache = TileCache(max_bytes=0, disk_dir=tmp_path)  # nothing stays in memory
+    on_disk, missing = TileKey("d", "s", 0, 0, 0), TileKey("d", "s", 0, 0, 1)
+    cache.put(on_disk, b"tile")
+
+    def fetch():
+        for _ in range(200):
+            cache.get(on_disk)
+            cache.get(missing)
+
+    threads = [threading.Thread(target=fetch) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.stats()["disk_hits"] == cache.stats()["misses"] == 1600
+
+
+def test_tiles_are_cached_and_decodable():
+    renderer = TileRenderer()
+    drawing = Drawing(build())
+    data = renderer.tile(drawing, 1, 0, 1)
+    assert renderer.tile(drawing, 1, 0, 1) is data
+    assert renderer.cache.hits == 1
+    assert Image.open(io.BytesIO(data)).size == (256, 256)
+    assert renderer.tile(drawing, 1, 0, 1, encoding="tile-webp")[:4] == b"RIFF"
+    with pytest.raises(ValueError):
+        renderer.tile(drawing, 21, 0, 0)
+
+
+def test_renderers_sharing_a_disk_tier_do_not_collide(tmp_path):
+    drawing = Drawing(build())
+    small = TileRenderer(TileCache(disk_dir=tmp_path), tile_size=128)
+    large = TileRenderer(TileCache(disk_dir=tmp_path), tile_size=256)
+    full = TileRenderer(TileCache(disk_dir=tmp_path), tile_size=256, simplify=False,
+                        min_pixels=0.0)
+    sizes = {Image.open(io.BytesIO(r.tile(drawing, 0, 0, 0))).size for r in (small, large)}
+    assert sizes == {(128, 128), (256, 256)}
+    full.tile(drawing, 0, 0, 0)
+    assert full.cache.disk_hits == 0 and large.cache.disk_hits == 0
+    # A fresh renderer with the same settings reads the tile back from disk.
+    again = TileRenderer(TileCache(disk_dir=tmp_path), tile_size=128)
+    again.tile(drawing, 0, 0, 0)
+    assert again.cache.disk_hits == 1
+
+
+def test_etag_depends_on_content_and_settings():
+    drawing = Drawing(build())
+    pillow, matplotlib = TileRenderer(), TileRenderer(backend="matplotlib")
+    tag = pillow.etag(drawing, 0, 0, 0)
+    assert tag == TileRenderer().etag(Drawing(build()), 0, 0, 0)
+    assert tag != pillow.etag(drawing, 1, 0, 0)
+    assert tag != pillow.etag(drawing, 0, 0, 0, encoding="tile-webp")
+    assert tag != matplotlib.etag(drawing, 0, 0, 0)
+    # Both rasterizers are called "rasterize"; passed as callables they still differ.
+    assert TileRenderer(backend=pil.rasterize).etag(drawing, 0, 0, 0) != TileRenderer(
+        backend=mpl.rasterize).etag(drawing, 0, 0, 0)
+
+
+def test_invalidate_drops_only_tiles_under_an_edit(tmp_path):
+    doc = Document(build())
+    renderer = TileRenderer(TileCache(disk_dir=tmp_path))
+    for x in range(2):
+        for y in range(2):
+            renderer.tile(doc, 1, x, y)
+    edit = doc.move([0], 0, 1)  # bottom-left room
+    renderer.invalidate(doc, edit.dirty)
+    assert len(renderer.cache) == 3
+    assert len(list(tmp_path.rglob("*.png"))) == 3
+    renderer.invalidate(doc)
+    assert len(renderer.cache) == 0 and not list(tmp_path.rglob("*.png"))
+
+
+def test_render_view_crops_the_mosaic():
+    renderer = TileRenderer()
+    image = renderer.render_view(Drawing(build()), (0, 0, 40, 20), (200, 100))
+    assert image.size == (200, 100)
+
+
+def test_tile_endpoint_answers_304_without_rendering(app, client, key):
+    url = f"/drawings/{key}/tiles/0/0/0.png"
+    first = client.get(url)
+    assert first.status_code == 200 and first.mimetype == "image/png"
+    again = client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    assert client.get(f"/drawings/{key}/tiles/0/0/0.gif").status_code == 404
+    assert client.get(f"/drawings/{key}/tiles/1/5/0.png").status_code == 404
@@ -0,0 +1,69 @@
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from benchmarks.synthetic import scanned_plan
+from cadhelp import trace as tr
+
+
+def png(image, **params):
+    buf = io.BytesIO()
+    image.save(buf, "PNG", **params)
+    return buf.getvalue()
+
+
+def pixels():
+    rng = np.random.default_rng(1)
+    out = (rng.random((53, 37, 4)) * 255).astype(np.uint8)
+    out[10:20] = 0
+    return out
+
+
+@pytest.mark.parametrize("mode, params", [
+    ("L", {}), ("L", {"transparency": 0}), ("1", {}), ("RGB", {}), ("RGBA", {}), ("LA", {}),
+    ("P", {}), ("P", {"transparency": 3}), ("P", {"bits": 4}), ("I;16", {}),
+])
+def test_png_stripes_match_pillow(mode, params):
+    rgba = Image.fromarray(pixels())
+    image = rgba.convert("RGB").convert("P", colors=16) if mode == "P" else rgba.convert(mode)
+    data = png(image, **params)
+    want = np.concatenate([grey for _, grey in tr._stripes(Image.open(io.BytesIO(data)), 7)])
+    fp = io.BytesIO(data)
+    stripes = tr._png_stripes(fp, tr._png_header(fp), Image.open(io.BytesIO(data)), 7)
+    got = np.concatenate([grey for _, grey in stripes])
+    np.testing.assert_array_equal(got, want)
+
+
+def test_trace_streams_png_like_pillow():
+    data = scanned_plan(12)
+    streamed = tr.trace(data, tile_size=64, workers=1)
+    whole = tr.trace(Image.open(io.BytesIO(data)), tile_size=64, workers=1)
+    assert len(streamed.store) > 0 and streamed.threshold == whole.threshold
+    assert streamed.store.digest() == whole.store.digest()
+    assert streamed.units_per_pixel == pytest.approx(0.254, rel=1e-4)
+
+
+def test_open_image_checks_its_own_limit(monkeypatch):
+    limit = Image.MAX_IMAGE_PIXELS
+    data = png(Image.new("L", (40, 30), 255))
+    assert tr.open_image(data).size == (40, 30)
+    assert Image.MAX_IMAGE_PIXELS == limit
+    monkeypatch.setattr(tr, "MAX_PIXELS", 1000)
+    with pytest.raises(ValueError, match="over the limit"):
+        tr.open_image(data)
+    with pytest.raises(ValueError):
+        tr.open_image(b"not an image")
+
+
+@pytest.mark.parametrize("fmt", ["JPEG", "TIFF", "BMP"])
+def test_whole_decodes_are_limited(monkeypatch, fmt):
+    buf = io.BytesIO()
+    Image.new("L", (40, 30), 255).save(buf, fmt)
+    assert len(tr.trace(buf.getvalue(), workers=1).store) == 0
+    monkeypatch.setattr(tr, "WHOLE_DECODE_PIXELS", 1000)
+    with pytest.raises(ValueError, match="for decoding whole"):
+        tr.trace(buf.getvalue(), workers=1)
+    # PNG is read by stripes, whatever its size.
+    assert tr.trace(png(Image.new("L", (40, 30), 255)), workers=1).size == (40, 30)
@@ -0,0 +1,25 @@
+import io
+
+from cadhelp.ui.cache import CacheStats, content_hash
+
+
+def test_cache_stats_hit_rates():
+    stats = CacheStats()
+    for _ in range(4):
+        stats.call("parse")
+    stats.miss("parse")
+    stats.call("metrics")
+    stats.miss("metrics")
+    stats.miss("metrics")  # a miss counted twice never shows as a negative hit
+    assert stats.rows() == [
+        {"cache": "metrics", "calls": 1, "hits": 0, "misses": 1, "hit rate": 0.0},
+        {"cache": "parse", "calls": 4, "hits": 3, "misses": 1, "hit rate": 0.75},
+    ]
+    stats.reset()
+    assert stats.rows() == []
+
+
+def test_content_hash_depends_on_bytes_only():
+    a, b = io.BytesIO(b"drawing"), io.BytesIO(b"drawing")
+    b.seek(3)
+    assert content_hash(a) == content_hash(b) != content_hash(io.BytesIO(b"drawinG"))
@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+import speech_recognition as sr
+
+from cadhelp.voice.pipeline import COMMAND, ERROR, TRANSCRIPT, UNRECOGNIZED, VoicePipeline
+
+
+def audio(text: str) -> sr.AudioData:
+    """Fake utterance whose "speech" is ``text`` in its frame data."""
+    return sr.AudioData(text.encode(), 16_000, 2)
+
+
+def fake_recognize(data: sr.AudioData) -> str:
+    text = data.frame_data.decode()
+    if text == "noise":
+        raise sr.UnknownValueError()
+    if text == "boom":
+        raise RuntimeError("model missing")
+    return text
+
+
+def test_events_per_outcome():
+    pipeline = VoicePipeline(fake_recognize, parse=lambda t: "cmd" if t == "zoom in" else None)
+    for text in ("zoom in", "hello", "noise", "", "boom"):
+        pipeline.submit(audio(text))
+    pipeline.join()
+    events = pipeline.events()
+    assert [e.kind for e in events] == [COMMAND, TRANSCRIPT, UNRECOGNIZED, UNRECOGNIZED, ERROR]
+    assert [e.seq for e in events] == [1, 2, 3, 4, 5]
+    assert events[0].command == "cmd" and events[1].text == "hello"
+    assert events[4].error == "RuntimeError: model missing"
+    assert [e.seq for e in pipeline.events(after=3)] == [4, 5]
+    assert pipeline.wait(after=5, timeout=0.01) == []
+
+
+def test_full_queue_drops_oldest_utterance():
+    release = threading.Event()
+
+    def slow(data):
+        release.wait(5)
+        return data.frame_data.decode()
+
+    pipeline = VoicePipeline(slow, parse=lambda t: None, max_pending=2)
+    seen = []
+    pipeline.subscribe(lambda e: seen.append(e.text))
+    pipeline.submit(audio("first"))
+    while pipeline.pending:  # the worker has taken "first" and is blocked on it
+        pass
+    for text in ("a", "b", "c", "d"):
+        pipeline.submit(audio(text))
+    assert pipeline.dropped == 2
+    release.set()
+    pipeline.join()
+    assert seen == ["first", "c", "d"]
+
+
+def test_bad_sizes():
+    with pytest.raises(ValueError):
+        VoicePipeline(fake_recognize, workers=0)
+
+
+def test_voice_endpoint_rejects_garbage(client):
+    assert client.post("/voice", data=b"not audio").status_code == 400
+    body = client.get("/voice/events?after=0").json
+    assert body == {"events": [], "last": 0}